@@ -0,0 +1,84 @@
+"""
+对比逐行遍历 GeoDataFrame 与空间索引查询行政区划代码的耗时。
+
+用法（在仓库根目录下）：
+    python -m benchmark.bench_area_lookup [geojson 目录] [点数]
+不指定目录时，生成约 2800 个县级大小的多边形（分为 34 个 GeoDataFrame）作为全国县级数据的替代。
+"""
+
+import sys
+import time
+
+import geopandas as gpd
+import numpy as np
+import shapely
+from shapely import Point
+
+from src.gpxutil.models.exceptions import PointAreaNotFoundException
+from src.gpxutil.utils.geocoding.gdf.area_index import AreaIndex
+from src.gpxutil.utils.geocoding.gdf.gdf_handler import load_area_gdf_list
+
+
+def make_sample_area_gdf_list(province_count: int = 34, county_count: int = 84) -> list[gpd.GeoDataFrame]:
+    """生成网格状的多边形，每个多边形边界有较多顶点，接近真实县界的复杂度"""
+    rng = np.random.default_rng(0)
+    side = 0.5
+    columns = 120
+    gdf_list = []
+    for province in range(province_count):
+        ids, geometries = [], []
+        for county in range(county_count):
+            n = province * county_count + county
+            x = 73.5 + (n % columns) * side
+            y = 18.0 + (n // columns) * side
+            angles = np.linspace(0, 2 * np.pi, 200, endpoint=False)
+            radius = side * 0.7 * (1 + 0.05 * rng.standard_normal(len(angles)))
+            ring = np.column_stack([x + side / 2 + radius * np.cos(angles), y + side / 2 + radius * np.sin(angles)])
+            geometries.append(shapely.Polygon(ring).intersection(shapely.box(x, y, x + side, y + side)))
+            ids.append(f'{province:02d}{county:04d}')
+        gdf_list.append(gpd.GeoDataFrame({'id': ids, 'geometry': geometries}))
+    return gdf_list
+
+
+def get_area_id_by_rows(point: Point, area_gdf_list: list[gpd.GeoDataFrame]):
+    """原先的实现：逐个 GeoDataFrame 逐行判断"""
+    for gdf in area_gdf_list:
+        for _, row in gdf.iterrows():
+            if row['geometry'].contains(point):
+                return row['id']
+    raise PointAreaNotFoundException()
+
+
+def lookup(func, points) -> tuple[float, list]:
+    start = time.perf_counter()
+    results = []
+    for point in points:
+        try:
+            results.append(func(point))
+        except PointAreaNotFoundException:
+            results.append(None)
+    return time.perf_counter() - start, results
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and not sys.argv[1].isdigit():
+        area_gdf_list = load_area_gdf_list(sys.argv[1])
+        point_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    else:
+        area_gdf_list = make_sample_area_gdf_list()
+        point_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    bounds = np.array([gdf.total_bounds for gdf in area_gdf_list])
+    min_x, min_y = bounds[:, 0].min(), bounds[:, 1].min()
+    max_x, max_y = bounds[:, 2].max(), bounds[:, 3].max()
+    rng = np.random.default_rng(1)
+    points = [Point(x, y) for x, y in zip(rng.uniform(min_x, max_x, point_count), rng.uniform(min_y, max_y, point_count))]
+    print(f'polygons: {sum(len(gdf) for gdf in area_gdf_list)}, points: {point_count}')
+
+    start = time.perf_counter()
+    index = AreaIndex(area_gdf_list)
+    print(f'   build index: {time.perf_counter() - start:8.3f} s')
+    index_elapsed, index_results = lookup(index.get_area_id, points)
+    print(f'  spatial index: {index_elapsed:8.3f} s, {index_elapsed / point_count * 1000:8.3f} ms/point')
+    rows_elapsed, rows_results = lookup(lambda point: get_area_id_by_rows(point, area_gdf_list), points)
+    print(f'     row by row: {rows_elapsed:8.3f} s, {rows_elapsed / point_count * 1000:8.3f} ms/point')
+    print(f'results equal: {index_results == rows_results}')
@@ -0,0 +1,63 @@
+"""
+对比 gpxpy 解析与流式读取 GPX 文件的耗时和内存峰值。
+
+用法（在仓库根目录下）：
+    python -m benchmark.bench_gpx_reader [点数]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import gpxpy
+
+from src.gpxutil.models.route import Route
+
+
+def write_sample_gpx(path: str, point_count: int):
+    """生成一个只有一个 segment 的 GPX 文件，逐行写出，不占用额外内存"""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<gpx xmlns="http://www.topografix.com/GPX/1/1" version="1.1" creator="benchmark">\n')
+        f.write('<trk><trkseg>\n')
+        for i in range(point_count):
+            point_time = (start + timedelta(seconds=i)).strftime('%Y-%m-%dT%H:%M:%SZ')
+            f.write(f'<trkpt lat="{30.5 + i * 1e-5:.7f}" lon="{114.3 + i * 1e-5:.7f}">'
+                    f'<ele>{50 + i % 100:.1f}</ele><time>{point_time}</time></trkpt>\n')
+        f.write('</trkseg></trk>\n</gpx>\n')
+
+
+def from_gpxpy(path: str) -> Route:
+    with open(path, 'r', encoding='utf-8') as gpx_file:
+        gpx = gpxpy.parse(gpx_file)
+    return Route.from_gpx_obj(gpx)
+
+
+def from_stream(path: str) -> Route:
+    return Route.from_gpx_file(path)
+
+
+def measure(func, path: str) -> tuple[float, float, int]:
+    """返回耗时（秒）、内存峰值（MB）、点数"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    route = func(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024, len(route.points)
+
+
+if __name__ == '__main__':
+    point_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        gpx_path = os.path.join(tmp_dir, 'sample.gpx')
+        write_sample_gpx(gpx_path, point_count)
+        print(f'points: {point_count}, file size: {os.path.getsize(gpx_path) / 1024 / 1024:.1f} MB')
+        for name, func in (('gpxpy', from_gpxpy), ('stream', from_stream)):
+            elapsed, peak, count = measure(func, gpx_path)
+            print(f'{name:>8}: {elapsed:8.2f} s, peak {peak:8.1f} MB, {count} point(s)')
@@ -0,0 +1,92 @@
+"""
+对比每次请求新建连接（requests.get）与共用连接池（http_client）时，Nominatim 逐点获取行政区划的耗时。
+
+用法（在仓库根目录下）：
+    python -m benchmark.bench_http_client [点数] [建立连接的延迟（毫秒）]
+API 由本地的 HTTP 服务模拟，每个点请求三次（中文 reverse、英文 reverse、details）。
+本机回环连接几乎没有握手开销，因此服务端在每个新连接上等待给定的延迟（默认 20 毫秒），模拟网络往返与 TLS 握手。
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from src.gpxutil.utils.geocoding import http_client, nominatim
+
+
+def start_stub_server(connect_delay: float) -> tuple[ThreadingHTTPServer, dict]:
+    """启动模拟 Nominatim 的服务，返回服务和连接计数"""
+    counter = {'connections': 0, 'requests': 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # 响应头与响应体分两次写出，不关闭 Nagle 算法时，长连接上每个请求都会多等一次延迟确认
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            counter['connections'] += 1
+            time.sleep(connect_delay)
+
+        def do_GET(self):
+            counter['requests'] += 1
+            parsed = urlparse(self.path)
+            query = parse_qs(parsed.query)
+            if parsed.path == '/details':
+                body = {'names': {'name': 'G4', 'ref': 'G4'}}
+            else:
+                en = query['accept-language'][0] == 'en'
+                body = {'features': [{'properties': {'geocoding': {
+                    'osm_type': 'way', 'place_id': 1, 'name': 'Expressway' if en else '京港澳高速',
+                    'admin': {'level4': 'Hubei' if en else '湖北省', 'level5': 'Wuhan' if en else '武汉市',
+                              'level6': 'Hongshan' if en else '洪山区'},
+                }}}]}
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, counter
+
+
+def run(point_count: int, host: str, counter: dict) -> tuple[float, int]:
+    """逐点获取行政区划（绕过本地缓存），返回每个点的平均耗时和新建的连接数"""
+    get_point_info = nominatim.get_point_info.__wrapped__
+    connections = counter['connections']
+    start = time.perf_counter()
+    for i in range(point_count):
+        get_point_info(30 + i * 1e-4, 114, host=host)
+    return (time.perf_counter() - start) / point_count, counter['connections'] - connections
+
+
+if __name__ == '__main__':
+    point_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    connect_delay = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.02
+    server, counter = start_stub_server(connect_delay)
+    host = f'http://127.0.0.1:{server.server_address[1]}'
+    print(f'points: {point_count}, connect delay: {connect_delay * 1000:.0f} ms')
+
+    # 原先的做法：每次请求都用 requests.get，新建连接
+    nominatim.http_client = SimpleNamespace(get=lambda url, params=None: requests.get(url, params=params))
+    plain_elapsed, plain_connections = run(point_count, host, counter)
+    print(f'  requests.get: {plain_elapsed * 1000:8.2f} ms/point, {plain_connections} connection(s)')
+
+    nominatim.http_client = http_client
+    pooled_elapsed, pooled_connections = run(point_count, host, counter)
+    print(f'   http_client: {pooled_elapsed * 1000:8.2f} ms/point, {pooled_connections} connection(s)')
+    print(f'       speedup: {plain_elapsed / pooled_elapsed:8.1f}x')
+    server.shutdown()
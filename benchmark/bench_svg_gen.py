@@ -0,0 +1,68 @@
+"""
+对比每次重新加载字体、解析字形（冷缓存）与复用缓存时生成道路编号标志的耗时。
+
+配置文件中的字体 B 不存在时，临时生成一个只含编号字符的简单字体。
+
+用法（在仓库根目录下）：
+    python -m benchmark.bench_svg_gen [次数] [编号]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+from src.gpxutil.core.config import CONFIG_HANDLER
+from src.gpxutil.utils import svg_gen
+
+
+def write_sample_font(path: str, chars: str):
+    """每个字符是一个由多段曲线围成的字形，字形数与点数接近真实的编号字体"""
+    glyph_order = ['.notdef'] + [f'g{i}' for i in range(len(chars))]
+    glyphs = {}
+    for i, name in enumerate(glyph_order):
+        pen = TTGlyphPen(None)
+        pen.moveTo((50, 0))
+        for step in range(1, 20):
+            pen.qCurveTo((50 + step * 20, step * 35 + i), (60 + step * 20, step * 35))
+        pen.lineTo((500, 0))
+        pen.closePath()
+        glyphs[name] = pen.glyph()
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(glyph_order)
+    builder.setupCharacterMap({ord(char): f'g{i}' for i, char in enumerate(chars)})
+    builder.setupGlyf(glyphs)
+    builder.setupHorizontalMetrics({name: (600, 50) for name in glyph_order})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({'familyName': 'Sample', 'styleName': 'Regular'})
+    builder.setupOS2()
+    builder.setupPost()
+    builder.save(path)
+
+
+def measure(code: str, times: int, cold: bool) -> float:
+    """返回每个标志的平均耗时（毫秒）"""
+    svg_gen.clear_glyph_cache()
+    start = time.perf_counter()
+    for _ in range(times):
+        if cold:
+            svg_gen.clear_glyph_cache()
+        svg_gen.generate_way_num_pad(code)
+    return (time.perf_counter() - start) / times * 1000
+
+
+if __name__ == '__main__':
+    times = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    code = sys.argv[2] if len(sys.argv) > 2 else 'G310'
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        font_path = CONFIG_HANDLER.config.traffic_sign.font_path.B
+        if not os.path.exists(font_path):
+            font_path = os.path.join(tmp_dir, 'sample.ttf')
+            write_sample_font(font_path, 'GSXYZ0123456789')
+            CONFIG_HANDLER.config.traffic_sign.font_path.B = font_path
+        print(f'code: {code}, font: {font_path}, {times} time(s)')
+        for name, cold in (('cold', True), ('cached', False)):
+            print(f'{name:>8}: {measure(code, times, cold):8.3f} ms per sign')
@@ -7,6 +7,7 @@ from geopandas import GeoDataFrame
 
 from src.gpxutil.core.config import CONFIG_HANDLER
 from src.gpxutil.models.route import Route
+from src.gpxutil.utils.geocoding.journal import GeocodingJournal, file_hash, job_hash
 from src.gpxutil.utils.create_pic import generate_pic_from_csv
 from src.gpxutil.utils.gen_road_info import gen_route_info, get_info, read_csv
 from src.gpxutil.utils.svg_gen import generate_expwy_pad, generate_way_num_pad
@@ -17,6 +18,31 @@ if CONFIG_HANDLER.config.area_info.gdf:
     from src.gpxutil.utils.geocoding.gdf.gdf_handler import load_area_gdf_list
 
 
+def geocoding_job_hash(input_gpx_file_path: str, source: str, nominatim_url: str = None, map_api_ak: str = None,
+                       baidu_get_en_result: bool = None) -> str:
+    """
+    逆地理编码断点记录（journal）的哈希：输入文件与来源、API 地址、密钥、是否获取英文名一起计算，
+    其中任一变化时 journal 重新开始。未给出 API 地址、是否获取英文名时取配置文件中的值。
+    :param input_gpx_file_path: 输入的 GPX 文件
+    :param source: 来源
+    :param nominatim_url: Nominatim API 地址
+    :param map_api_ak: 百度、高德地图 API 的密钥
+    :param baidu_get_en_result: 百度地图是否获取英文名
+    :return: 十六进制字符串
+    """
+    area_info = CONFIG_HANDLER.config.area_info
+    if nominatim_url is None and area_info.nominatim is not None:
+        nominatim_url = area_info.nominatim.url
+    if baidu_get_en_result is None and area_info.baidu is not None:
+        baidu_get_en_result = area_info.baidu.get_en_result
+    return job_hash(file_hash(input_gpx_file_path), {
+        'source': source,
+        'nominatim_url': nominatim_url,
+        'map_api_ak': map_api_ak,
+        'baidu_get_en_result': baidu_get_en_result,
+    })
+
+
 def transform_route_info_from_gpx_file(
         input_gpx_file_path: str,
         output_transformed_gpx_file_path: str,
@@ -34,9 +60,11 @@ def transform_route_info_from_gpx_file(
         map_api_ak: str = None,
         map_freq: int = None,
         baidu_get_en_result: bool = None,
-        export_transformed_coordinate: bool = True
+        export_transformed_coordinate: bool = True,
+        gdf_bisect_step: int = None,
+        resume: bool = True,
 ):
-    if set_area and (source == 'gdf' or (source is None and CONFIG_HANDLER.config.area_info.use == 'gdf')):
+    if set_area and (source or CONFIG_HANDLER.config.area_info.use) in ('gdf', 'hybrid'):
         # 如果提供了CLI参数，则使用CLI参数指定的路径
         if gdf_path is not None and gdf_db_path is not None:
             area_gdf_list = load_area_gdf_list(gdf_path)
@@ -47,19 +75,32 @@ def transform_route_info_from_gpx_file(
                 area_gdf_list = GDFListHandler().list
             if area_code_conn is None:
                 area_code_conn = AreaCodeConnectHandler().conn
-    """导入数据、转换、添加行政区划和道路名称"""
-    route = Route.from_gpx_file(
-        input_gpx_file_path,
-        transform_coordinate=transform_coordinate, coordinate_type=coordinate_type, transformed_coordinate_type=transformed_coordinate_type,
-        set_area=set_area, source=source,
-        nominatim_url=nominatim_url,
-        area_gdf_list=area_gdf_list, area_code_conn=area_code_conn,
-        map_api_ak=map_api_ak, map_freq=map_freq, baidu_get_en_result=baidu_get_en_result
-    )
+    # 通过 API 获取行政区划时，逐点记录结果到 <output_csv>.journal，中断后重新运行从断点继续；全部完成后删除
+    journal = None
+    if resume and set_area and (source or CONFIG_HANDLER.config.area_info.use) != 'gdf':
+        journal = GeocodingJournal(output_csv_file_path + '.journal', geocoding_job_hash(
+            input_gpx_file_path, source or CONFIG_HANDLER.config.area_info.use, nominatim_url, map_api_ak, baidu_get_en_result
+        ))
+    try:
+        """导入数据、转换、添加行政区划和道路名称"""
+        route = Route.from_gpx_file(
+            input_gpx_file_path,
+            transform_coordinate=transform_coordinate, coordinate_type=coordinate_type, transformed_coordinate_type=transformed_coordinate_type,
+            set_area=set_area, source=source,
+            nominatim_url=nominatim_url,
+            area_gdf_list=area_gdf_list, area_code_conn=area_code_conn,
+            map_api_ak=map_api_ak, map_freq=map_freq, baidu_get_en_result=baidu_get_en_result,
+            gdf_bisect_step=gdf_bisect_step, journal=journal,
+        )
 
-    """导出数据，供外部修改、生成轨迹"""
-    route.to_gpx_file(output_transformed_gpx_file_path, export_transformed_coordinate=export_transformed_coordinate)
-    route.to_csv(output_csv_file_path)
+        """导出数据，供外部修改、生成轨迹"""
+        route.to_gpx_file(output_transformed_gpx_file_path, export_transformed_coordinate=export_transformed_coordinate)
+        route.to_csv(output_csv_file_path)
+    finally:
+        if journal is not None:
+            journal.close()
+    if journal is not None:
+        journal.remove()
 
 
 def generate_road_info(input_csv_file_path: str):
@@ -80,12 +121,14 @@ def main():
     gpx_parser.add_argument('--no_set_area', action='store_false', help='不设置行政区划')
     gpx_parser.add_argument('--coordinate_type', default='wgs84', help='坐标类型，可选 wgs84 或 gcj02')
     gpx_parser.add_argument('--transformed_coordinate_type', default='gcj02', help='转换后坐标类型，可选 wgs84 或 gcj02')
-    gpx_parser.add_argument('--area_source', choices=['nominatim', 'gdf', 'baidu', 'amap'], help='行政区划数据来源，可选 nominatim, gdf, baidu, amap')
+    gpx_parser.add_argument('--area_source', choices=['nominatim', 'gdf', 'baidu', 'amap', 'hybrid'], help='行政区划数据来源，可选 nominatim, gdf, baidu, amap, hybrid（行政区划从 gdf 获取，道路从配置的 API 获取）')
     gpx_parser.add_argument('--nominatim_url', help='nomination API 的开头，结尾不带斜杠。仅当 area_source 为 nominatim 时有效')
-    gpx_parser.add_argument('--gdf_path', help='GDF 文件目录路径，仅当 area_source为 gdf 时有效')
-    gpx_parser.add_argument('--gdf_db_path', help='GDF数据库文件路径，仅当 area_source 为 gdf 时有效')
-    gpx_parser.add_argument('--map_api_ak', help='百度地图 / 高德地图的 API Key，仅当 area_source 为 baidu 或 amap 时有效')
+    gpx_parser.add_argument('--gdf_path', help='GDF 文件目录路径，仅当 area_source 为 gdf 或 hybrid 时有效')
+    gpx_parser.add_argument('--gdf_db_path', help='GDF数据库文件路径，仅当 area_source 为 gdf 或 hybrid 时有效')
+    gpx_parser.add_argument('--gdf_bisect_step', type=int, help='每隔多少个点判断一次所在地区，只在结果变化处二分查找边界，可大幅减少判断次数。仅当 area_source 为 gdf 或 hybrid 时有效，默认判断每个点')
+    gpx_parser.add_argument('--map_api_ak', help='百度地图 / 高德地图的 API Key，仅当 area_source 为 baidu 或 amap（或 hybrid 的道路来源为 baidu 或 amap）时有效')
     gpx_parser.add_argument('--map_freq', type=int, default=3, help='百度地图 / 高德地图的请求频率，仅当 area_source 为 baidu 或 amap 时有效')
+    gpx_parser.add_argument('--no_resume', action='store_false', help='不从上次中断处继续：通过 API 获取行政区划时，默认逐点记录结果到 <output_csv>.journal，重新运行时跳过已完成的点')
     gpx_parser.add_argument('--baidu_get_en_result', type=bool, default=False, help='使用百度地图获取行政区划数据时，是否获取英文名。如果获取，则一次执行两次 API 请求。能够获取到行政区划的英文名（不包括行政级别名称），道路则不一定能够取到。仅当 area_source 为 baidu 时有效，默认为 False')
 
     pad_parser = subparsers.add_parser('pad', help='Generate SVG num pad')
@@ -108,6 +151,16 @@ def main():
     info_parser = subparsers.add_parser('info', help='Generate road info')
     info_parser.add_argument('input', help='Input CSV file path')
 
+    # compile gdf cache
+    gdf_cache_parser = subparsers.add_parser('gdf_cache', help='Compile area GeoJSON files into a binary cache')
+    gdf_cache_parser.add_argument('gdf_path', nargs='?', help='GDF 文件目录路径 (optional)，默认使用配置文件中的 gdf_dir_path')
+    gdf_cache_parser.add_argument('--output', help='缓存文件路径 (optional)，默认为目录下的 .area_gdf_cache.npz')
+
+    # import offline road network
+    road_import_parser = subparsers.add_parser('road_import', help='Import roads from an OSM extract for offline road names')
+    road_import_parser.add_argument('input', help='.osm.pbf 或道路 GeoJSON 文件路径')
+    road_import_parser.add_argument('--output', help='道路存储文件路径 (optional)，默认使用配置文件中的 osm_road.store_path')
+
 
 
     args = parser.parse_args()
@@ -151,7 +204,9 @@ def main():
             gdf_db_path=args.gdf_db_path,
             map_api_ak=args.map_api_ak,
             map_freq=args.map_freq,
-            baidu_get_en_result=args.baidu_get_en_result
+            baidu_get_en_result=args.baidu_get_en_result,
+            gdf_bisect_step=args.gdf_bisect_step,
+            resume=args.no_resume,
         )
         print("GPX processing completed successfully.")
 
@@ -210,6 +265,33 @@ def main():
             print(f"Error: Input CSV file '{input_csv_file_path}' does not exist.")
             sys.exit(1)
         print(generate_road_info(input_csv_file_path))
+    elif args.command == 'gdf_cache':
+        from src.gpxutil.utils.geocoding.gdf.gdf_cache import default_cache_path
+        from src.gpxutil.utils.geocoding.gdf.gdf_handler import load_area_gdf_list
+        gdf_path = args.gdf_path
+        cache_path = args.output
+        if gdf_path is None:
+            if CONFIG_HANDLER.config.area_info.gdf is None:
+                print("Error: gdf_path is not given and gdf is not set in config.")
+                sys.exit(1)
+            gdf_path = CONFIG_HANDLER.config.area_info.gdf.gdf_dir_path
+            if cache_path is None:
+                cache_path = CONFIG_HANDLER.config.area_info.gdf.cache_path
+        if not os.path.isdir(gdf_path):
+            print(f"Error: GDF directory '{gdf_path}' does not exist.")
+            sys.exit(1)
+        if cache_path is None:
+            cache_path = default_cache_path(gdf_path)
+        area_gdf_list = load_area_gdf_list(gdf_path, cache_path=cache_path)
+        print(f"Area GeoJSON cache is ready: {cache_path} ({sum(len(gdf) for gdf in area_gdf_list)} area(s))")
+    elif args.command == 'road_import':
+        from src.gpxutil.utils.geocoding.road.road_store import import_roads
+        if not os.path.exists(args.input):
+            print(f"Error: Road file '{args.input}' does not exist.")
+            sys.exit(1)
+        store_path = args.output or CONFIG_HANDLER.config.area_info.osm_road.store_path
+        network = import_roads(args.input, store_path)
+        print(f"Road store is ready: {store_path} ({len(network.names)} road(s), {len(network)} segment(s))")
     else:
         parser.print_help()
 
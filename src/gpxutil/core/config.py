@@ -33,6 +33,14 @@ class ConfigHandler:
         config = self.parse_config(config_raw)
         return config
 
+    @staticmethod
+    def parse_map_api_keys(keys_raw) -> List[MapApiKeyConfig]:
+        """解析百度、高德地图的多个密钥"""
+        return [
+            MapApiKeyConfig(ak=key_raw['ak'], freq=key_raw.get('freq'), daily_limit=key_raw.get('daily_limit'))
+            for key_raw in keys_raw or []
+        ]
+
     @staticmethod
     def parse_config(config_raw):
         area_info = AreaInfoConfig(
@@ -40,28 +48,81 @@ class ConfigHandler:
         )
         if 'nominatim' in config_raw['area_info']:
             nominatim = NominatimConfig(
-                url=config_raw['area_info']['nominatim']['url']
+                url=config_raw['area_info']['nominatim']['url'],
+                concurrency=config_raw['area_info']['nominatim'].get('concurrency', NominatimConfig.concurrency),
+                freq=config_raw['area_info']['nominatim'].get('freq'),
+                en_on_change=config_raw['area_info']['nominatim'].get('en_on_change', NominatimConfig.en_on_change),
+                lru_cache_size=config_raw['area_info']['nominatim'].get('lru_cache_size', NominatimConfig.lru_cache_size),
+                lru_cache_persist=config_raw['area_info']['nominatim'].get('lru_cache_persist', NominatimConfig.lru_cache_persist),
+                sample_distance=config_raw['area_info']['nominatim'].get('sample_distance'),
+                sample_time=config_raw['area_info']['nominatim'].get('sample_time')
             )
             area_info.nominatim = nominatim
         if 'gdf' in config_raw['area_info']:
             gdf = GdfConfig(
                 gdf_dir_path=config_raw['area_info']['gdf']['gdf_dir_path'],
-                area_info_sqlite_path=config_raw['area_info']['gdf']['area_info_sqlite_path']
+                area_info_sqlite_path=config_raw['area_info']['gdf']['area_info_sqlite_path'],
+                cache_path=config_raw['area_info']['gdf'].get('cache_path')
             )
             area_info.gdf = gdf
         if 'baidu' in config_raw['area_info']:
             baidu = BaiduConfig(
-                ak=config_raw['area_info']['baidu']['ak'],
-                freq=config_raw['area_info']['baidu']['freq'],
-                get_en_result=config_raw['area_info']['baidu']['get_en_result']
+                ak=config_raw['area_info']['baidu'].get('ak'),
+                freq=config_raw['area_info']['baidu'].get('freq'),
+                get_en_result=config_raw['area_info']['baidu']['get_en_result'],
+                keys=ConfigHandler.parse_map_api_keys(config_raw['area_info']['baidu'].get('keys')),
+                en_on_change=config_raw['area_info']['baidu'].get('en_on_change', BaiduConfig.en_on_change),
+                concurrency=config_raw['area_info']['baidu'].get('concurrency'),
+                sample_distance=config_raw['area_info']['baidu'].get('sample_distance'),
+                sample_time=config_raw['area_info']['baidu'].get('sample_time')
             )
             area_info.baidu = baidu
         if 'amap' in config_raw['area_info']:
             amap = AmapConfig(
-                ak=config_raw['area_info']['amap']['ak'],
-                freq=config_raw['area_info']['amap']['freq']
+                ak=config_raw['area_info']['amap'].get('ak'),
+                freq=config_raw['area_info']['amap'].get('freq'),
+                keys=ConfigHandler.parse_map_api_keys(config_raw['area_info']['amap'].get('keys')),
+                batch=config_raw['area_info']['amap'].get('batch', AmapConfig.batch),
+                concurrency=config_raw['area_info']['amap'].get('concurrency'),
+                sample_distance=config_raw['area_info']['amap'].get('sample_distance'),
+                sample_time=config_raw['area_info']['amap'].get('sample_time')
             )
             area_info.amap = amap
+        if 'hybrid' in config_raw['area_info']:
+            hybrid_raw = config_raw['area_info']['hybrid'] or {}
+            default_hybrid = HybridConfig()
+            area_info.hybrid = HybridConfig(
+                road_source=hybrid_raw.get('road_source', default_hybrid.road_source),
+                heading_tolerance=hybrid_raw.get('heading_tolerance', default_hybrid.heading_tolerance),
+                max_run_distance=hybrid_raw.get('max_run_distance', default_hybrid.max_run_distance)
+            )
+        if 'osm_road' in config_raw['area_info']:
+            osm_road_raw = config_raw['area_info']['osm_road'] or {}
+            default_osm_road = OsmRoadConfig()
+            area_info.osm_road = OsmRoadConfig(
+                store_path=osm_road_raw.get('store_path', default_osm_road.store_path),
+                max_distance=osm_road_raw.get('max_distance', default_osm_road.max_distance),
+                heading_tolerance=osm_road_raw.get('heading_tolerance', default_osm_road.heading_tolerance)
+            )
+        if 'cache' in config_raw['area_info']:
+            cache_raw = config_raw['area_info']['cache'] or {}
+            default_cache = GeocodingCacheConfig()
+            area_info.cache = GeocodingCacheConfig(
+                enabled=cache_raw.get('enabled', default_cache.enabled),
+                path=cache_raw.get('path', default_cache.path),
+                precision=cache_raw.get('precision', default_cache.precision),
+                ttl_days=cache_raw.get('ttl_days', default_cache.ttl_days),
+                max_entries=cache_raw.get('max_entries', default_cache.max_entries)
+            )
+        area_info.key_usage_path = config_raw['area_info'].get('key_usage_path', AreaInfoConfig.key_usage_path)
+        if 'http' in config_raw['area_info']:
+            http_raw = config_raw['area_info']['http'] or {}
+            default_http = HttpClientConfig()
+            area_info.http = HttpClientConfig(
+                pool_size=http_raw.get('pool_size', default_http.pool_size),
+                connect_timeout=http_raw.get('connect_timeout', default_http.connect_timeout),
+                read_timeout=http_raw.get('read_timeout', default_http.read_timeout)
+            )
         # match config_raw['area_info']['use']:
         #     case 'nominatim':
         #         nominatim = NominatimConfig(
@@ -468,7 +529,9 @@ class ConfigHandler:
         video_info_layer = VideoInfoLayerConfig(
             font_path=video_info_layer_font_path,
             img_path=video_info_layer_img_path,
-            frame=video_info_layer_frame
+            frame=video_info_layer_frame,
+            sign_cache_dir=config_raw['video_info_layer'].get('sign_cache_dir', VideoInfoLayerConfig.sign_cache_dir),
+            compass_angle_step=config_raw['video_info_layer'].get('compass_angle_step', VideoInfoLayerConfig.compass_angle_step)
         )
         return Config(
             area_info=area_info,
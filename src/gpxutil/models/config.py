@@ -6,22 +6,67 @@ from typing import Dict, List, Union, Literal
 class NominatimConfig:
     """Nominatim API 配置"""
     url: str
+    concurrency: int = 4
+    """同时进行的请求数上限"""
+    freq: float = None
+    """每秒请求数上限，为空时不限制"""
+    en_on_change: bool = True
+    """是否先只获取中文结果，再只在中文结果（省、市、区、道路）变化处获取英文名"""
+    lru_cache_size: int = 10000
+    """道路详情（按 place_id）、英文名（按 osm_id 与中文行政区划）在内存中各缓存的条数"""
+    lru_cache_persist: bool = True
+    """道路详情、英文名是否同时存入本地缓存（area_info.cache）"""
+    sample_distance: float = None
+    """每走过多少米取一个点请求，只在相邻两次结果不同时二分查找变化处。与 sample_time 都为空时请求每个点"""
+    sample_time: float = None
+    """每经过多少秒取一个点请求，与 sample_distance 先到者为准"""
 
 @dataclass
 class GdfConfig:
     gdf_dir_path: str
     area_info_sqlite_path: str
+    cache_path: str = None
+    """GeoJSON 目录编译后的缓存文件路径，默认为 gdf_dir_path 下的 .area_gdf_cache.npz"""
+
+@dataclass
+class MapApiKeyConfig:
+    """百度、高德地图 API 的一个密钥"""
+    ak: str
+    freq: int
+    """每秒请求数上限"""
+    daily_limit: int = None
+    """每日请求数上限，为空时不限制"""
 
 @dataclass
 class BaiduConfig:
     ak: str
     freq: int
     get_en_result: bool
+    keys: List[MapApiKeyConfig] = field(default_factory=list)
+    """多个密钥，按 freq 加权轮流使用。配置时忽略 ak、freq"""
+    en_on_change: bool = True
+    """获取英文名时，是否先只获取中文结果，再只在中文结果（省、市、区、道路）变化处获取英文名"""
+    concurrency: int = None
+    """同时进行的请求数上限，默认与 freq 相同"""
+    sample_distance: float = None
+    """每走过多少米取一个点请求，只在相邻两次结果不同时二分查找变化处。与 sample_time 都为空时请求每个点"""
+    sample_time: float = None
+    """每经过多少秒取一个点请求，与 sample_distance 先到者为准"""
 
 @dataclass
 class AmapConfig:
     ak: str
     freq: int
+    keys: List[MapApiKeyConfig] = field(default_factory=list)
+    """多个密钥，按 freq 加权轮流使用。配置时忽略 ak、freq"""
+    batch: bool = True
+    """是否批量请求，每次请求最多包含 20 个点"""
+    concurrency: int = None
+    """同时进行的请求数上限，默认与 freq 相同"""
+    sample_distance: float = None
+    """每走过多少米取一个点请求，只在相邻两次结果不同时二分查找变化处。与 sample_time 都为空时请求每个点"""
+    sample_time: float = None
+    """每经过多少秒取一个点请求，与 sample_distance 先到者为准"""
 
 @dataclass
 class PositionConfig:
@@ -153,15 +198,63 @@ class TrafficSignConfig:
     way_num_pad: WayNumPadConfig
     expwy_code_sign: ExpwyCodeSignConfig
 
+@dataclass
+class OsmRoadConfig:
+    """离线道路匹配的配置"""
+    store_path: str = 'asset/osm_roads.npz'
+    """由 .osm.pbf 或 GeoJSON 导入的道路存储文件（python main.py road_import）"""
+    max_distance: float = 30
+    """点与道路的最大距离（米），超出时不匹配"""
+    heading_tolerance: float = 45
+    """行进方向与道路方向的容差（度）"""
+
+@dataclass
+class HybridConfig:
+    """行政区划从 GDF 获取、道路从 API 或离线道路数据获取（hybrid）的配置"""
+    road_source: Literal['nominatim', 'baidu', 'amap', 'osm'] = 'amap'
+    """获取道路名称、编号的来源，osm 为离线道路数据（见 osm_road）"""
+    heading_tolerance: float = 30
+    """所在地区不变时，方向变化超过多少度才重新请求道路"""
+    max_run_distance: float = 2000
+    """同一个道路结果最多沿用多少米"""
+
+@dataclass
+class GeocodingCacheConfig:
+    """逆地理编码结果的本地缓存配置"""
+    enabled: bool = True
+    path: str = 'asset/geocoding_cache.sqlite'
+    precision: int = 4
+    """坐标量化到小数点后几位，4 位约为 10 米"""
+    ttl_days: float = 30
+    """缓存有效期（天）"""
+    max_entries: int = 1000000
+    """最多缓存的条数，超出后淘汰最久未使用的"""
+
+@dataclass
+class HttpClientConfig:
+    """逆地理编码 API 请求的连接池配置"""
+    pool_size: int = 16
+    """每个域名最多保持的连接数"""
+    connect_timeout: float = 5
+    """建立连接的超时时间（秒）"""
+    read_timeout: float = 30
+    """等待响应的超时时间（秒）"""
+
 @dataclass
 class AreaInfoConfig:
     # gdf_dir_path: str
     # area_info_sqlite_path: str
-    use: Literal['nominatim', 'gdf', 'baidu', 'amap']
+    use: Literal['nominatim', 'gdf', 'baidu', 'amap', 'hybrid']
     nominatim: NominatimConfig = None
     gdf: GdfConfig = None
     baidu: BaiduConfig = None
     amap: AmapConfig = None
+    hybrid: HybridConfig = field(default_factory=HybridConfig)
+    osm_road: OsmRoadConfig = field(default_factory=OsmRoadConfig)
+    cache: GeocodingCacheConfig = field(default_factory=GeocodingCacheConfig)
+    http: HttpClientConfig = field(default_factory=HttpClientConfig)
+    key_usage_path: str = 'asset/api_key_usage.json'
+    """百度、高德地图各密钥当天请求数的记录文件"""
 
 @dataclass
 class VideoInfoLayerFontPathConfig:
@@ -238,6 +331,10 @@ class VideoInfoLayerConfig:
     font_path: VideoInfoLayerFontPathConfig
     img_path: VideoInfoLayerImgPathConfig
     frame: VideoInfoLayerFrameConfig
+    sign_cache_dir: str = 'asset/sign_cache'
+    """道路编号标志按叠加层尺寸栅格化后的缓存目录，为空时只在内存中缓存"""
+    compass_angle_step: float = 0.5
+    """指南针预先旋转的角度间隔（度），每帧取最接近的一张"""
 
 @dataclass
 class Config:
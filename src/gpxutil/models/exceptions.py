@@ -1,2 +1,7 @@
 class PointAreaNotFoundException(Exception):
-    pass
\ No newline at end of file
+    pass
+
+
+class MapApiQuotaExceededException(Exception):
+    """百度、高德地图 API 所有密钥当天的配额都已用完"""
+    pass
@@ -1,7 +1,7 @@
 from svgwrite import Drawing
 
 from src.gpxutil.models.enum_class import ChinaMainlandRoadLevel, ChinaProvinceSingleCharAbbr
-from src.gpxutil.utils.svg_gen import generate_expwy_pad, generate_way_num_pad
+from src.gpxutil.utils.svg_gen import get_sign_renderer
 
 
 class Road:
@@ -67,8 +67,8 @@ class ChinaMainlandRoad(Road):
 
     def to_svg(self) -> Drawing:
         if self.road_level in [ChinaMainlandRoadLevel.NATIONAL_EXPWY, ChinaMainlandRoadLevel.PROVINCIAL_EXPWY]:
-            return generate_expwy_pad(self.code, self.province, self.name)
-        return generate_way_num_pad(self.code)
+            return get_sign_renderer().expwy_pad(self.code, self.province, self.name)
+        return get_sign_renderer().way_num_pad(self.code)
 
     def to_svg_file(self, path: str):
         self.to_svg().saveas(path)
@@ -77,7 +77,7 @@ class ChinaMainlandExpwy(ChinaMainlandRoad):
     def to_svg(self, with_name: bool = False) -> Drawing:
         province = self.province.value if self.road_level == ChinaMainlandRoadLevel.PROVINCIAL_EXPWY else None
         name = self.name if with_name else None
-        return generate_expwy_pad(self.code, province, name)
+        return get_sign_renderer().expwy_pad(self.code, province, name)
 
     def to_svg_file(self, path: str, with_name: bool = False):
         self.to_svg(with_name).saveas(path)
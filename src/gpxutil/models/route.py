@@ -1,15 +1,18 @@
 import json
 import sqlite3
+from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Any
+from typing import Optional, Any, Iterable, Iterator
 
 import gpxpy
 from geopandas import GeoDataFrame
+import numpy as np
 from shapely.geometry.point import Point
 from tqdm import tqdm
 
 from src.gpxutil.core.config import CONFIG_HANDLER
+from src.gpxutil.models.route_columns import RouteColumns, ROUTE_POINT_FIELDS
 from src.gpxutil.utils import csv_util
 from src.gpxutil.utils.data_type_processor import process_or_none, float_or_none
 from src.gpxutil.utils.datetime_util import datetime_yyyymmdd_slash_time_microsecond_tz
@@ -22,9 +25,15 @@ if CONFIG_HANDLER.config.area_info.baidu:
     from src.gpxutil.utils.geocoding.baidu import get_point_info as get_point_info_baidu
 if CONFIG_HANDLER.config.area_info.amap:
     from src.gpxutil.utils.geocoding.amap import get_point_info as get_point_info_amap
-from src.gpxutil.utils.route_util import calculate_bearing
-from src.gpxutil.utils.geocoding.gdf.area_info import get_area_info
-from src.gpxutil.utils.gpx_convert import convert_single_point
+from src.gpxutil.utils.route_util import calculate_kinematics, heading_runs
+from src.gpxutil.utils.geocoding.cache import log_cache_stats
+from src.gpxutil.utils.geocoding.executor import geocode_points, geocode_route
+from src.gpxutil.utils.geocoding.gdf.area_info import get_area_info, get_area_info_many
+from src.gpxutil.utils.geocoding.journal import GeocodingJournal
+from src.gpxutil.utils.geocoding.road.road_handler import RoadIndexHandler
+from src.gpxutil.utils.geocoding.road.road_index import RoadIndex
+from src.gpxutil.utils.gpx_convert import convert_single_point, convert_points
+from src.gpxutil.utils.gpx_reader import TrackPointBatch, read_track_points
 from loguru import logger
 
 
@@ -303,19 +312,96 @@ class RoutePoint:
         )
 
 
-@dataclass
+class RoutePointView(RoutePoint):
+    """
+    行程中某个点的视图。读写属性即读写 Route 中对应列的对应行，不单独保存数据。
+    """
+
+    def __init__(self, columns: RouteColumns, row: int):
+        self._columns = columns
+        self._row = row
+
+    def to_point(self) -> RoutePoint:
+        """
+        复制为独立的 RoutePoint。
+        :return: RoutePoint
+        """
+        return RoutePoint(**{name: getattr(self, name) for name in ROUTE_POINT_FIELDS})
+
+
+def _column_property(name: str) -> property:
+    return property(
+        lambda self: self._columns.get(name, self._row),
+        lambda self, value: self._columns.set(name, self._row, value),
+    )
+
+
+for _field_name in ROUTE_POINT_FIELDS:
+    setattr(RoutePointView, _field_name, _column_property(_field_name))
+
+
+class RoutePointSequence(Sequence):
+    """
+    Route.points 的返回值。按下标取出的是 RoutePointView。
+    """
+
+    def __init__(self, columns: RouteColumns):
+        self._columns = columns
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    def __getitem__(self, item: int | slice) -> RoutePointView | list[RoutePointView]:
+        if isinstance(item, slice):
+            return [RoutePointView(self._columns, row) for row in range(*item.indices(len(self)))]
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError('route point index out of range')
+        return RoutePointView(self._columns, item)
+
+
 class Route:
     """
-    行程
+    行程。各点的数据按列存放在 columns 中，points 提供逐点访问的视图。
     """
-    points: list[RoutePoint]
-    """行程中的点"""
 
-    coordinate_type: Optional[str] = None
-    """原始类型"""
+    def __init__(
+            self, points: Iterable[RoutePoint] = None,
+            coordinate_type: Optional[str] = None, transformed_coordinate_type: Optional[str] = None,
+            columns: RouteColumns = None
+    ):
+        """
+        :param points: 行程中的点。与 columns 二选一
+        :param coordinate_type: 原始类型
+        :param transformed_coordinate_type: 坐标转换后类型
+        :param columns: 列式存储的点数据。与 points 二选一
+        """
+        self.columns: RouteColumns = columns if columns is not None else RouteColumns.from_records(points or [])
+        """行程中的点（列式存储）"""
+
+        self.coordinate_type = coordinate_type
+        """原始类型"""
+
+        self.transformed_coordinate_type = transformed_coordinate_type
+        """坐标转换后类型"""
+
+    @property
+    def points(self) -> RoutePointSequence:
+        """行程中的点"""
+        return RoutePointSequence(self.columns)
+
+    @points.setter
+    def points(self, points: Iterable[RoutePoint]):
+        self.columns = RouteColumns.from_records(points)
 
-    transformed_coordinate_type: Optional[str] = None
-    """坐标转换后类型"""
+    def iter_points(self) -> Iterator[RoutePoint]:
+        """
+        逐个产出各点的独立副本，批量导出时比逐个读取视图快。
+        :return: Iterator[RoutePoint]
+        """
+        for row in self.columns.iter_rows():
+            yield RoutePoint(**row)
 
     def transform_coordinate(self, force: bool = False):
         """
@@ -324,20 +410,284 @@ class Route:
         :return: None
         """
         # list(map(lambda point: point.transform_coordinate(coordinate_type, transformed_coordinate_type, force), self.points))
-        for point in tqdm(self.points, total=len(self.points), desc="Transform Coordinate", unit='point(s)'):
-            point.transform_coordinate(self.coordinate_type, self.transformed_coordinate_type, force)
+        if self.coordinate_type == self.transformed_coordinate_type:
+            return
+        longitude = self.columns.floats['longitude']
+        latitude = self.columns.floats['latitude']
+        longitude_transformed = self.columns.floats['longitude_transformed']
+        latitude_transformed = self.columns.floats['latitude_transformed']
+        if force:
+            rows = np.arange(len(self.columns))
+        else:
+            rows = np.flatnonzero(np.isnan(longitude_transformed) | np.isnan(latitude_transformed))
+        longitude_transformed[rows], latitude_transformed[rows] = convert_points(
+            longitude[rows], latitude[rows], self.coordinate_type, self.transformed_coordinate_type
+        )
 
-    def set_area(self, source: str = None, area_gdf_list: list[GeoDataFrame] = None, area_code_conn: sqlite3.Connection = None, force: bool = False):
+    def set_area(self, source: str = None, area_gdf_list: list[GeoDataFrame] = None, area_code_conn: sqlite3.Connection = None, force: bool = False,
+                 gdf_bisect_step: int = None,
+                 nominatim_url: str = None, map_api_ak: str = None, map_freq: int = None, baidu_get_en_result: bool = None,
+                 journal: GeocodingJournal = None):
         """
-        填写行政区划。目前的做法是：加载各地区的 geojson 文件（area_gdf_list），判断点属于哪个地区的，得到编码，在给定的 SQLite 文件中找到对应编码的行政区划。
+        填写行政区划。
+        如果从 GDF 获取数据，则加载各地区的 geojson 文件（area_gdf_list），判断点属于哪个地区的，得到编码，在给定的 SQLite 文件中找到对应编码的行政区划。
+        hybrid 时行政区划从 GDF 获取，道路从 API 获取。否则通过 API 并发获取。
+        :param source: 行政区划数据来源。默认从配置文件中读取来源。
         :param area_gdf_list: 各地区的 geojson 文件转换为 GeoDataFrame 后的列表
         :param area_code_conn: 存放行政区划代码关系的 SQLite 数据库连接
         :param force: 对已经填写地区的点，是否覆盖内容
+        :param gdf_bisect_step: 从 GDF 获取行政区划时，每隔多少个点判断一次，只在结果变化处二分查找边界。为空时判断每个点
+        :param nominatim_url: Nominatim API 地址，默认从配置文件中读取
+        :param map_api_ak: 百度、高德地图 API 的密钥，默认从配置文件中读取
+        :param map_freq: 百度、高德地图 API 的每秒请求数上限，默认从配置文件中读取
+        :param baidu_get_en_result: 百度地图是否获取英文名，默认从配置文件中读取
+        :param journal: 通过 API 获取时的断点记录，已记录的点不再请求
+        :return: None
+        """
+        if source is None:
+            source = CONFIG_HANDLER.config.area_info.use
+        if force:
+            rows = np.arange(len(self.columns))
+        else:
+            rows = np.flatnonzero(np.logical_or.reduce([
+                self.columns.categoricals[name].codes < 0 for name in ('province', 'city', 'area')
+            ]))
+        if source == 'gdf':
+            self._set_area_from_gdf(rows, area_gdf_list, area_code_conn, gdf_bisect_step)
+        elif source == 'hybrid':
+            self._set_area_from_hybrid(
+                rows, area_gdf_list, area_code_conn, gdf_bisect_step, force,
+                nominatim_url=nominatim_url, map_api_ak=map_api_ak, map_freq=map_freq,
+                baidu_get_en_result=baidu_get_en_result, journal=journal,
+            )
+        else:
+            self._set_area_from_api(
+                rows, source, force,
+                nominatim_url=nominatim_url, map_api_ak=map_api_ak, map_freq=map_freq,
+                baidu_get_en_result=baidu_get_en_result, journal=journal,
+            )
+
+    def _set_area_from_api(self, rows: np.ndarray, source: str, force: bool = False, **kwargs):
+        """
+        通过 API 并发获取指定行的行政区划和道路，结果按行顺序写回。按配置的距离、时间间隔取点请求，见 geocode_route。
+        与 RoutePoint.set_area 一致，行政区划、道路名变化时清空对应的英文名；force 时写入英文名。
+        :param rows: 行下标数组
+        :param source: 行政区划数据来源，nominatim / baidu / amap
+        :param force: 是否写入英文名
+        :param kwargs: 传给 geocode_route 的参数
+        :return: None
+        """
+        if len(rows) == 0:
+            return
+        area_infos = geocode_route(
+            source, self.columns.floats['latitude'][rows], self.columns.floats['longitude'][rows],
+            self.columns.floats['distance'][rows], self.columns.floats['elapsed_time'][rows],
+            indices=self.columns.index[rows], **kwargs
+        )
+        for name in ('province', 'city', 'area', 'road_name'):
+            column = self.columns.categoricals[name]
+            old_codes = column.codes[rows]
+            column.set_values(rows, [area_info.get(name) for area_info in area_infos])
+            self.columns.categoricals[f'{name}_en'].fill(rows[column.codes[rows] != old_codes], None)
+            if force:
+                self.columns.categoricals[f'{name}_en'].set_values(rows, [area_info.get(f'{name}_en') for area_info in area_infos])
+        self.columns.categoricals['road_num'].set_values(rows, [area_info.get('road_num') for area_info in area_infos])
+        log_cache_stats()
+
+    def _set_area_from_hybrid(self, rows: np.ndarray, area_gdf_list: list[GeoDataFrame], area_code_conn: sqlite3.Connection,
+                              gdf_bisect_step: int = None, force: bool = False, road_source: str = None,
+                              journal: GeocodingJournal = None, **kwargs):
+        """
+        行政区划从 GDF 批量获取，道路名称、编号从 API 获取。
+        所在地区不变、方向变化不超过 heading_tolerance 度、长度不超过 max_run_distance 米的一段认为在同一条道路上（见 heading_runs），
+        每段只请求中间一个点，结果沿用到整段。
+        :param rows: 行下标数组
+        :param area_gdf_list: 各地区的 geojson 文件转换为 GeoDataFrame 后的列表
+        :param area_code_conn: 存放行政区划代码关系的 SQLite 数据库连接
+        :param gdf_bisect_step: 每隔多少个点判断一次所在地区，见 get_area_info_many
+        :param force: 是否写入道路的英文名
+        :param road_source: 获取道路的 API，为 osm 时从离线道路数据逐点匹配（见 set_road）。默认从配置文件中读取
+        :param journal: 断点记录，已记录的点不再请求
+        :param kwargs: 传给 geocode_points 的参数
+        :return: None
+        """
+        if len(rows) == 0:
+            return
+        self._set_area_from_gdf(rows, area_gdf_list, area_code_conn, gdf_bisect_step)
+        hybrid_config = CONFIG_HANDLER.config.area_info.hybrid
+        road_source = road_source or hybrid_config.road_source
+        if road_source == 'osm':
+            self._set_road_from_osm(rows)
+            return
+        starts = heading_runs(
+            np.stack([self.columns.categoricals[name].codes[rows] for name in ('province', 'city', 'area')], axis=1),
+            self.columns.floats['course'][rows], self.columns.floats['distance'][rows],
+            hybrid_config.heading_tolerance, hybrid_config.max_run_distance
+        )
+        stops = np.append(starts[1:], len(rows))
+        probe_rows = rows[(starts + stops - 1) // 2]
+        road_infos = geocode_points(
+            road_source, self.columns.floats['latitude'][probe_rows], self.columns.floats['longitude'][probe_rows],
+            indices=self.columns.index[probe_rows], journal=journal, **kwargs
+        )
+        logger.info(f'Requested roads for {len(probe_rows)} of {len(rows)} point(s)')
+        run_indices = np.repeat(np.arange(len(starts)), stops - starts)
+        column = self.columns.categoricals['road_name']
+        old_codes = column.codes[rows]
+        column.set_indexed(rows, run_indices, [road_info.get('road_name') for road_info in road_infos])
+        self.columns.categoricals['road_name_en'].fill(rows[column.codes[rows] != old_codes], None)
+        if force:
+            self.columns.categoricals['road_name_en'].set_indexed(rows, run_indices, [road_info.get('road_name_en') for road_info in road_infos])
+        self.columns.categoricals['road_num'].set_indexed(rows, run_indices, [road_info.get('road_num') for road_info in road_infos])
+        log_cache_stats()
+
+    def set_road(self, road_index: RoadIndex = None, force: bool = False, max_distance: float = None, heading_tolerance: float = None):
+        """
+        从离线道路数据填写道路名称、英文名称和编号：每个点匹配距离阈值内、方向相符的最近一条道路，没有匹配到的点为空。
+        :param road_index: 道路线段的空间索引，默认读取配置文件中的道路存储文件
+        :param force: 对已经填写道路名称的点，是否覆盖内容
+        :param max_distance: 点与道路的最大距离（米），默认从配置文件中读取
+        :param heading_tolerance: 行进方向与道路方向的容差（度），默认从配置文件中读取
         :return: None
         """
-        # list(map(lambda point: point.set_area(area_gdf_list, area_code_conn, force), self.points))
-        for point in tqdm(self.points, total=len(self.points), desc="Set Area", unit='point(s)'):
-            point.set_area(source=source, area_gdf_list=area_gdf_list, area_code_conn=area_code_conn, force=force)
+        if force:
+            rows = np.arange(len(self.columns))
+        else:
+            rows = np.flatnonzero(self.columns.categoricals['road_name'].codes < 0)
+        self._set_road_from_osm(rows, road_index, max_distance, heading_tolerance)
+
+    def _set_road_from_osm(self, rows: np.ndarray, road_index: RoadIndex = None,
+                           max_distance: float = None, heading_tolerance: float = None):
+        """
+        批量从离线道路数据填写指定行的道路，见 set_road。
+        :param rows: 行下标数组
+        :param road_index: 道路线段的空间索引，默认读取配置文件中的道路存储文件
+        :param max_distance: 点与道路的最大距离（米），默认从配置文件中读取
+        :param heading_tolerance: 行进方向与道路方向的容差（度），默认从配置文件中读取
+        :return: None
+        """
+        if len(rows) == 0:
+            return
+        osm_road_config = CONFIG_HANDLER.config.area_info.osm_road
+        if road_index is None:
+            road_index = RoadIndexHandler().index
+        ways = road_index.match_many(
+            self.columns.floats['longitude'][rows], self.columns.floats['latitude'][rows], self.columns.floats['course'][rows],
+            max_distance=max_distance if max_distance is not None else osm_road_config.max_distance,
+            heading_tolerance=heading_tolerance if heading_tolerance is not None else osm_road_config.heading_tolerance,
+        )
+        unique_ways, result_indices = np.unique(ways, return_inverse=True)
+        road_infos = [road_index.road_info(int(way)) for way in unique_ways]
+        logger.info(f'Matched roads for {int(np.count_nonzero(ways >= 0))} of {len(rows)} point(s)')
+        for name in ('road_name', 'road_name_en', 'road_num'):
+            self.columns.categoricals[name].set_indexed(rows, result_indices, [road_info[name] for road_info in road_infos])
+
+    def _set_area_from_gdf(self, rows: np.ndarray, area_gdf_list: list[GeoDataFrame], area_code_conn: sqlite3.Connection,
+                           bisect_step: int = None):
+        """
+        批量从 GDF 填写指定行的行政区划：一次空间查询，一次数据库查询，再把结果广播到各行。
+        与 RoutePoint.set_area 一致，行政区划变化时清空对应的英文名。
+        :param rows: 行下标数组
+        :param area_gdf_list: 各地区的 geojson 文件转换为 GeoDataFrame 后的列表
+        :param area_code_conn: 存放行政区划代码关系的 SQLite 数据库连接
+        :param bisect_step: 每隔多少个点判断一次，见 get_area_info_many
+        :return: None
+        """
+        if len(rows) == 0:
+            return
+        result_indices, results = get_area_info_many(
+            self.columns.floats['longitude'][rows], self.columns.floats['latitude'][rows],
+            area_gdf_list=area_gdf_list, area_code_conn=area_code_conn, bisect_step=bisect_step
+        )
+        for level, name in enumerate(('province', 'city', 'area')):
+            column = self.columns.categoricals[name]
+            old_codes = column.codes[rows]
+            column.set_indexed(rows, result_indices, [result[level] if result is not None else None for result in results])
+            self.columns.categoricals[f'{name}_en'].fill(rows[column.codes[rows] != old_codes], None)
+
+    @staticmethod
+    def from_track_points(
+            track_points: TrackPointBatch,
+            transform_coordinate: bool = False, coordinate_type: str = None, transformed_coordinate_type: str = None,
+            set_area: bool = False, source: str = None,
+            nominatim_url: str = None,
+            area_gdf_list: list[GeoDataFrame] = None, area_code_conn: sqlite3.Connection = None,
+            map_api_ak: str = None, map_freq: int = None, baidu_get_en_result: bool = None,
+            gdf_bisect_step: int = None, journal: GeocodingJournal = None,
+    ) -> 'Route':
+        """
+        从按列存放的轨迹点导入数据：计算距离、速度、方向，转换坐标，填写行政区划
+        :param track_points: 轨迹点
+        :param transform_coordinate: 是否转换坐标
+        :param coordinate_type: 原坐标类型。transform_coordinate == True 时必填
+        :param transformed_coordinate_type: 转换后坐标类型。transform_coordinate == True 时必填
+        :param set_area: 是否填写行政区划
+        :param source: 行政区划数据来源。默认从配置文件中读取来源。
+        :param area_gdf_list: 各地区的 geojson 文件转换为 GeoDataFrame 后的列表。set_area == True，且不从 Nominatim 获取数据时必填
+        :param area_code_conn: 存放行政区划代码关系的 SQLite 数据库连接。set_area == True，且不从 Nominatim 获取数据时必填
+        :param gdf_bisect_step: 从 GDF 获取行政区划时，每隔多少个点判断一次，只在结果变化处二分查找边界。为空时判断每个点
+        :param journal: 通过 API 获取行政区划时的断点记录，已记录的点不再请求
+        :return: Route
+        """
+        if source is None:
+            source = CONFIG_HANDLER.config.area_info.use
+        if transform_coordinate is True and (coordinate_type is None or transformed_coordinate_type is None):
+            raise AttributeError("transform_coordinate is True, but coordinate_type or transformed_coordinate_type is None")
+        if set_area is True and source in ('gdf', 'hybrid') and (area_gdf_list is None or area_code_conn is None):
+            raise AttributeError(f"set_area is True and source == '{source}', but area_gdf_list or area_code_conn is None")
+        size = len(track_points)
+        columns = RouteColumns(size, track_points.time_tz)
+        columns.index = np.arange(size, dtype=np.int64)
+        columns.time = track_points.time
+        latitude = track_points.latitude
+        longitude = track_points.longitude
+        elevation = track_points.elevation
+
+        kinematics = calculate_kinematics(latitude, longitude, elevation, columns.time, track_points.course)
+        for index in np.flatnonzero(~kinematics.keep):
+            logger.warning(f"The time difference between the point and its previous point is 0, skipped: "
+                           f"index {index}, ({latitude[index]}, {longitude[index]}), time {columns.get('time', index)}")
+        columns.floats['latitude'] = latitude
+        columns.floats['longitude'] = longitude
+        columns.floats['elevation'] = elevation
+        columns.floats['elapsed_time'] = kinematics.elapsed_time
+        columns.floats['distance'] = kinematics.distance
+        columns.floats['speed'] = kinematics.speed
+        columns.floats['course'] = kinematics.course
+        columns = columns.take(kinematics.keep)
+        latitude = columns.floats['latitude']
+        longitude = columns.floats['longitude']
+
+        if transform_coordinate:
+            columns.floats['longitude_transformed'], columns.floats['latitude_transformed'] = convert_points(
+                longitude, latitude, coordinate_type, transformed_coordinate_type
+            )
+        else:
+            columns.floats['longitude_transformed'] = longitude.copy()
+            columns.floats['latitude_transformed'] = latitude.copy()
+
+        route = Route(
+            columns=columns,
+            coordinate_type=coordinate_type if transform_coordinate else None,
+            transformed_coordinate_type=transformed_coordinate_type if transform_coordinate else None,
+        )
+
+        if set_area and source == 'gdf':
+            route._set_area_from_gdf(np.arange(len(columns)), area_gdf_list, area_code_conn, gdf_bisect_step)
+        elif set_area and source == 'hybrid':
+            route._set_area_from_hybrid(
+                np.arange(len(columns)), area_gdf_list, area_code_conn, gdf_bisect_step, force=True,
+                nominatim_url=nominatim_url, map_api_ak=map_api_ak, map_freq=map_freq,
+                baidu_get_en_result=baidu_get_en_result, journal=journal,
+            )
+        elif set_area:
+            route._set_area_from_api(
+                np.arange(len(columns)), source, force=True,
+                nominatim_url=nominatim_url, map_api_ak=map_api_ak, map_freq=map_freq,
+                baidu_get_en_result=baidu_get_en_result, journal=journal,
+            )
+
+        return route
 
     @staticmethod
     def from_gpx_obj(
@@ -347,6 +697,7 @@ class Route:
             nominatim_url: str = None,
             area_gdf_list: list[GeoDataFrame] = None, area_code_conn: sqlite3.Connection = None,
             map_api_ak: str = None, map_freq: int = None, baidu_get_en_result: bool = None,
+            gdf_bisect_step: int = None, journal: GeocodingJournal = None,
     ) -> 'Route':
         """
         从 GPX 对象导入数据
@@ -360,116 +711,19 @@ class Route:
         :param source: 行政区划数据来源。默认从配置文件中读取来源。
         :param area_gdf_list: 各地区的 geojson 文件转换为 GeoDataFrame 后的列表。set_area == True，且不从 Nominatim 获取数据时必填
         :param area_code_conn: 存放行政区划代码关系的 SQLite 数据库连接。set_area == True，且不从 Nominatim 获取数据时必填
+        :param gdf_bisect_step: 从 GDF 获取行政区划时，每隔多少个点判断一次，只在结果变化处二分查找边界。为空时判断每个点
+        :param journal: 通过 API 获取行政区划时的断点记录，已记录的点不再请求
         :return: Route
         """
-        if source is None:
-            source = CONFIG_HANDLER.config.area_info.use
-        if transform_coordinate is True and (coordinate_type is None or transformed_coordinate_type is None):
-            raise AttributeError("transform_coordinate is True, but coordinate_type or transformed_coordinate_type is None")
-        if set_area is True and source == 'gdf' and (area_gdf_list is None or area_code_conn is None):
-            raise AttributeError("set_area is True and source == 'gdf', but area_gdf_list or area_code_conn is None")
         segment = gpx.tracks[track_index].segments[segment_index]
-        first_point = segment.points[0]
-        course = 0
-        total_distance = 0
-        ret_list: list[RoutePoint] = []
-
-        for index, point in tqdm(enumerate(segment.points), total=len(segment.points), desc="Processing GPX Points",
-                                 unit='point(s)'):
-            if transform_coordinate:
-                transformed_coordinate = convert_single_point(point.longitude, point.latitude,
-                                                              coordinate_type,
-                                                              transformed_coordinate_type)
-            else:
-                transformed_coordinate = (point.longitude, point.latitude)
-            if set_area:
-                match source:
-                    case 'nominatim':
-                        area_info = get_point_info_nominatim(point.latitude, point.longitude, host=nominatim_url)
-                    case 'baidu':
-                        area_info = get_point_info_baidu(point.latitude, point.longitude, ak=map_api_ak, freq=map_freq, get_en_result=baidu_get_en_result)
-                    case 'amap':
-                        area_info = get_point_info_amap(point.latitude, point.longitude, ak=map_api_ak, freq=map_freq)
-                    case 'gdf':
-                        area_info = get_area_info(Point(point.longitude, point.latitude), area_gdf_list=area_gdf_list,
-                                                  area_code_conn=area_code_conn)
-                    case _:
-                        raise ValueError('Invalid source: %s' % source)
-                if source == 'gdf':
-                    province_result = area_info[0] if area_info is not None else None
-                    city_result = area_info[1] if area_info is not None else None
-                    area_result = area_info[2] if area_info is not None else None
-                    road_num_result = None
-                    road_name_result = None
-                    province_en_result = None
-                    city_en_result = None
-                    area_en_result = None
-                    road_name_en_result = None
-                else:
-                    province_result = area_info['province']
-                    city_result = area_info['city']
-                    area_result = area_info['area']
-                    road_num_result = area_info['road_num']
-                    road_name_result = area_info['road_name']
-                    province_en_result = area_info['province_en']
-                    city_en_result = area_info['city_en']
-                    area_en_result = area_info['area_en']
-                    road_name_en_result = area_info['road_name_en']
-            else:
-                province_result = None
-                city_result = None
-                area_result = None
-                road_num_result = None
-                road_name_result = None
-                province_en_result = None
-                city_en_result = None
-                area_en_result = None
-                road_name_en_result = None
-            if index > 0:
-                # distance = calculate_distance(segment.points[index - 1], point)
-                prev_point = segment.points[index - 1]
-                distance = point.distance_3d(prev_point)
-                if point.time_difference(prev_point) == 0:
-                    logger.warning(f"The time difference between the point and its previous point is 0, skipped: {point}")
-                    continue
-                speed = distance / point.time_difference(prev_point)
-                if point.course:
-                    course = point.course
-                else:
-                    course_tmp = calculate_bearing(prev_point, point)
-                    if course_tmp != 0:
-                        course = course_tmp
-                total_distance += distance
-            else:
-                distance = 0
-                speed = 0
-                course = 0
-            ret_list.append(RoutePoint(
-                index=index,
-                time=point.time,
-                elapsed_time=point.time_difference(first_point),
-                longitude=point.longitude,
-                latitude=point.latitude,
-                longitude_transformed=transformed_coordinate[0],
-                latitude_transformed=transformed_coordinate[1],
-                elevation=point.elevation,
-                distance=total_distance,
-                course=course,
-                speed=speed,
-                province=province_result,
-                city=city_result,
-                area=area_result,
-                road_num=road_num_result,
-                road_name=road_name_result,
-                province_en=province_en_result,
-                city_en=city_en_result,
-                area_en=area_en_result,
-                road_name_en=road_name_en_result
-            ))
-        return Route(
-            points=ret_list,
-            coordinate_type=coordinate_type if transform_coordinate else None,
-            transformed_coordinate_type=transformed_coordinate_type if transform_coordinate else None,
+        return Route.from_track_points(
+            TrackPointBatch.from_gpx_points(segment.points),
+            transform_coordinate, coordinate_type, transformed_coordinate_type,
+            set_area, source,
+            nominatim_url=nominatim_url,
+            area_gdf_list=area_gdf_list, area_code_conn=area_code_conn,
+            map_api_ak=map_api_ak, map_freq=map_freq, baidu_get_en_result=baidu_get_en_result,
+            gdf_bisect_step=gdf_bisect_step, journal=journal,
         )
 
     @staticmethod
@@ -491,9 +745,10 @@ class Route:
             nominatim_url: str = None,
             area_gdf_list: list[GeoDataFrame] = None, area_code_conn: sqlite3.Connection = None,
             map_api_ak: str = None, map_freq: int = None, baidu_get_en_result: bool = None,
+            gdf_bisect_step: int = None, journal: GeocodingJournal = None,
     ) -> 'Route':
         """
-        从 GPX 文件导入数据
+        从 GPX 文件导入数据。文件以流式读取，不构建完整的 GPX 对象
         :param gpx_file_path: GPX 文件路径
         :param track_index: track 序号
         :param segment_index: segment 序号
@@ -504,11 +759,20 @@ class Route:
         :param source: 行政区划数据来源。默认从配置文件中读取来源。
         :param area_gdf_list: 各地区的 geojson 文件转换为 GeoDataFrame 后的列表。set_area == True，且不从 Nominatim 获取数据时必填
         :param area_code_conn: 存放行政区划代码关系的 SQLite 数据库连接。set_area == True，且不从 Nominatim 获取数据时必填
+        :param gdf_bisect_step: 从 GDF 获取行政区划时，每隔多少个点判断一次，只在结果变化处二分查找边界。为空时判断每个点
+        :param journal: 通过 API 获取行政区划时的断点记录，已记录的点不再请求
         :return: Route
         """
-        with open(gpx_file_path, 'r') as gpx_file:
-            gpx = gpxpy.parse(gpx_file)
-            return Route.from_gpx_obj(gpx, track_index, segment_index, transform_coordinate, coordinate_type, transformed_coordinate_type, set_area, source=source, area_gdf_list=area_gdf_list, area_code_conn=area_code_conn)
+        track_points = read_track_points(gpx_file_path, track_index, segment_index)
+        return Route.from_track_points(
+            track_points,
+            transform_coordinate, coordinate_type, transformed_coordinate_type,
+            set_area, source,
+            nominatim_url=nominatim_url,
+            area_gdf_list=area_gdf_list, area_code_conn=area_code_conn,
+            map_api_ak=map_api_ak, map_freq=map_freq, baidu_get_en_result=baidu_get_en_result,
+            gdf_bisect_step=gdf_bisect_step, journal=journal,
+        )
 
     @staticmethod
     def from_gpx_file_raw(gpx_file_path: str, track_index: int = 0, segment_index: int = 0) -> 'Route':
@@ -530,7 +794,7 @@ class Route:
         gpx = gpxpy.gpx.GPX()
         gpx_track = gpxpy.gpx.GPXTrack()
         gpx_segment = gpxpy.gpx.GPXTrackSegment()
-        for point in self.points:
+        for point in self.iter_points():
             if export_transformed_coordinate:
                 lat = point.latitude_transformed
                 lon = point.longitude_transformed
@@ -564,7 +828,7 @@ class Route:
         :return: dict[str, Any]
         """
         return {
-            'points': [point.to_json_dict_obj() for point in self.points],
+            'points': [point.to_json_dict_obj() for point in self.iter_points()],
             'coordinate_type': self.coordinate_type,
             'transformed_coordinate_type': self.transformed_coordinate_type,
         }
@@ -613,7 +877,7 @@ class Route:
         将点转换为 CSV 格式的文件。
         为确保文件能够直接被 Excel 等表格软件打开，指定编码为带 BOM 的 UTF-8
         """
-        csv_dict_list = [point.to_csv_dict_obj() for point in self.points]
+        csv_dict_list = [point.to_csv_dict_obj() for point in self.iter_points()]
         csv_util.dict_list_to_csv(csv_dict_list, csv_file_path, encoding='utf-8-sig')
 
     @staticmethod
@@ -0,0 +1,339 @@
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any, Iterable, Iterator, Optional
+
+import numpy as np
+
+
+INDEX_FIELD = 'index'
+"""点序号列，int64 存储，-1 表示空"""
+
+TIME_FIELD = 'time'
+"""时间列，datetime64[us] 存储（UTC），NaT 表示空"""
+
+FLOAT_FIELDS = (
+    'elapsed_time',
+    'longitude',
+    'latitude',
+    'longitude_transformed',
+    'latitude_transformed',
+    'elevation',
+    'distance',
+    'course',
+    'speed',
+)
+"""浮点数列，float64 存储，NaN 表示空"""
+
+CATEGORICAL_FIELDS = (
+    'province',
+    'city',
+    'area',
+    'province_en',
+    'city_en',
+    'area_en',
+    'road_num',
+    'road_name',
+    'road_name_en',
+    'memo',
+)
+"""字符串列，字典编码存储。相邻的点大多取值相同，故只存一份字符串，各点存编码"""
+
+ROUTE_POINT_FIELDS = (INDEX_FIELD, TIME_FIELD) + FLOAT_FIELDS + CATEGORICAL_FIELDS
+"""RoutePoint 的全部字段，顺序与 RoutePoint 定义一致"""
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def datetimes_to_datetime64(values: Iterable[Optional[datetime]], count: int = -1) -> tuple[np.ndarray, Optional[tzinfo]]:
+    """
+    将时间序列转为 datetime64[us] 数组。带时区的时间统一转为 UTC 存储。
+    :param values: 时间序列，元素可以为 None
+    :param count: 序列长度，已知时填写可以减少内存分配
+    :return: datetime64[us] 数组，以及第一个带时区的时间的时区（没有则为 None）
+    """
+    time_tz = None
+
+    def to_datetime64(value: Optional[datetime]) -> np.datetime64:
+        nonlocal time_tz
+        if value is None:
+            return np.datetime64('NaT')
+        if value.tzinfo is not None:
+            if time_tz is None:
+                time_tz = value.tzinfo
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return np.datetime64(value, 'us')
+
+    return np.fromiter((to_datetime64(value) for value in values), dtype='datetime64[us]', count=count), time_tz
+
+
+class CategoricalColumn:
+    """
+    字典编码的字符串列。codes 中存放 categories 的下标，-1 表示 None。
+    """
+
+    def __init__(self, codes: np.ndarray = None, categories: list[str] = None):
+        self.codes = codes if codes is not None else np.empty(0, dtype=np.int32)
+        self.categories = categories if categories is not None else []
+        self._lookup = {value: code for code, value in enumerate(self.categories)}
+
+    @staticmethod
+    def empty(size: int) -> 'CategoricalColumn':
+        """
+        生成全为 None 的列。
+        :param size: 行数
+        :return: CategoricalColumn
+        """
+        return CategoricalColumn(np.full(size, -1, dtype=np.int32))
+
+    @staticmethod
+    def from_values(values: Iterable[Optional[str]]) -> 'CategoricalColumn':
+        """
+        从字符串序列生成列。
+        :param values: 字符串序列，元素可以为 None
+        :return: CategoricalColumn
+        """
+        column = CategoricalColumn()
+        column.codes = np.fromiter((column.code_of(value) for value in values), dtype=np.int32)
+        return column
+
+    def code_of(self, value: Optional[str]) -> int:
+        """
+        获取字符串对应的编码，不存在则新增。
+        :param value: 字符串
+        :return: 编码
+        """
+        if value is None:
+            return -1
+        code = self._lookup.get(value)
+        if code is None:
+            code = len(self.categories)
+            self.categories.append(value)
+            self._lookup[value] = code
+        return code
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, row: int) -> Optional[str]:
+        code = self.codes[row]
+        return self.categories[code] if code >= 0 else None
+
+    def __setitem__(self, row: int, value: Optional[str]):
+        self.codes[row] = self.code_of(value)
+
+    def fill(self, rows, value: Optional[str]):
+        """
+        将若干行设为同一个值。
+        :param rows: 行下标（数组、切片或布尔掩码）
+        :param value: 字符串
+        :return: None
+        """
+        self.codes[rows] = self.code_of(value)
+
+    def set_values(self, rows, values: Iterable[Optional[str]]):
+        """
+        将若干行逐一设为给定的值。
+        :param rows: 行下标（数组、切片或布尔掩码）
+        :param values: 与 rows 等长的字符串序列
+        :return: None
+        """
+        self.codes[rows] = np.fromiter((self.code_of(value) for value in values), dtype=np.int32)
+
+    def set_indexed(self, rows, indices: np.ndarray, values: list[Optional[str]]):
+        """
+        将若干行分别设为 values[indices[i]]。用于把少量不同的结果广播到大量的行。
+        :param rows: 行下标（数组、切片或布尔掩码）
+        :param indices: 与 rows 等长的下标数组
+        :param values: 取值列表
+        :return: None
+        """
+        codes = np.fromiter((self.code_of(value) for value in values), dtype=np.int32, count=len(values))
+        self.codes[rows] = codes[indices]
+
+    def take(self, rows) -> 'CategoricalColumn':
+        """
+        取出若干行组成新列，共用字典。
+        :param rows: 行下标（数组、切片或布尔掩码）
+        :return: CategoricalColumn
+        """
+        return CategoricalColumn(self.codes[rows].copy(), list(self.categories))
+
+    def to_list(self) -> list[Optional[str]]:
+        """
+        解码为字符串列表。
+        :return: list[Optional[str]]
+        """
+        # 末尾补一个 None，编码 -1 正好取到它
+        lookup = np.array(self.categories + [None], dtype=object)
+        return lookup[self.codes].tolist()
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + sum(len(value.encode('utf-8')) for value in self.categories)
+
+
+class RouteColumns:
+    """
+    行程中各点的列式存储。每个字段一列，行与点一一对应。
+    """
+
+    def __init__(self, size: int = 0, time_tz: Optional[tzinfo] = None):
+        """
+        生成全为空值的列。
+        :param size: 行数
+        :param time_tz: 时间列读出时使用的时区。为 None 时读出不带时区的时间
+        """
+        self.index = np.full(size, -1, dtype=np.int64)
+        self.time = np.full(size, np.datetime64('NaT'), dtype='datetime64[us]')
+        self.time_tz = time_tz
+        self.floats: dict[str, np.ndarray] = {name: np.full(size, np.nan) for name in FLOAT_FIELDS}
+        self.categoricals: dict[str, CategoricalColumn] = {name: CategoricalColumn.empty(size) for name in CATEGORICAL_FIELDS}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def column(self, name: str) -> np.ndarray | CategoricalColumn:
+        """
+        获取某个字段对应的列。
+        :param name: 字段名
+        :return: np.ndarray 或 CategoricalColumn
+        """
+        if name == INDEX_FIELD:
+            return self.index
+        if name == TIME_FIELD:
+            return self.time
+        if name in self.floats:
+            return self.floats[name]
+        return self.categoricals[name]
+
+    def get(self, name: str, row: int) -> Any:
+        """
+        读取某行某字段的值，空值读为 None。
+        :param name: 字段名
+        :param row: 行号
+        :return: Any
+        """
+        if name == INDEX_FIELD:
+            value = int(self.index[row])
+            return value if value >= 0 else None
+        if name == TIME_FIELD:
+            return self._time_from_datetime64(self.time[row])
+        if name in self.floats:
+            value = float(self.floats[name][row])
+            return value if value == value else None
+        return self.categoricals[name][row]
+
+    def set(self, name: str, row: int, value: Any):
+        """
+        写入某行某字段的值，None 写为空值。
+        :param name: 字段名
+        :param row: 行号
+        :param value: 值
+        :return: None
+        """
+        if name == INDEX_FIELD:
+            self.index[row] = value if value is not None else -1
+        elif name == TIME_FIELD:
+            self.time[row] = self._time_to_datetime64(value)
+        elif name in self.floats:
+            self.floats[name][row] = value if value is not None else np.nan
+        else:
+            self.categoricals[name][row] = value
+
+    def _time_to_datetime64(self, value: Optional[datetime]) -> np.datetime64:
+        if value is None:
+            return np.datetime64('NaT')
+        if value.tzinfo is not None:
+            if self.time_tz is None:
+                self.time_tz = value.tzinfo
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return np.datetime64(value, 'us')
+
+    def _time_from_datetime64(self, value: np.datetime64) -> Optional[datetime]:
+        if np.isnat(value):
+            return None
+        return self._attach_tz(_EPOCH + timedelta(microseconds=int(value.astype(np.int64))))
+
+    def _attach_tz(self, value: datetime) -> datetime:
+        if self.time_tz is None:
+            return value
+        offset = self.time_tz.utcoffset(value) or timedelta(0)
+        return (value + offset).replace(tzinfo=self.time_tz)
+
+    def set_times(self, values: Iterable[Optional[datetime]]):
+        """
+        批量写入时间列。
+        :param values: 与行数等长的时间序列
+        :return: None
+        """
+        self.time, time_tz = datetimes_to_datetime64(values, len(self))
+        if self.time_tz is None:
+            self.time_tz = time_tz
+
+    def times(self) -> list[Optional[datetime]]:
+        """
+        批量读出时间列。
+        :return: list[Optional[datetime]]
+        """
+        return [self._attach_tz(value) if value is not None else None for value in self.time.tolist()]
+
+    def to_lists(self) -> dict[str, list[Any]]:
+        """
+        将各列转为 Python 列表，空值为 None。用于批量导出。
+        :return: dict[str, list[Any]]
+        """
+        ret = {
+            INDEX_FIELD: [value if value >= 0 else None for value in self.index.tolist()],
+            TIME_FIELD: self.times(),
+        }
+        for name, values in self.floats.items():
+            ret[name] = [value if value == value else None for value in values.tolist()]
+        for name, values in self.categoricals.items():
+            ret[name] = values.to_list()
+        return ret
+
+    def iter_rows(self) -> Iterator[dict[str, Any]]:
+        """
+        逐行产出 {字段名: 值} 字典。
+        :return: Iterator[dict[str, Any]]
+        """
+        lists = self.to_lists()
+        names = list(lists.keys())
+        for values in zip(*lists.values()):
+            yield dict(zip(names, values))
+
+    def take(self, rows) -> 'RouteColumns':
+        """
+        取出若干行组成新的 RouteColumns。
+        :param rows: 行下标（数组、切片或布尔掩码）
+        :return: RouteColumns
+        """
+        ret = RouteColumns(0, self.time_tz)
+        ret.index = self.index[rows].copy()
+        ret.time = self.time[rows].copy()
+        ret.floats = {name: values[rows].copy() for name, values in self.floats.items()}
+        ret.categoricals = {name: values.take(rows) for name, values in self.categoricals.items()}
+        return ret
+
+    @staticmethod
+    def from_records(records: Iterable[Any]) -> 'RouteColumns':
+        """
+        从带有 RoutePoint 各字段属性的对象（如 RoutePoint）生成。
+        :param records: 对象序列
+        :return: RouteColumns
+        """
+        records = list(records)
+        ret = RouteColumns(len(records))
+        ret.index = np.fromiter((record.index if record.index is not None else -1 for record in records),
+                                dtype=np.int64, count=len(records))
+        ret.set_times(record.time for record in records)
+        for name in FLOAT_FIELDS:
+            ret.floats[name] = np.fromiter((getattr(record, name) if getattr(record, name) is not None else np.nan
+                                            for record in records), dtype=np.float64, count=len(records))
+        for name in CATEGORICAL_FIELDS:
+            ret.categoricals[name] = CategoricalColumn.from_values(getattr(record, name) for record in records)
+        return ret
+
+    @property
+    def nbytes(self) -> int:
+        return (self.index.nbytes + self.time.nbytes + sum(values.nbytes for values in self.floats.values())
+                + sum(values.nbytes for values in self.categoricals.values()))
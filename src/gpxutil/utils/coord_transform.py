@@ -0,0 +1,166 @@
+"""
+WGS84、GCJ-02、BD-09 坐标互转的数组版本。
+
+算法与 vendor/coordTransform_py/coordTransform_utils.py 中的逐点函数一致，
+但一次处理整个经纬度数组，输入可以是标量、列表或 np.ndarray，返回 (经度数组, 纬度数组)。
+"""
+
+from typing import Optional
+
+import numpy as np
+
+X_PI = 3.14159265358979324 * 3000.0 / 180.0
+PI = 3.1415926535897932384626
+A = 6378245.0
+"""长半轴"""
+EE = 0.00669342162296594323
+"""偏心率平方"""
+
+GCJ02_TO_WGS84_MAX_ITERATIONS = 10
+"""GCJ-02 转 WGS84 迭代求逆时的最大迭代次数"""
+
+
+def _as_arrays(lng, lat) -> tuple[np.ndarray, np.ndarray]:
+    return np.asarray(lng, dtype=np.float64), np.asarray(lat, dtype=np.float64)
+
+
+def _transform_lat(lng: np.ndarray, lat: np.ndarray) -> np.ndarray:
+    ret = -100.0 + 2.0 * lng + 3.0 * lat + 0.2 * lat * lat + 0.1 * lng * lat + 0.2 * np.sqrt(np.fabs(lng))
+    ret += (20.0 * np.sin(6.0 * lng * PI) + 20.0 * np.sin(2.0 * lng * PI)) * 2.0 / 3.0
+    ret += (20.0 * np.sin(lat * PI) + 40.0 * np.sin(lat / 3.0 * PI)) * 2.0 / 3.0
+    ret += (160.0 * np.sin(lat / 12.0 * PI) + 320 * np.sin(lat * PI / 30.0)) * 2.0 / 3.0
+    return ret
+
+
+def _transform_lng(lng: np.ndarray, lat: np.ndarray) -> np.ndarray:
+    ret = 300.0 + lng + 2.0 * lat + 0.1 * lng * lng + 0.1 * lng * lat + 0.1 * np.sqrt(np.fabs(lng))
+    ret += (20.0 * np.sin(6.0 * lng * PI) + 20.0 * np.sin(2.0 * lng * PI)) * 2.0 / 3.0
+    ret += (20.0 * np.sin(lng * PI) + 40.0 * np.sin(lng / 3.0 * PI)) * 2.0 / 3.0
+    ret += (150.0 * np.sin(lng / 12.0 * PI) + 300.0 * np.sin(lng / 30.0 * PI)) * 2.0 / 3.0
+    return ret
+
+
+def _gcj02_offset(lng: np.ndarray, lat: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """WGS84 坐标加密为 GCJ-02 时的偏移量（不判断是否在中国境内）"""
+    dlat = _transform_lat(lng - 105.0, lat - 35.0)
+    dlng = _transform_lng(lng - 105.0, lat - 35.0)
+    radlat = lat / 180.0 * PI
+    magic = np.sin(radlat)
+    magic = 1 - EE * magic * magic
+    sqrtmagic = np.sqrt(magic)
+    dlat = (dlat * 180.0) / ((A * (1 - EE)) / (magic * sqrtmagic) * PI)
+    dlng = (dlng * 180.0) / (A / sqrtmagic * np.cos(radlat) * PI)
+    return dlng, dlat
+
+
+def out_of_china(lng, lat) -> np.ndarray:
+    """
+    判断各点是否在中国境外（粗略的矩形范围），境外的点不做偏移。
+    :param lng: 经度
+    :param lat: 纬度
+    :return: 布尔数组
+    """
+    lng, lat = _as_arrays(lng, lat)
+    return ~((lng > 73.66) & (lng < 135.05) & (lat > 3.86) & (lat < 53.55))
+
+
+def wgs84_to_gcj02(lng, lat) -> tuple[np.ndarray, np.ndarray]:
+    """
+    WGS84 转 GCJ-02。
+    :param lng: 经度
+    :param lat: 纬度
+    :return: (经度, 纬度)
+    """
+    lng, lat = _as_arrays(lng, lat)
+    dlng, dlat = _gcj02_offset(lng, lat)
+    outside = out_of_china(lng, lat)
+    return np.where(outside, lng, lng + dlng), np.where(outside, lat, lat + dlat)
+
+
+def gcj02_to_wgs84(lng, lat, tolerance: Optional[float] = None,
+                   max_iterations: int = GCJ02_TO_WGS84_MAX_ITERATIONS) -> tuple[np.ndarray, np.ndarray]:
+    """
+    GCJ-02 转 WGS84。
+
+    GCJ-02 没有解析的逆变换。不指定 tolerance 时只做一步近似，结果与逐点函数 gcj02_to_wgs84 一致，误差约 1 米；
+    指定 tolerance 时迭代求逆，直到所有点重新加密后与输入的差都小于 tolerance（度），或达到 max_iterations。
+    :param lng: 经度
+    :param lat: 纬度
+    :param tolerance: 迭代求逆的容差（度），如 1e-9。为 None 时只做一步近似
+    :param max_iterations: 最大迭代次数
+    :return: (经度, 纬度)
+    """
+    lng, lat = _as_arrays(lng, lat)
+    inside = ~out_of_china(lng, lat)
+    wgs_lng = lng.copy()
+    wgs_lat = lat.copy()
+    iterations = 1 if tolerance is None else max_iterations
+    # 从 GCJ-02 坐标出发，不断用“重新加密后的偏差”修正，第一步即为逐点函数中的近似
+    active = inside
+    for _ in range(iterations):
+        dlng, dlat = _gcj02_offset(wgs_lng[active], wgs_lat[active])
+        error_lng = wgs_lng[active] + dlng - lng[active]
+        error_lat = wgs_lat[active] + dlat - lat[active]
+        wgs_lng[active] -= error_lng
+        wgs_lat[active] -= error_lat
+        if tolerance is None:
+            break
+        # 只对未收敛的点继续迭代
+        not_converged = (np.fabs(error_lng) >= tolerance) | (np.fabs(error_lat) >= tolerance)
+        if not not_converged.any():
+            break
+        active_rows = np.flatnonzero(active)[not_converged]
+        active = np.zeros_like(inside)
+        active[active_rows] = True
+    return wgs_lng, wgs_lat
+
+
+def gcj02_to_bd09(lng, lat) -> tuple[np.ndarray, np.ndarray]:
+    """
+    GCJ-02 转 BD-09。
+    :param lng: 经度
+    :param lat: 纬度
+    :return: (经度, 纬度)
+    """
+    lng, lat = _as_arrays(lng, lat)
+    z = np.sqrt(lng * lng + lat * lat) + 0.00002 * np.sin(lat * X_PI)
+    theta = np.arctan2(lat, lng) + 0.000003 * np.cos(lng * X_PI)
+    return z * np.cos(theta) + 0.0065, z * np.sin(theta) + 0.006
+
+
+def bd09_to_gcj02(lng, lat) -> tuple[np.ndarray, np.ndarray]:
+    """
+    BD-09 转 GCJ-02。
+    :param lng: 经度
+    :param lat: 纬度
+    :return: (经度, 纬度)
+    """
+    lng, lat = _as_arrays(lng, lat)
+    x = lng - 0.0065
+    y = lat - 0.006
+    z = np.sqrt(x * x + y * y) - 0.00002 * np.sin(y * X_PI)
+    theta = np.arctan2(y, x) - 0.000003 * np.cos(x * X_PI)
+    return z * np.cos(theta), z * np.sin(theta)
+
+
+def wgs84_to_bd09(lng, lat) -> tuple[np.ndarray, np.ndarray]:
+    """
+    WGS84 转 BD-09。
+    :param lng: 经度
+    :param lat: 纬度
+    :return: (经度, 纬度)
+    """
+    return gcj02_to_bd09(*wgs84_to_gcj02(lng, lat))
+
+
+def bd09_to_wgs84(lng, lat, tolerance: Optional[float] = None,
+                  max_iterations: int = GCJ02_TO_WGS84_MAX_ITERATIONS) -> tuple[np.ndarray, np.ndarray]:
+    """
+    BD-09 转 WGS84。
+    :param lng: 经度
+    :param lat: 纬度
+    :param tolerance: GCJ-02 转 WGS84 迭代求逆的容差（度），见 gcj02_to_wgs84
+    :param max_iterations: 最大迭代次数
+    :return: (经度, 纬度)
+    """
+    return gcj02_to_wgs84(*bd09_to_gcj02(lng, lat), tolerance=tolerance, max_iterations=max_iterations)
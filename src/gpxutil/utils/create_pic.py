@@ -3,9 +3,9 @@ import gc
 import io
 import math
 import os
-import string
+import threading
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import cairosvg
@@ -20,7 +20,10 @@ import imageio
 from moviepy.video.io.ffmpeg_writer import ffmpeg_write_video
 
 from src.gpxutil.core.config import CONFIG_HANDLER
-from .svg_gen import generate_way_num_pad, generate_expwy_pad
+from src.gpxutil.utils.lru_cache import LRUCache
+from .sign_raster_cache import SignRasterCache
+from .svg_gen import get_sign_renderer
+from .sprite_table import RotatedSpriteTable
 
 chinese_font_path = CONFIG_HANDLER.config.video_info_layer.font_path.chinese
 english_font_path = CONFIG_HANDLER.config.video_info_layer.font_path.english
@@ -81,10 +84,6 @@ speed_xy = (3649, 1924)
 # 右上
 speed_unit_xy = (3649, 1997)
 
-# 缓存 SVG 信息，加快路牌生成速度
-road_num_svg_cache = {}
-
-
 def svg_to_img(svg_path):
     svg = cairosvg.svg2png(url=svg_path, dpi=72)
     return Image.open(io.BytesIO(svg))
@@ -95,15 +94,280 @@ def svg_drawing_to_img(svg_drawing: Drawing):
     return Image.open(io.BytesIO(svg))
 
 
+_sign_raster_cache: SignRasterCache = None
+_compass_sprites: RotatedSpriteTable = None
+_route_time_sep_image: Image.Image = None
+_static_images_lock = threading.Lock()
+
+
+def get_sign_raster_cache() -> SignRasterCache:
+    """
+    获取共用的道路编号标志栅格缓存，标志高为 road_sign_height，缓存目录从配置文件中读取。
+    :return: SignRasterCache
+    """
+    global _sign_raster_cache
+    if _sign_raster_cache is None:
+        with _static_images_lock:
+            if _sign_raster_cache is None:
+                _sign_raster_cache = SignRasterCache(
+                    svg_drawing_to_img, road_sign_height, CONFIG_HANDLER.config.video_info_layer.sign_cache_dir
+                )
+    return _sign_raster_cache
+
+
+def get_compass_sprites() -> RotatedSpriteTable:
+    """
+    获取预先旋转的指南针。指南针只栅格化一次，按配置文件中的 compass_angle_step 旋转。
+    :return: RotatedSpriteTable
+    """
+    global _compass_sprites
+    if _compass_sprites is None:
+        with _static_images_lock:
+            if _compass_sprites is None:
+                _compass_sprites = RotatedSpriteTable(
+                    svg_to_img(compass_img_path), CONFIG_HANDLER.config.video_info_layer.compass_angle_step
+                )
+    return _compass_sprites
+
+
+def get_route_time_sep_image() -> Image.Image:
+    """
+    获取已走 / 剩余之间的分隔符图片，只栅格化一次。返回的图片为多处共用，不应修改。
+    :return: image
+    """
+    global _route_time_sep_image
+    if _route_time_sep_image is None:
+        with _static_images_lock:
+            if _route_time_sep_image is None:
+                image = svg_to_img(route_time_sep_img_path)
+                image.load()
+                _route_time_sep_image = image
+    return _route_time_sep_image
+
+
+LAYER_CACHE_SIZE = 256
+"""区域、道路两个图层各缓存的条数"""
+
+Layer = tuple[Image.Image, tuple[int, int]]
+"""图层：裁剪到有内容的区域的图片、在帧中的位置"""
+
+
+def _crop_layer(layer_image: Image.Image) -> Optional[Layer]:
+    """裁剪到有内容（不透明）的区域，没有内容时为 None"""
+    bbox = layer_image.getbbox()
+    if bbox is None:
+        return None
+    return layer_image.crop(bbox), (bbox[0], bbox[1])
+
+
+class FrameCompositor:
+    """
+    信息图的分层合成。
+    - 静态底图：分隔符与单位（m、km/h），按有无对应数据各生成一次；
+    - 中频图层：区域、道路（标志与路名），按内容缓存，内容变化时才重新绘制；
+    - 每帧只在底图的副本上叠加中频图层，绘制指南针和里程、时间、高度、速度的数字。
+    可在多个线程中共用，缓存的图层为多处共用，不应修改。
+    """
+
+    def __init__(self, layer_cache_size: int = LAYER_CACHE_SIZE):
+        """
+        :param layer_cache_size: 区域、道路两个图层各缓存的条数
+        """
+        self._base_layers: dict[tuple[bool, bool, bool], Image.Image] = {}
+        self._base_layers_lock = threading.Lock()
+        self._area_layers = LRUCache('overlay_area_layer', layer_cache_size)
+        self._road_layers = LRUCache('overlay_road_layer', layer_cache_size)
+
+    def _base_layer(self, with_route_time: bool, with_altitude: bool, with_speed: bool) -> Image.Image:
+        """
+        静态底图：分隔符与单位。
+        :param with_route_time: 是否有已走 / 剩余
+        :param with_altitude: 是否有高度
+        :param with_speed: 是否有速度
+        :return: 帧大小的图片
+        """
+        key = (with_route_time, with_altitude, with_speed)
+        base_layer = self._base_layers.get(key)
+        if base_layer is not None:
+            return base_layer
+        base_layer = Image.new(mode='RGBA', size=image_size)
+        draw_table = ImageDraw.Draw(im=base_layer)
+        if with_route_time:
+            base_layer.paste(get_route_time_sep_image(), route_time_sep_xy)
+        if with_altitude:
+            altitude_unit_width = draw_table.textlength(text='m', font=small_font)
+            draw_table.text(xy=(altitude_unit_xy[0] - altitude_unit_width, altitude_unit_xy[1]), text='m', fill=font_color,
+                            font=small_font)
+        if with_speed:
+            speed_unit_width = draw_table.textlength(text='km/h', font=small_font)
+            draw_table.text(xy=(speed_unit_xy[0] - speed_unit_width, speed_unit_xy[1]), text='km/h', fill=font_color,
+                            font=small_font)
+        with self._base_layers_lock:
+            return self._base_layers.setdefault(key, base_layer)
+
+    def _area_layer(self, area_zh, area_en) -> tuple[Optional[Layer]]:
+        """
+        区域图层，按中英文区域名缓存。
+        :return: (图层,)，没有内容时图层为 None
+        """
+        key = (area_zh, area_en)
+        cached = self._area_layers.get(key)
+        if cached is not None:
+            return cached
+        layer_image = Image.new(mode='RGBA', size=image_size)
+        draw_table = ImageDraw.Draw(im=layer_image)
+        if area_zh:
+            draw_table.text(xy=area_chinese_xy, text=area_zh, fill=font_color, font=big_font)
+        if area_en:
+            draw_table.text(xy=area_english_xy, text=area_en, fill=font_color, font=small_font)
+        cached = (_crop_layer(layer_image),)
+        self._area_layers.put(key, cached)
+        return cached
+
+    def _road_layer(self, road_sign_list, road_zh, road_en) -> tuple[Optional[Layer], tuple[int, int]]:
+        """
+        道路图层，按道路编号标志与中英文路名缓存。
+        标志都为道路编号时按实际生成的标志（SignRenderer.sign_key）缓存；含图片或 SVG 时无法判断是否相同，每次重新绘制。
+        :return: (图层, 指南针的位置)
+        """
+        key = None
+        if all(isinstance(road_sign, str) for road_sign in road_sign_list or []):
+            sign_renderer = get_sign_renderer()
+            key = (tuple(sign_renderer.sign_key(road_sign) for road_sign in road_sign_list or []), road_zh, road_en)
+            cached = self._road_layers.get(key)
+            if cached is not None:
+                return cached
+        layer_image = Image.new(mode='RGBA', size=image_size)
+        draw_table = ImageDraw.Draw(im=layer_image)
+        road_sign_offset = road_xy[0]
+        if road_sign_list:
+            for i, road_sign in enumerate(road_sign_list):
+                if isinstance(road_sign, str):
+                    # 栅格缓存中的标志已缩放
+                    resized_img = get_sign_raster_cache().get(road_sign)
+                    new_road_sign_width = resized_img.size[0]
+                elif isinstance(road_sign, Drawing):
+                    road_sign_img = svg_drawing_to_img(road_sign)
+                    # 固定高度，等比例缩放，高为 road_sign_height
+                    new_road_sign_width = int(road_sign_img.size[0] * road_sign_height / road_sign_img.size[1])
+                    resized_img = road_sign_img.resize((new_road_sign_width, road_sign_height))
+                else:
+                    resized_img = road_sign
+                    new_road_sign_width = resized_img.size[0]
+                layer_image.paste(resized_img, (road_sign_offset, road_xy[1] - resized_img.size[1] // 2))
+                road_sign_offset += new_road_sign_width + road_sign_space
+            road_sign_offset = road_sign_offset - road_sign_space + road_sign_char_space
+        road_zh_right_x = 0
+        road_en_right_x = 0
+        if road_zh:
+            draw_table.text(xy=(road_sign_offset, road_chinese_y), text=road_zh, fill=font_color, font=big_font)
+            # 获取中文字符宽度，后续判断是否移动指南针位置
+            road_zh_width = draw_table.textlength(text=road_zh, font=big_font)
+            road_zh_right_x = road_sign_offset + road_zh_width
+        if road_en:
+            draw_table.text(xy=(road_sign_offset, road_english_y), text=road_en, fill=font_color, font=small_font)
+            road_en_width = draw_table.textlength(text=road_en, font=small_font)
+            road_en_right_x = road_sign_offset + road_en_width
+
+        compass_final_xy = compass_xy
+        if road_zh_right_x + road_sign_char_space > compass_xy[0] or road_en_right_x + road_sign_char_space > compass_xy[0]:
+            compass_final_xy = (math.ceil(max(road_zh_right_x, road_en_right_x) + road_sign_char_space), compass_xy[1])
+        cached = (_crop_layer(layer_image), compass_final_xy)
+        if key is not None:
+            self._road_layers.put(key, cached)
+        return cached
+
+    def compose(
+            self, area_zh, area_en, road_sign_list, road_zh, road_en, compass_angle, used_route, used_time, remain_route,
+            remain_time, altitude, speed
+    ) -> Image.Image:
+        """
+        合成一帧，参数见 generate_pic。
+        :return: image
+        """
+        with_route_time = used_route is not None or used_time is not None or remain_route is not None or remain_time is not None
+        image = self._base_layer(with_route_time, altitude is not None, speed is not None).copy()
+        draw_table = ImageDraw.Draw(im=image)
+
+        # 当前区域、当前道路
+        area_layer, = self._area_layer(area_zh, area_en)
+        road_layer, compass_final_xy = self._road_layer(road_sign_list, road_zh, road_en)
+        for layer in (area_layer, road_layer):
+            if layer is not None:
+                image.alpha_composite(layer[0], layer[1])
+
+        # 指南针
+        if compass_angle is not None:
+            # 表示的是在当前方向上的正北（当前方向恒定为上），故不要加负号
+            compass_image = get_compass_sprites().get(compass_angle)
+            image.paste(compass_image, compass_final_xy)
+
+        # 已走 / 剩余
+        if used_route is not None:
+            # used_route_str 格式化 used_route 为一位小数
+            used_route_str = '{:.1f}'.format(used_route)
+            used_route_width = draw_table.textlength(text=used_route_str, font=big_eng_font)
+            draw_table.text(xy=(used_route_xy[0] - used_route_width, used_route_xy[1]), text=used_route_str,
+                            fill=font_color,
+                            font=big_eng_font)
+        if used_time is not None:
+            # used_time_str: 格式化 used_time 秒数为时分秒
+            used_time_str = '{:02d}:{:02d}:{:02d}'.format(int(used_time / 3600), int(used_time % 3600 / 60),
+                                                          int(used_time % 60))
+            used_time_width = draw_table.textlength(text=used_time_str, font=small_font)
+            draw_table.text(xy=(used_time_xy[0] - used_time_width, used_time_xy[1]), text=used_time_str, fill=font_color,
+                            font=small_font)
+        if remain_route is not None:
+            remain_route_str = '{:.1f}'.format(remain_route)
+            draw_table.text(xy=remain_route_xy, text=remain_route_str, fill=font_color, font=big_eng_font)
+        if remain_time is not None:
+            remain_time_str = '{:02d}:{:02d}:{:02d}'.format(int(remain_time / 3600), int(remain_time % 3600 / 60),
+                                                            int(remain_time % 60))
+            draw_table.text(xy=remain_time_xy, text=remain_time_str, fill=font_color, font=small_font)
+
+        # 高度
+        if altitude is not None:
+            altitude_str = '{:.1f}'.format(altitude)
+            altitude_width = draw_table.textlength(text=altitude_str, font=big_eng_font)
+            draw_table.text(xy=(altitude_xy[0] - altitude_width, altitude_xy[1]), text=altitude_str, fill=font_color,
+                            font=big_eng_font)
+
+        # 时速
+        if speed is not None:
+            speed_text = '{:.1f}'.format(speed)
+            speed_width = draw_table.textlength(text=speed_text, font=big_eng_font)
+            draw_table.text(xy=(speed_xy[0] - speed_width, speed_xy[1]), text=speed_text, fill=font_color,
+                            font=big_eng_font)
+
+        return image
+
+
+_frame_compositor: FrameCompositor = None
+
+
+def get_frame_compositor() -> FrameCompositor:
+    """
+    获取共用的信息图合成器。
+    :return: FrameCompositor
+    """
+    global _frame_compositor
+    if _frame_compositor is None:
+        with _static_images_lock:
+            if _frame_compositor is None:
+                _frame_compositor = FrameCompositor()
+    return _frame_compositor
+
+
 def generate_pic(
         area_zh, area_en, road_sign_list, road_zh, road_en, compass_angle, used_route, used_time, remain_route,
         remain_time, altitude, speed
 ):
     """
-    根据信息生成信息图
+    根据信息生成信息图。不变的部分与区域、道路图层只绘制一次，见 FrameCompositor
     :param area_zh: 中文区域名
     :param area_en: 英文区域名
-    :param road_sign_list: 当前道路编号标牌的 SVG 列表，如 [generate_way_num_pad('G310'), generate_way_num_pad('S209'), generate_expwy_pad('S0211', '豫')]
+    :param road_sign_list: 当前道路编号标牌的列表，如 ['G310', '豫S0211']。
+    元素为道路编号（由 get_sign_raster_cache() 生成标志），也可为高 road_sign_height 的图片，或 SVG（如 generate_way_num_pad('G310')）
     :param road_zh: 中文路名
     :param road_en: 英文路名
     :param compass_angle: 指南针角度
@@ -115,98 +379,10 @@ def generate_pic(
     :param speed: 速度
     :return: image
     """
-    image = Image.new(mode='RGBA', size=image_size)
-    draw_table = ImageDraw.Draw(im=image)
-
-    # 当前区域
-    if area_zh:
-        draw_table.text(xy=area_chinese_xy, text=area_zh, fill=font_color, font=big_font)
-    if area_en:
-        draw_table.text(xy=area_english_xy, text=area_en, fill=font_color, font=small_font)
-
-    # 当前道路
-    # road_sign_list = [generate_way_num_pad('G310'), generate_way_num_pad('S209'), generate_expwy_pad('S0211', '豫')]
-    road_sign_offset = road_xy[0]
-    if road_sign_list:
-        road_sign_img_list = [svg_drawing_to_img(i) for i in road_sign_list]
-        for i, road_sign_img in enumerate(road_sign_img_list):
-            # 固定高度，等比例缩放，高为 road_sign_height
-            new_road_sign_width = int(road_sign_img.size[0] * road_sign_height / road_sign_img.size[1])
-            resized_img = road_sign_img.resize((new_road_sign_width, road_sign_height))
-            # resized_img = road_sign_img.resize((road_sign_width, int(road_sign_img.size[1] * road_sign_width / road_sign_img.size[0])))
-            image.paste(resized_img, (road_sign_offset, road_xy[1] - resized_img.size[1] // 2))
-            road_sign_offset += new_road_sign_width + road_sign_space
-        road_sign_offset = road_sign_offset - road_sign_space + road_sign_char_space
-    road_zh_right_x = 0
-    road_en_right_x = 0
-    if road_zh:
-        draw_table.text(xy=(road_sign_offset, road_chinese_y), text=road_zh, fill=font_color, font=big_font)
-        # 获取中文字符宽度，后续判断是否移动指南针位置
-        road_zh_width = draw_table.textlength(text=road_zh, font=big_font)
-        road_zh_right_x = road_sign_offset + road_zh_width
-    if road_en:
-        draw_table.text(xy=(road_sign_offset, road_english_y), text=road_en, fill=font_color, font=small_font)
-        road_en_width = draw_table.textlength(text=road_en, font=small_font)
-        road_en_right_x = road_sign_offset + road_en_width
-
-    compass_final_xy = compass_xy
-    if road_zh_right_x + road_sign_char_space > compass_xy[0] or road_en_right_x + road_sign_char_space > compass_xy[0]:
-        compass_final_xy = (math.ceil(max(road_zh_right_x, road_en_right_x) + road_sign_char_space), compass_xy[1])
-
-    # 指南针
-    if compass_angle is not None:
-        compass_image = svg_to_img(compass_img_path)
-        # 表示的是在当前方向上的正北（当前方向恒定为上），故不要加负号
-        compass_image = compass_image.rotate(compass_angle, expand=False)
-        image.paste(compass_image, compass_final_xy)
-
-    # 已走 / 剩余
-    if used_route is not None or used_time is not None or remain_route is not None or remain_time is not None:
-        sep_image = svg_to_img(route_time_sep_img_path)
-        image.paste(sep_image, route_time_sep_xy)
-    if used_route is not None:
-        # used_route_str 格式化 used_route 为一位小数
-        used_route_str = '{:.1f}'.format(used_route)
-        used_route_width = draw_table.textlength(text=used_route_str, font=big_eng_font)
-        draw_table.text(xy=(used_route_xy[0] - used_route_width, used_route_xy[1]), text=used_route_str,
-                        fill=font_color,
-                        font=big_eng_font)
-    if used_time is not None:
-        # used_time_str: 格式化 used_time 秒数为时分秒
-        used_time_str = '{:02d}:{:02d}:{:02d}'.format(int(used_time / 3600), int(used_time % 3600 / 60),
-                                                      int(used_time % 60))
-        used_time_width = draw_table.textlength(text=used_time_str, font=small_font)
-        draw_table.text(xy=(used_time_xy[0] - used_time_width, used_time_xy[1]), text=used_time_str, fill=font_color,
-                        font=small_font)
-    if remain_route is not None:
-        remain_route_str = '{:.1f}'.format(remain_route)
-        draw_table.text(xy=remain_route_xy, text=remain_route_str, fill=font_color, font=big_eng_font)
-    if remain_time is not None:
-        remain_time_str = '{:02d}:{:02d}:{:02d}'.format(int(remain_time / 3600), int(remain_time % 3600 / 60),
-                                                        int(remain_time % 60))
-        draw_table.text(xy=remain_time_xy, text=remain_time_str, fill=font_color, font=small_font)
-
-    # 高度
-    if altitude is not None:
-        altitude_str = '{:.1f}'.format(altitude)
-        altitude_width = draw_table.textlength(text=altitude_str, font=big_eng_font)
-        altitude_unit_width = draw_table.textlength(text='m', font=small_font)
-        draw_table.text(xy=(altitude_xy[0] - altitude_width, altitude_xy[1]), text=altitude_str, fill=font_color,
-                        font=big_eng_font)
-        draw_table.text(xy=(altitude_unit_xy[0] - altitude_unit_width, altitude_unit_xy[1]), text='m', fill=font_color,
-                        font=small_font)
-
-    # 时速
-    if speed is not None:
-        speed_text = '{:.1f}'.format(speed)
-        speed_width = draw_table.textlength(text=speed_text, font=big_eng_font)
-        speed_unit_width = draw_table.textlength(text='km/h', font=small_font)
-        draw_table.text(xy=(speed_xy[0] - speed_width, speed_xy[1]), text=speed_text, fill=font_color,
-                        font=big_eng_font)
-        draw_table.text(xy=(speed_unit_xy[0] - speed_unit_width, speed_unit_xy[1]), text='km/h', fill=font_color,
-                        font=small_font)
-
-    return image
+    return get_frame_compositor().compose(
+        area_zh, area_en, road_sign_list, road_zh, road_en, compass_angle, used_route, used_time, remain_route,
+        remain_time, altitude, speed
+    )
     # image.show()  # 直接显示图片
     # # image.save('满月.png', 'PNG')  # 保存在当前路径下，格式为PNG
     # image.close()
@@ -289,7 +465,7 @@ def read_csv_with_additional_info(
     :param crop_end 输出帧的序号结束，用于修改特定范围内的帧
     :return: 整理好的字典数据
     """
-    global road_num_svg_cache
+    sign_raster_cache = get_sign_raster_cache()
     dict_list = read_csv(path)[start_index:end_index]
     dict_list = fill_missing_entries(dict_list)[start_index_after_fill:end_index_after_fill]
     new_dict_list = []
@@ -316,24 +492,13 @@ def read_csv_with_additional_info(
         new_row['full_area'] = ' '.join([i for i in [row['province'], row['city'], row['area']] if i])
         new_row['full_area_en'] = ', '.join([i for i in [row['area_en'], row['city_en'], row['province_en']] if i])
 
-        new_row['road_sign_svg'] = []
+        new_row['road_sign_list'] = []
         if 'road_num' in row and row['road_num']:
             road_sign_num_list = row['road_num'].split(',')
             for road_sign in road_sign_num_list:
-                if road_sign in road_num_svg_cache:
-                    new_row['road_sign_svg'].append(road_num_svg_cache[road_sign])
-                    continue
-                # 第一位为大写字母，则为国道、省道等普通道路，或者是国家高速
-                if road_sign[0] in string.ascii_uppercase:
-                    if len(road_sign) == 4:
-                        svg_drawing = generate_way_num_pad(road_sign)
-                    else:
-                        svg_drawing = generate_expwy_pad(road_sign)
-                # 否则为省级高速，从第一位读省简称
-                else:
-                    svg_drawing = generate_expwy_pad(road_sign[1:], province=road_sign[0])
-                road_num_svg_cache[road_sign] = svg_drawing
-                new_row['road_sign_svg'].append(svg_drawing)
+                # 预先栅格化，同一编号的标志只栅格化一次（见 SignRasterCache）
+                sign_raster_cache.get(road_sign)
+                new_row['road_sign_list'].append(road_sign)
         new_dict_list.append(new_row)
     return new_dict_list
 
@@ -350,7 +515,7 @@ def generate_pic_from_processed_dict_list(dict_list: List[dict], crop_start=0, o
     def process_row(i, row):
         img = generate_pic(
             area_zh=row['full_area'], area_en=row['full_area_en'],
-            road_sign_list=row['road_sign_svg'],
+            road_sign_list=row['road_sign_list'],
             road_zh=row['road_name'], road_en=row['road_name_en'],
             compass_angle=row['course'],
             used_route=row['distance'], used_time=row['elapsed_time'],
@@ -431,7 +596,7 @@ if __name__ == '__main__':
     # img = generate_pic(
     #     area_zh=processed_point_info['full_area'], area_en=processed_point_info['full_area_en'],
     #     # road_sign_list=[generate_way_num_pad('G310')],
-    #     road_sign_list=processed_point_info['road_sign_svg'],
+    #     road_sign_list=processed_point_info['road_sign_list'],
     #     road_zh=processed_point_info['road_name'], road_en=processed_point_info['road_name_en'],
     #     compass_angle=processed_point_info['course'],
     #     used_route=processed_point_info['distance'], used_time=processed_point_info['elapsed_time'],
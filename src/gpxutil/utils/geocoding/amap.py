@@ -1,58 +1,87 @@
-import time
-
-import requests
+import numpy as np
 from loguru import logger
 
-from src.gpxutil.core.config import CONFIG_HANDLER
-from src.gpxutil.utils.gpx_convert import convert_single_point
+from src.gpxutil.utils.geocoding import http_client
+from src.gpxutil.utils.geocoding.cache import GeocodingCacheHandler, cached_point_info, is_cacheable
+from src.gpxutil.utils.geocoding.key_pool import request_with_key_pool
+from src.gpxutil.utils.gpx_convert import convert_single_point, convert_points
+
+AMAP_REGEO_URL = 'https://restapi.amap.com/v3/geocode/regeo'
+
+AMAP_BATCH_SIZE = 20
+"""批量逆向编码时，一次请求最多包含的点数（高德 API 的上限）"""
+
+
+def _regeo_params(location: str) -> dict:
+    return {
+        'location': location,
+        'poitype': 180000,
+        'radius': 500,
+        'extensions': 'all',
+    }
+
+
+def _request(params: dict, ak: str, freq: int) -> dict:
+    return request_with_key_pool(
+        'amap', lambda key: http_client.get(AMAP_REGEO_URL, params={'key': key, **params}).json(), ak, freq
+    )
 
 
 def reverse_geocoding(lon, lat, ak: str = None, freq: int = None):
     """
-    高德逆向编码
+    高德逆向编码。未给出 ak 时使用配置文件中的密钥，多个密钥轮流使用（见 key_pool）
     :param lon: 经度
     :param lat: 纬度
     :return:
     """
-    ak = ak or CONFIG_HANDLER.config.area_info.amap.ak
-    freq = freq or CONFIG_HANDLER.config.area_info.amap.freq
-    url = 'https://restapi.amap.com/v3/geocode/regeo'
     trans_lon, trans_lat = convert_single_point(lon, lat, 'wgs84', 'gcj02')
-    params = {
-        'key': ak,
-        'location': f'{trans_lon},{trans_lat}',
-        'poitype': 180000,
-        'radius': 500,
-        'extensions': 'all',
-    }
-    time.sleep(1/freq)
-    response = requests.get(url, params=params)
-    return response.json()
+    return _request(_regeo_params(f'{trans_lon},{trans_lat}'), ak, freq)
 
-def get_point_info(lat, lon, ak: str = None, freq: int = None):
+
+def reverse_geocoding_batch(lon: np.ndarray, lat: np.ndarray, ak: str = None, freq: int = None):
+    """
+    高德批量逆向编码，一次请求最多 AMAP_BATCH_SIZE 个点，结果按顺序放在 regeocodes 中
+    :param lon: 经度数组
+    :param lat: 纬度数组
+    :return:
+    """
+    if len(lon) > AMAP_BATCH_SIZE:
+        raise ValueError(f'At most {AMAP_BATCH_SIZE} points per batch, got {len(lon)}')
+    trans_lon, trans_lat = convert_points(lon, lat, 'wgs84', 'gcj02')
+    params = _regeo_params('|'.join(f'{x:.6f},{y:.6f}' for x, y in zip(trans_lon, trans_lat)))
+    params['batch'] = 'true'
+    return _request(params, ak, freq)
+
+
+def _is_ok(resp: dict) -> bool:
+    return resp['status'] == "1" and resp['infocode'] == "10000"
+
+
+def _parse_regeocode(regeocode: dict) -> dict:
+    """
+    从一个点的 regeocode 中取出行政区划和道路名。道路名优先取门牌所在的街道，没有则取最近的道路。
+    :param regeocode: 高德逆向编码结果中一个点的 regeocode
+    :return: 与 get_point_info 的返回值格式相同
+    """
     province, city, area, town, road_name, road_num, province_en, city_en, area_en, town_en, road_name_en, road_num_en, memo = '', '', '', '', '', '', '', '', '', '', '', '', ''
-    resp = reverse_geocoding(lon, lat, ak, freq)
-    if resp['status'] == "1" and resp['infocode'] == "10000":
-        province = resp['regeocode']['addressComponent']['province']
-        city = resp['regeocode']['addressComponent']['city']
-        area = resp['regeocode']['addressComponent']['district']
-        town = resp['regeocode']['addressComponent']['township']
-        # 1
-        if 'streetNumber' in resp['regeocode']['addressComponent'] and resp['regeocode']['addressComponent']['streetNumber']:
-            if isinstance(resp['regeocode']['addressComponent']['streetNumber']['street'], list):
-                road_name = ','.join(resp['regeocode']['addressComponent']['streetNumber']['street'])
-            else:
-                road_name = resp['regeocode']['addressComponent']['streetNumber']['street']
-        # 2
-        if road_name == '':
-            roads = resp['regeocode']['roads']
-            if roads:
-                min_distance = min(roads, key=lambda x: x['distance'])['distance']
-                nearest_roads = [road for road in roads if road['distance'] == min_distance]
-                if nearest_roads:
-                    road_name = ', '.join([road['name'] for road in nearest_roads if road['name']])
-    else:
-        logger.error(f'高德逆向编码错误: {resp}')
+    province = regeocode['addressComponent']['province']
+    city = regeocode['addressComponent']['city']
+    area = regeocode['addressComponent']['district']
+    town = regeocode['addressComponent']['township']
+    # 1
+    if 'streetNumber' in regeocode['addressComponent'] and regeocode['addressComponent']['streetNumber']:
+        if isinstance(regeocode['addressComponent']['streetNumber']['street'], list):
+            road_name = ','.join(regeocode['addressComponent']['streetNumber']['street'])
+        else:
+            road_name = regeocode['addressComponent']['streetNumber']['street']
+    # 2
+    if road_name == '':
+        roads = regeocode['roads']
+        if roads:
+            min_distance = min(roads, key=lambda x: x['distance'])['distance']
+            nearest_roads = [road for road in roads if road['distance'] == min_distance]
+            if nearest_roads:
+                road_name = ', '.join([road['name'] for road in nearest_roads if road['name']])
     return {
         'province': province,
         'city': city,
@@ -69,6 +98,57 @@ def get_point_info(lat, lon, ak: str = None, freq: int = None):
     }
 
 
+def _empty_point_info(memo: str = '') -> dict:
+    point_info = {name: '' for name in (
+        'province', 'city', 'area', 'town', 'road_name', 'road_num',
+        'province_en', 'city_en', 'area_en', 'town_en', 'road_name_en'
+    )}
+    point_info['memo'] = memo
+    return point_info
+
+
+@cached_point_info('amap')
+def get_point_info(lat, lon, ak: str = None, freq: int = None):
+    resp = reverse_geocoding(lon, lat, ak, freq)
+    if _is_ok(resp):
+        return _parse_regeocode(resp['regeocode'])
+    logger.error(f'高德逆向编码错误: {resp}')
+    return _empty_point_info()
+
+
+def get_point_info_batch(lat: np.ndarray, lon: np.ndarray, ak: str = None, freq: int = None) -> list[dict]:
+    """
+    批量获取各点的行政区划和道路名，结果与逐点调用 get_point_info 相同。
+    本地缓存中已有的点不再请求，其余的点每 AMAP_BATCH_SIZE 个合为一次请求。
+    :param lat: 纬度数组
+    :param lon: 经度数组
+    :param ak: 高德地图 API 的密钥，默认从配置文件中读取
+    :param freq: 每秒请求数上限，默认从配置文件中读取
+    :return: 与输入顺序一致的结果列表
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    cache = GeocodingCacheHandler().cache
+    results: list[dict] = [None] * len(lat)
+    if cache is not None:
+        for i in range(len(lat)):
+            results[i] = cache.get('amap', '', lat[i], lon[i])
+    missing = np.array([i for i, result in enumerate(results) if result is None], dtype=np.int64)
+    for start in range(0, len(missing), AMAP_BATCH_SIZE):
+        rows = missing[start:start + AMAP_BATCH_SIZE]
+        resp = reverse_geocoding_batch(lon[rows], lat[rows], ak, freq)
+        if _is_ok(resp) and len(resp['regeocodes']) == len(rows):
+            for row, regeocode in zip(rows, resp['regeocodes']):
+                results[row] = _parse_regeocode(regeocode)
+                if cache is not None and is_cacheable(results[row]):
+                    cache.put('amap', '', lat[row], lon[row], results[row])
+        else:
+            logger.error(f'高德逆向编码错误: {resp}')
+            for row in rows:
+                results[row] = _empty_point_info()
+    return results
+
+
 if __name__ == '__main__':
     lat = 30.49117517
     lon = 114.49190074
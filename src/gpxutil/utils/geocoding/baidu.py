@@ -1,24 +1,26 @@
-import time
+from concurrent.futures import ThreadPoolExecutor
 
-import requests
 from loguru import logger
 
 from src.gpxutil.core.config import CONFIG_HANDLER
+from src.gpxutil.utils.geocoding import http_client
+from src.gpxutil.utils.geocoding.cache import cached_point_info, is_en_cacheable
+from src.gpxutil.utils.geocoding.key_pool import request_with_key_pool
 
+BAIDU_REVERSE_GEOCODING_URL = 'https://api.map.baidu.com/reverse_geocoding/v3/'
+
+_en_request_pool = ThreadPoolExecutor(thread_name_prefix='baidu_en')
+"""与中文请求同时发出英文请求的线程池"""
 
 
 def reverse_geocoding(lon, lat, lang: str='zh-CN', ak: str = None, freq: int = None):
     """
-    百度逆向编码
+    百度逆向编码。未给出 ak 时使用配置文件中的密钥，多个密钥轮流使用（见 key_pool）
     :param lon: 经度
     :param lat: 纬度
     :return:
     """
-    ak = ak or CONFIG_HANDLER.config.area_info.baidu.ak
-    freq = freq or CONFIG_HANDLER.config.area_info.baidu.freq
-    url = 'https://api.map.baidu.com/reverse_geocoding/v3/'
     params = {
-        'ak': ak,
         # 'extensions_poi': 1,
         # 'entire_poi': 1,
         'sort_strategy': 'distance',
@@ -28,73 +30,108 @@ def reverse_geocoding(lon, lat, lang: str='zh-CN', ak: str = None, freq: int = N
         'poi_types': '道路',
         'language': lang
     }
-    time.sleep(1/freq)
-    response = requests.get(url, params=params)
-    return response.json()
+    return request_with_key_pool(
+        'baidu', lambda key: http_client.get(BAIDU_REVERSE_GEOCODING_URL, params={'ak': key, **params}).json(), ak, freq
+    )
+
+def _road_name(resp) -> str:
+    """道路名优先取所在街道，没有则取最近的道路"""
+    road_name = resp['result']['addressComponent']['street']
+    if road_name == '':
+        roads = resp['result']['business_info']
+        if roads:
+            min_distance = min(roads, key=lambda x: x['distance'])['distance']
+            nearest_roads = [road for road in roads if road['distance'] == min_distance]
+            if nearest_roads:
+                road_name = ', '.join([road['name'] for road in nearest_roads if road['name']])
+    return road_name
+
+def _parse_en(resp_en, point_info: dict) -> dict:
+    """
+    从英文结果中取出英文名。与中文相同的（没有英文名）留空。
+    :param resp_en: 英文的逆向编码结果
+    :param point_info: 同一点的中文结果
+    :return: 英文名各字段
+    """
+    province_en, city_en, area_en, town_en, road_name_en = '', '', '', '', ''
+    if resp_en['status'] == 0:
+        province_en = resp_en['result']['addressComponent']['province']
+        city_en = resp_en['result']['addressComponent']['city']
+        area_en = resp_en['result']['addressComponent']['district']
+        town_en = resp_en['result']['addressComponent']['town']
+        road_name_en = _road_name(resp_en)
+        if province_en == point_info['province']:
+            province_en = ''
+        if city_en == point_info['city']:
+            city_en = ''
+        if area_en == point_info['area']:
+            area_en = ''
+        if town_en == point_info['town']:
+            town_en = ''
+        if road_name_en == point_info['road_name']:
+            road_name_en = ''
+    else:
+        logger.error(f'百度逆向编码错误: {resp_en}')
+    return {
+        'province_en': province_en,
+        'city_en': city_en,
+        'area_en': area_en,
+        'town_en': town_en,
+        'road_name_en': road_name_en,
+    }
+
+def _cache_language(get_en_result: bool = None, **_) -> str:
+    """缓存键中的语言：是否获取英文名，结果不同"""
+    if get_en_result is None:
+        get_en_result = CONFIG_HANDLER.config.area_info.baidu.get_en_result
+    return 'zh-CN,en' if get_en_result else 'zh-CN'
 
+@cached_point_info('baidu', language=_cache_language)
 def get_point_info(lat, lon, ak: str = None, freq: int = None, get_en_result: bool = None):
     if get_en_result is None:
         get_en_result = CONFIG_HANDLER.config.area_info.baidu.get_en_result
-    else:
-        get_en_result = get_en_result
-    province, city, area, town, road_name, road_num, province_en, city_en, area_en, town_en, road_name_en, road_num_en, memo = '', '', '', '', '', '', '', '', '', '', '', '', ''
-    resp = reverse_geocoding(lon, lat, ak, freq)
+    # 需要英文名时，英文请求与中文请求同时发出
+    future_en = _en_request_pool.submit(reverse_geocoding, lon, lat, 'en', ak=ak, freq=freq) if get_en_result else None
+    province, city, area, town, road_name, road_num, memo = '', '', '', '', '', '', ''
+    resp = reverse_geocoding(lon, lat, ak=ak, freq=freq)
     if resp['status'] == 0:
         province = resp['result']['addressComponent']['province']
         city = resp['result']['addressComponent']['city']
         area = resp['result']['addressComponent']['district']
         town = resp['result']['addressComponent']['town']
-        road_name = resp['result']['addressComponent']['street']
-        if road_name == '':
-            roads = resp['result']['business_info']
-            if roads:
-                min_distance = min(roads, key=lambda x: x['distance'])['distance']
-                nearest_roads = [road for road in roads if road['distance'] == min_distance]
-                if nearest_roads:
-                    road_name = ', '.join([road['name'] for road in nearest_roads if road['name']])
+        road_name = _road_name(resp)
     else:
         logger.error(f'百度逆向编码错误: {resp}')
-    if get_en_result:
-        resp_en = reverse_geocoding(lon, lat, 'en', ak, freq)
-        if resp_en['status'] == 0:
-            province_en = resp_en['result']['addressComponent']['province']
-            city_en = resp_en['result']['addressComponent']['city']
-            area_en = resp_en['result']['addressComponent']['district']
-            town_en = resp_en['result']['addressComponent']['town']
-            road_name_en = resp['result']['addressComponent']['street']
-            if road_name_en == '':
-                roads = resp['result']['business_info']
-                if roads:
-                    min_distance = min(roads, key=lambda x: x['distance'])['distance']
-                    nearest_roads = [road for road in roads if road['distance'] == min_distance]
-                    if nearest_roads:
-                        road_name_en = ', '.join([road['name'] for road in nearest_roads if road['name']])
-            if province_en ==  province:
-                province_en = ''
-            if city_en == city:
-                city_en = ''
-            if area_en == area:
-                area_en = ''
-            if town_en == town:
-                town_en = ''
-            if  road_name_en == road_name:
-                road_name_en = ''
-        else:
-            logger.error(f'百度逆向编码错误: {resp_en}')
-    return {
+    point_info = {
         'province': province,
         'city': city,
         'area': area,
         'town': town,
         'road_name': road_name,
         'road_num': road_num,
-        'province_en': province_en,
-        'city_en': city_en,
-        'area_en': area_en,
-        'town_en': town_en,
-        'road_name_en': road_name_en,
+        'province_en': '',
+        'city_en': '',
+        'area_en': '',
+        'town_en': '',
+        'road_name_en': '',
         'memo': memo
     }
+    if future_en is not None:
+        point_info.update(_parse_en(future_en.result(), point_info))
+    return point_info
+
+@cached_point_info('baidu', language=lambda **_: 'en', cacheable=is_en_cacheable)
+def get_point_info_en(lat, lon, point_info: dict, ak: str = None, freq: int = None) -> dict:
+    """
+    只获取给定点的英文名。
+    :param lat: 纬度
+    :param lon: 经度
+    :param point_info: 同一点只含中文的 get_point_info 结果，用于判断英文名是否与中文相同
+    :param ak: 百度地图 API 的密钥，默认从配置文件中读取
+    :param freq: 每秒请求数上限，默认从配置文件中读取
+    :return: 英文名各字段（province_en、city_en、area_en、town_en、road_name_en）
+    """
+    return _parse_en(reverse_geocoding(lon, lat, 'en', ak=ak, freq=freq), point_info)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,355 @@
+"""
+逆地理编码结果的本地缓存，各 API 来源共用。
+
+结果存放在 SQLite 文件中，键为 (来源, 语言, 量化后的纬度, 量化后的经度)。
+坐标按配置的小数位数量化，落在同一格内的点共用一个结果。超过有效期的结果视为不存在；
+条数超过上限时，淘汰最久未使用的。
+道路详情等与坐标无关的数据由 LRUCache（见 utils.lru_cache）缓存在内存中，也可按键存放在同一个 SQLite 文件中。
+"""
+
+import atexit
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from loguru import logger
+
+from src.gpxutil.core.config import CONFIG_HANDLER
+from src.gpxutil.utils.lru_cache import LRUCache
+
+GEOCODING_CACHE_EVICT_INTERVAL = 1000
+"""每写入多少条检查一次是否超出条数上限"""
+
+GEOCODING_CACHE_COMMIT_INTERVAL = 100
+"""每写入多少次提交一次，其余在 flush、close 时提交"""
+
+GEOCODING_CACHE_TOUCH_INTERVAL = 24 * 3600
+"""最近使用时间的精度（秒）：读取时距上次更新超过这么久才更新"""
+
+
+class GeocodingCache:
+    """
+    基于 SQLite 的逆地理编码缓存。可在多个线程中共用。
+    写入不逐条提交，每 GEOCODING_CACHE_COMMIT_INTERVAL 次提交一次，关闭时提交其余的。
+    """
+
+    def __init__(self, path: str, precision: int = 4, ttl_days: float = 30, max_entries: int = 1000000):
+        """
+        :param path: SQLite 文件路径，为 ':memory:' 时只存在内存中
+        :param precision: 坐标量化到小数点后几位
+        :param ttl_days: 有效期（天）
+        :param max_entries: 最多缓存的条数
+        """
+        self.path = path
+        self.precision = precision
+        self.ttl = ttl_days * 24 * 3600
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes_since_evict = 0
+        self._writes_since_commit = 0
+        self._lock = threading.Lock()
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("pragma journal_mode = wal")
+        self.conn.execute("pragma synchronous = normal")
+        self.conn.execute("""
+        create table if not exists geocoding_cache (
+            source text not null,
+            language text not null,
+            lat_key integer not null,
+            lon_key integer not null,
+            value text not null,
+            created_at real not null,
+            accessed_at real not null,
+            primary key (source, language, lat_key, lon_key)
+        )
+        """)
+        self.conn.execute("create index if not exists geocoding_cache_accessed_at on geocoding_cache (accessed_at)")
+        self.conn.execute("""
+        create table if not exists geocoding_items (
+            namespace text not null,
+            key text not null,
+            value text not null,
+            created_at real not null,
+            accessed_at real not null,
+            primary key (namespace, key)
+        )
+        """)
+        self.conn.execute("create index if not exists geocoding_items_accessed_at on geocoding_items (accessed_at)")
+        self.conn.commit()
+
+    def quantize(self, lat: float, lon: float) -> tuple[int, int]:
+        """
+        将坐标量化为整数格号。
+        :param lat: 纬度
+        :param lon: 经度
+        :return: (纬度格号, 经度格号)
+        """
+        scale = 10 ** self.precision
+        return round(float(lat) * scale), round(float(lon) * scale)
+
+    def get(self, source: str, language: str, lat: float, lon: float) -> Optional[dict]:
+        """
+        读取缓存的结果，最近使用时间超过 GEOCODING_CACHE_TOUCH_INTERVAL 未更新时更新。
+        :param source: 来源，如 nominatim
+        :param language: 语言
+        :param lat: 纬度
+        :param lon: 经度
+        :return: 缓存的结果，不存在或已过期为 None
+        """
+        key = (source, language) + self.quantize(lat, lon)
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "select value, created_at, accessed_at from geocoding_cache "
+                "where source = ? and language = ? and lat_key = ? and lon_key = ?", key
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                self.misses += 1
+                return None
+            if now - row[2] > GEOCODING_CACHE_TOUCH_INTERVAL:
+                self.conn.execute(
+                    "update geocoding_cache set accessed_at = ? "
+                    "where source = ? and language = ? and lat_key = ? and lon_key = ?", (now,) + key
+                )
+                self._written()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, source: str, language: str, lat: float, lon: float, value: dict):
+        """
+        写入结果。
+        :param source: 来源，如 nominatim
+        :param language: 语言
+        :param lat: 纬度
+        :param lon: 经度
+        :param value: 结果，须能转为 JSON
+        :return: None
+        """
+        key = (source, language) + self.quantize(lat, lon)
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "insert or replace into geocoding_cache "
+                "(source, language, lat_key, lon_key, value, created_at, accessed_at) values (?, ?, ?, ?, ?, ?, ?)",
+                key + (json.dumps(value, ensure_ascii=False), now, now)
+            )
+            self._inserted()
+
+    def get_item(self, namespace: str, key: str) -> Optional[Any]:
+        """
+        读取按键存放的附加数据（如道路详情），最近使用时间的更新同 get。不计入命中率。
+        :param namespace: 数据类别，如 nominatim_details
+        :param key: 键
+        :return: 缓存的数据，不存在或已过期为 None
+        """
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "select value, created_at, accessed_at from geocoding_items where namespace = ? and key = ?",
+                (namespace, key)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                return None
+            if now - row[2] > GEOCODING_CACHE_TOUCH_INTERVAL:
+                self.conn.execute(
+                    "update geocoding_items set accessed_at = ? where namespace = ? and key = ?", (now, namespace, key)
+                )
+                self._written()
+        return json.loads(row[0])
+
+    def put_item(self, namespace: str, key: str, value: Any):
+        """
+        写入按键存放的附加数据。
+        :param namespace: 数据类别，如 nominatim_details
+        :param key: 键
+        :param value: 数据，须能转为 JSON
+        :return: None
+        """
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "insert or replace into geocoding_items (namespace, key, value, created_at, accessed_at) "
+                "values (?, ?, ?, ?, ?)", (namespace, key, json.dumps(value, ensure_ascii=False), now, now)
+            )
+            self._inserted()
+
+    def _inserted(self):
+        """写入一条后调用，按间隔淘汰"""
+        self._writes_since_evict += 1
+        if self._writes_since_evict >= GEOCODING_CACHE_EVICT_INTERVAL:
+            self._evict()
+        self._written()
+
+    def _written(self):
+        """每次写入后调用，按间隔提交"""
+        self._writes_since_commit += 1
+        if self._writes_since_commit >= GEOCODING_CACHE_COMMIT_INTERVAL:
+            self._commit()
+
+    def _commit(self):
+        self._writes_since_commit = 0
+        self.conn.commit()
+
+    def _evict(self):
+        """删除过期的结果；仍超出条数上限时，删除最久未使用的"""
+        self._writes_since_evict = 0
+        for table in ('geocoding_cache', 'geocoding_items'):
+            self.conn.execute(f"delete from {table} where created_at < ?", (time.time() - self.ttl,))
+            count = self.conn.execute(f"select count(*) from {table}").fetchone()[0]
+            if count > self.max_entries:
+                self.conn.execute(
+                    f"delete from {table} where rowid in "
+                    f"(select rowid from {table} order by accessed_at limit ?)", (count - self.max_entries,)
+                )
+
+    def evict(self):
+        """
+        立即执行一次淘汰。
+        :return: None
+        """
+        with self._lock:
+            self._evict()
+            self._commit()
+
+    def flush(self):
+        """
+        提交尚未提交的写入。
+        :return: None
+        """
+        with self._lock:
+            if self.conn is not None:
+                self._commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("select count(*) from geocoding_cache").fetchone()[0]
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        hit_rate = self.hits / total * 100 if total else 0
+        return f"Geocoding cache: {self.hits} hit(s), {self.misses} miss(es), hit rate {hit_rate:.1f}%"
+
+    def close(self):
+        with self._lock:
+            if self.conn is not None:
+                self._commit()
+                self.conn.close()
+                self.conn = None
+
+
+class GeocodingCacheHandler:
+    """
+    按配置文件创建的全局缓存，单例。配置中关闭缓存时 cache 为 None。程序退出时关闭。
+    """
+    _instance_lock = threading.Lock()
+    _instance = None
+    _initialized = False
+
+    def __init__(self):
+        if not GeocodingCacheHandler._initialized:
+            cache_config = CONFIG_HANDLER.config.area_info.cache
+            self.cache: Optional[GeocodingCache] = None
+            if cache_config is not None and cache_config.enabled:
+                self.cache = GeocodingCache(
+                    cache_config.path, cache_config.precision, cache_config.ttl_days, cache_config.max_entries
+                )
+                atexit.register(self.close)
+            GeocodingCacheHandler._initialized = True
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            with cls._instance_lock:
+                if not cls._instance:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def close(self):
+        if self.cache is not None:
+            self.cache.close()
+
+
+_lru_caches: dict[str, LRUCache] = {}
+_lru_caches_lock = threading.Lock()
+
+
+def get_lru_cache(name: str, maxsize: int, persist: bool = True) -> LRUCache:
+    """
+    获取全局共用的 LRUCache，不存在则创建。
+    :param name: 名称
+    :param maxsize: 内存中最多存放的条数，只在创建时使用
+    :param persist: 是否同时写入本地 SQLite 缓存（配置中关闭缓存时不写入），只在创建时使用
+    :return: LRUCache
+    """
+    with _lru_caches_lock:
+        cache = _lru_caches.get(name)
+        if cache is None:
+            store = GeocodingCacheHandler().cache if persist else None
+            cache = _lru_caches[name] = LRUCache(name, maxsize, store)
+        return cache
+
+
+def log_cache_stats():
+    """
+    在日志中输出各缓存的命中率。
+    :return: None
+    """
+    cache = GeocodingCacheHandler().cache
+    if cache is not None:
+        logger.info(cache.stats())
+    for lru_cache in list(_lru_caches.values()):
+        if lru_cache.hits or lru_cache.misses:
+            logger.info(lru_cache.stats())
+
+
+def is_cacheable(point_info: dict) -> bool:
+    """
+    判断 get_point_info 的结果是否值得缓存：出错（memo 不为空）或没有任何行政区划的结果不缓存，下次重新请求。
+    :param point_info: get_point_info 的结果
+    :return: bool
+    """
+    if point_info.get('memo'):
+        return False
+    return any(point_info.get(name) for name in ('province', 'city', 'area'))
+
+
+def is_en_cacheable(en_info: dict) -> bool:
+    """
+    判断 get_point_info_en 的结果是否值得缓存：英文名全部为空（出错或没有英文名）的结果不缓存。
+    :param en_info: get_point_info_en 的结果
+    :return: bool
+    """
+    return any(en_info.values())
+
+
+def cached_point_info(source: str, language: Callable[..., str] = None,
+                      cacheable: Callable[[dict], bool] = is_cacheable):
+    """
+    为各来源的 get_point_info(lat, lon, ...) 加上缓存的装饰器，也用于只获取英文名的 get_point_info_en。
+    :param source: 来源，如 nominatim
+    :param language: 由 get_point_info 的关键字参数得出缓存键中的语言；结果与参数无关时为空
+    :param cacheable: 判断结果是否值得缓存
+    :return: 装饰器
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(lat, lon, *args, **kwargs):
+            cache = GeocodingCacheHandler().cache
+            if cache is None:
+                return func(lat, lon, *args, **kwargs)
+            cache_language = language(**kwargs) if language is not None else ''
+            value = cache.get(source, cache_language, lat, lon)
+            if value is not None:
+                return value
+            value = func(lat, lon, *args, **kwargs)
+            if cacheable(value):
+                cache.put(source, cache_language, lat, lon, value)
+            return value
+        return wrapper
+    return decorator
@@ -0,0 +1,361 @@
+"""
+并发获取多个点的逆地理编码结果。
+
+各来源的 get_point_info 是阻塞的 HTTP 请求。这里用 asyncio 调度，把请求放到线程池中执行，
+同时进行的请求数不超过该来源的 concurrency；百度、高德每个密钥的每秒请求数由各自的令牌桶限制（见 key_pool）。
+支持批量请求的来源（高德）每批点合为一次请求。结果按输入顺序返回。
+给出 journal 时，已记录的点不再请求，新得到的结果逐点记录，中断后可从断点继续（见 journal）。
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+import numpy as np
+from loguru import logger
+from tqdm import tqdm
+
+from src.gpxutil.core.config import CONFIG_HANDLER
+from src.gpxutil.utils.geocoding.cache import is_cacheable, is_en_cacheable
+from src.gpxutil.utils.geocoding.journal import GeocodingJournal
+from src.gpxutil.utils.route_util import bisect_fill, sample_anchors
+
+GEOCODING_SOURCES = ('nominatim', 'baidu', 'amap')
+"""通过在线 API 获取行政区划的来源"""
+
+SAMPLE_KEY_FIELDS = ('province', 'city', 'area', 'road_name', 'road_num')
+"""按间隔取点时，用于判断相邻两次结果是否相同的字段"""
+
+EN_KEY_FIELDS = ('province', 'city', 'area', 'road_name')
+"""只在中文结果变化处获取英文名时，用于判断中文结果是否变化的字段"""
+
+
+def get_point_info_func(source: str) -> Callable[..., dict]:
+    """
+    获取某个来源的 get_point_info 函数。
+    :param source: 来源
+    :return: get_point_info(lat, lon, ...)
+    """
+    match source:
+        case 'nominatim':
+            from src.gpxutil.utils.geocoding.nominatim import get_point_info
+        case 'baidu':
+            from src.gpxutil.utils.geocoding.baidu import get_point_info
+        case 'amap':
+            from src.gpxutil.utils.geocoding.amap import get_point_info
+        case _:
+            raise ValueError('Invalid source: %s' % source)
+    return get_point_info
+
+
+def get_point_info_batch_func(source: str) -> Optional[tuple[Callable[..., list[dict]], int]]:
+    """
+    获取某个来源的批量获取函数。只有高德支持，且可在配置文件中关闭。
+    :param source: 来源
+    :return: (get_point_info_batch(lat_array, lon_array, ...), 每批最多的点数)，不支持时为 None
+    """
+    if source == 'amap':
+        amap_config = CONFIG_HANDLER.config.area_info.amap
+        if amap_config is None or amap_config.batch:
+            from src.gpxutil.utils.geocoding.amap import AMAP_BATCH_SIZE, get_point_info_batch
+            return get_point_info_batch, AMAP_BATCH_SIZE
+    return None
+
+
+def get_point_info_kwargs(source: str, nominatim_url: str = None, map_api_ak: str = None, map_freq: int = None,
+                          baidu_get_en_result: bool = None, get_en_result: bool = True) -> dict:
+    """
+    将 Route 的参数转为各来源 get_point_info 的关键字参数。
+    :param source: 来源
+    :param nominatim_url: Nominatim API 地址
+    :param map_api_ak: 百度、高德地图 API 的密钥
+    :param map_freq: 百度、高德地图 API 的每秒请求数上限
+    :param baidu_get_en_result: 百度地图是否获取英文名
+    :param get_en_result: 为 False 时只获取中文结果
+    :return: dict
+    """
+    match source:
+        case 'nominatim':
+            return {'host': nominatim_url} if get_en_result else {'host': nominatim_url, 'get_en_result': False}
+        case 'baidu':
+            return {'ak': map_api_ak, 'freq': map_freq, 'get_en_result': baidu_get_en_result if get_en_result else False}
+        case 'amap':
+            return {'ak': map_api_ak, 'freq': map_freq}
+        case _:
+            raise ValueError('Invalid source: %s' % source)
+
+
+def default_concurrency(source: str, freq: int = None) -> int:
+    """
+    从配置文件中读取某个来源同时进行的请求数上限。百度、高德未配置时与每秒请求数上限相同，配置了多个密钥时为各密钥之和。
+    :param source: 来源
+    :param freq: 每秒请求数上限，为空时从配置文件中读取
+    :return: int
+    """
+    source_config = getattr(CONFIG_HANDLER.config.area_info, source, None)
+    concurrency = getattr(source_config, 'concurrency', None)
+    if concurrency is None and source in ('baidu', 'amap'):
+        if getattr(source_config, 'keys', None):
+            concurrency = sum(key.freq or 1 for key in source_config.keys)
+        else:
+            concurrency = freq or getattr(source_config, 'freq', None)
+    return max(1, int(concurrency or 1))
+
+
+async def _run_chunks_async(chunk_func: Callable[[int, int], list], size: int, batch_size: int,
+                            concurrency: int, progress: tqdm) -> list:
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    results: list = [None] * size
+
+    async def run(start: int, stop: int):
+        async with semaphore:
+            results[start:stop] = await loop.run_in_executor(thread_pool, chunk_func, start, stop)
+        progress.update(stop - start)
+
+    thread_pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='geocoding')
+    try:
+        await asyncio.gather(*(run(start, min(start + batch_size, size)) for start in range(0, size, batch_size)))
+    finally:
+        # 出错时不再执行排队中的请求
+        thread_pool.shutdown(wait=True, cancel_futures=True)
+    return results
+
+
+def _run_chunks(chunk_func: Callable[[int, int], list], size: int, batch_size: int, concurrency: int,
+                progress: tqdm = None, desc: str = "Processing GPX Points") -> list:
+    """
+    将 [0, size) 按 batch_size 分块，在线程池中并发执行 chunk_func(start, stop)，按顺序拼接各块的结果。
+    :param chunk_func: 处理一块的函数，返回与块等长的列表
+    :param size: 总数
+    :param batch_size: 每块的大小
+    :param concurrency: 同时执行的块数上限
+    :param progress: 进度条，为空时新建一个
+    :param desc: 新建进度条的说明
+    :return: list
+    """
+    if progress is not None:
+        return asyncio.run(_run_chunks_async(chunk_func, size, batch_size, concurrency, progress))
+    with tqdm(total=size, desc=desc, unit='point(s)') as progress:
+        return asyncio.run(_run_chunks_async(chunk_func, size, batch_size, concurrency, progress))
+
+
+def _journaled(fetch: Callable[[np.ndarray], list], source: str, kind: str, indices: np.ndarray,
+               journal: Optional[GeocodingJournal], recordable: Callable[[dict], bool]) -> Callable[[int, int], list]:
+    """
+    由按位置获取结果的 fetch(positions) 得到 _run_chunks 的 chunk_func。给出 journal 时先从中读取，只获取未记录的位置，并记录新结果。
+    :param fetch: 获取指定位置结果的函数
+    :param source: 来源
+    :param kind: 结果类型，见 GeocodingJournal.get
+    :param indices: 各位置对应的点的序号
+    :param journal: 断点记录，为空时不读写
+    :param recordable: 判断结果是否记录，出错的结果不记录，继续时重新请求
+    :return: chunk_func(start, stop)
+    """
+    if journal is None:
+        return lambda start, stop: fetch(np.arange(start, stop))
+
+    def chunk_func(start: int, stop: int) -> list:
+        results = [journal.get(source, kind, index) for index in indices[start:stop]]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            positions = np.arange(start, stop)[missing]
+            for i, position, result in zip(missing, positions, fetch(positions)):
+                results[i] = result
+                if recordable(result):
+                    journal.put(source, kind, indices[position], result)
+        return results
+
+    return chunk_func
+
+
+def geocode_points(source: str, latitude: np.ndarray, longitude: np.ndarray,
+                   nominatim_url: str = None, map_api_ak: str = None, map_freq: int = None,
+                   baidu_get_en_result: bool = None, concurrency: int = None, progress: tqdm = None,
+                   get_en_result: bool = True, indices: np.ndarray = None, journal: GeocodingJournal = None) -> list[dict]:
+    """
+    并发获取多个点的逆地理编码结果。不能在已运行的事件循环中调用。
+    :param source: 来源，nominatim / baidu / amap
+    :param latitude: 纬度数组
+    :param longitude: 经度数组
+    :param nominatim_url: Nominatim API 地址，默认从配置文件中读取
+    :param map_api_ak: 百度、高德地图 API 的密钥，默认从配置文件中读取
+    :param map_freq: 百度、高德地图 API 的每秒请求数上限，默认从配置文件中读取
+    :param baidu_get_en_result: 百度地图是否获取英文名，默认从配置文件中读取
+    :param concurrency: 同时进行的请求数上限，默认从配置文件中读取
+    :param progress: 进度条，为空时新建一个
+    :param get_en_result: 为 False 时只获取中文结果，英文名留空
+    :param indices: 各点的序号，作为 journal 中的键。给出 journal 时必填
+    :param journal: 断点记录，已记录的点不再请求
+    :return: 与输入顺序一致的 get_point_info 结果列表
+    """
+    batch = get_point_info_batch_func(source)
+    if batch is not None:
+        batch_func, batch_size = batch
+    else:
+        func = get_point_info_func(source)
+        batch_func, batch_size = lambda lat, lon, **kw: [func(float(lat[0]), float(lon[0]), **kw)], 1
+    kwargs = get_point_info_kwargs(source, nominatim_url, map_api_ak, map_freq, baidu_get_en_result, get_en_result)
+    if concurrency is None:
+        concurrency = default_concurrency(source, map_freq)
+    chunk_func = _journaled(
+        lambda positions: batch_func(latitude[positions], longitude[positions], **kwargs),
+        source, 'zh,en' if get_en_result else 'zh', indices, journal, is_cacheable
+    )
+    return _run_chunks(chunk_func, len(latitude), batch_size, concurrency, progress)
+
+
+def wants_en_result(source: str, baidu_get_en_result: bool = None) -> bool:
+    """
+    某个来源是否获取英文名：Nominatim 总是获取，百度按参数或配置文件，高德不支持。
+    :param source: 来源
+    :param baidu_get_en_result: 百度地图是否获取英文名，默认从配置文件中读取
+    :return: bool
+    """
+    match source:
+        case 'nominatim':
+            return True
+        case 'baidu':
+            if baidu_get_en_result is None:
+                baidu_get_en_result = CONFIG_HANDLER.config.area_info.baidu.get_en_result
+            return bool(baidu_get_en_result)
+        case _:
+            return False
+
+
+def default_en_on_change(source: str) -> bool:
+    """
+    从配置文件中读取某个来源是否只在中文结果变化处获取英文名。
+    :param source: 来源
+    :return: bool
+    """
+    source_config = getattr(CONFIG_HANDLER.config.area_info, source, None)
+    return bool(getattr(source_config, 'en_on_change', False))
+
+
+def get_point_info_en_func(source: str) -> Callable[..., dict]:
+    """
+    获取某个来源只获取英文名的 get_point_info_en 函数。
+    :param source: 来源，nominatim / baidu
+    :return: get_point_info_en(lat, lon, point_info, ...)
+    """
+    match source:
+        case 'nominatim':
+            from src.gpxutil.utils.geocoding.nominatim import get_point_info_en
+        case 'baidu':
+            from src.gpxutil.utils.geocoding.baidu import get_point_info_en
+        case _:
+            raise ValueError('Source %s has no English results' % source)
+    return get_point_info_en
+
+
+def fill_en_on_change(source: str, latitude: np.ndarray, longitude: np.ndarray, point_infos: list[dict],
+                      nominatim_url: str = None, map_api_ak: str = None, map_freq: int = None,
+                      concurrency: int = None, indices: np.ndarray = None, journal: GeocodingJournal = None,
+                      **_) -> list[dict]:
+    """
+    为只含中文的各点结果补上英文名：只在中文的省、市、区、道路与前一点不同处请求英文名（并发请求），其余各点沿用。
+    :param source: 来源，nominatim / baidu
+    :param latitude: 纬度数组
+    :param longitude: 经度数组
+    :param point_infos: 沿行程排列的、只含中文的 get_point_info 结果
+    :param nominatim_url: Nominatim API 地址，默认从配置文件中读取
+    :param map_api_ak: 百度地图 API 的密钥，默认从配置文件中读取
+    :param map_freq: 百度地图 API 的每秒请求数上限，默认从配置文件中读取
+    :param concurrency: 同时进行的请求数上限，默认从配置文件中读取
+    :param indices: 各点的序号，作为 journal 中的键。给出 journal 时必填
+    :param journal: 断点记录，已记录的点不再请求
+    :return: 补上英文名的结果列表，中文相同的连续各点共用同一个 dict
+    """
+    size = len(point_infos)
+    keys = [tuple(point_info.get(name) for name in EN_KEY_FIELDS) for point_info in point_infos]
+    change_rows = [row for row in range(size) if row == 0 or keys[row] != keys[row - 1]]
+    en_func = get_point_info_en_func(source)
+    kwargs = {'host': nominatim_url} if source == 'nominatim' else {'ak': map_api_ak, 'freq': map_freq}
+    if concurrency is None:
+        concurrency = default_concurrency(source, map_freq)
+    chunk_func = _journaled(
+        lambda positions: [en_func(
+            float(latitude[change_rows[position]]), float(longitude[change_rows[position]]), point_infos[change_rows[position]],
+            **kwargs
+        ) for position in positions],
+        source, 'en', indices[change_rows] if journal is not None else None, journal, is_en_cacheable
+    )
+    en_infos = _run_chunks(chunk_func, len(change_rows), 1, concurrency, desc="Processing English Names")
+    results = []
+    for run, (start, en_info) in enumerate(zip(change_rows, en_infos)):
+        stop = change_rows[run + 1] if run + 1 < len(change_rows) else size
+        merged = {**point_infos[start], **en_info}
+        results.extend([merged] * (stop - start))
+    logger.info(f'Requested English names for {len(change_rows)} of {size} point(s)')
+    return results
+
+
+def default_sample_steps(source: str) -> tuple[Optional[float], Optional[float]]:
+    """
+    从配置文件中读取某个来源按间隔取点请求的距离、时间间隔。
+    :param source: 来源
+    :return: (距离间隔（米）, 时间间隔（秒）)，未配置为 None
+    """
+    source_config = getattr(CONFIG_HANDLER.config.area_info, source, None)
+    return getattr(source_config, 'sample_distance', None), getattr(source_config, 'sample_time', None)
+
+
+def geocode_route(source: str, latitude: np.ndarray, longitude: np.ndarray,
+                  distance: np.ndarray, elapsed_time: np.ndarray,
+                  sample_distance: float = None, sample_time: float = None, en_on_change: bool = None,
+                  indices: np.ndarray = None, journal: GeocodingJournal = None, **kwargs) -> list[dict]:
+    """
+    获取沿行程排列的各点的逆地理编码结果，只请求部分点。
+    每走过 sample_distance 米或经过 sample_time 秒（先到者为准）取一个点请求；相邻两个点的行政区划或道路不同时，
+    二分查找变化的确切位置（见 route_util.bisect_fill）。其余点沿用前后相同的结果。每一轮待请求的点并发请求。
+    en_on_change 时先只获取中文结果，再只在中文结果变化处获取英文名，见 fill_en_on_change。
+    :param source: 来源，nominatim / baidu / amap
+    :param latitude: 纬度数组
+    :param longitude: 经度数组
+    :param distance: 累计距离数组（米）
+    :param elapsed_time: 累计时间数组（秒）
+    :param sample_distance: 距离间隔，与 sample_time 都为空时从配置文件中读取；为 0 时不按距离取点
+    :param sample_time: 时间间隔，为 0 时不按时间取点
+    :param en_on_change: 是否只在中文结果变化处获取英文名，默认从配置文件中读取
+    :param indices: 各点的序号，作为 journal 中的键。给出 journal 时必填
+    :param journal: 断点记录，已记录的点不再请求，新结果逐点记录
+    :param kwargs: 传给 geocode_points 的参数
+    :return: 与输入顺序一致的 get_point_info 结果列表，结果相同的点共用同一个 dict
+    """
+    if en_on_change is None:
+        en_on_change = default_en_on_change(source)
+    if en_on_change and wants_en_result(source, kwargs.get('baidu_get_en_result')):
+        point_infos = geocode_route(source, latitude, longitude, distance, elapsed_time, sample_distance, sample_time,
+                                    en_on_change=False, indices=indices, journal=journal, get_en_result=False, **kwargs)
+        return fill_en_on_change(source, latitude, longitude, point_infos, indices=indices, journal=journal, **kwargs)
+
+    if journal is not None and indices is None:
+        raise ValueError('indices is required when journal is given')
+    if sample_distance is None and sample_time is None:
+        sample_distance, sample_time = default_sample_steps(source)
+    if not sample_distance and not sample_time:
+        return geocode_points(source, latitude, longitude, indices=indices, journal=journal, **kwargs)
+
+    anchors = sample_anchors(distance, elapsed_time, sample_distance, sample_time)
+    results: list[dict] = []
+    result_ids: dict[tuple, int] = {}
+
+    def probe(positions: np.ndarray) -> np.ndarray:
+        point_infos = geocode_points(
+            source, latitude[positions], longitude[positions], progress=progress,
+            indices=indices[positions] if indices is not None else None, journal=journal, **kwargs
+        )
+        ret = np.empty(len(positions), dtype=np.int64)
+        for i, point_info in enumerate(point_infos):
+            key = tuple(point_info.get(name) for name in SAMPLE_KEY_FIELDS)
+            if key not in result_ids:
+                result_ids[key] = len(results)
+                results.append(point_info)
+            ret[i] = result_ids[key]
+        return ret
+
+    with tqdm(desc="Processing GPX Points", unit='point(s)') as progress:
+        values, probe_count = bisect_fill(len(latitude), None, probe, anchors=anchors)
+    logger.info(f'Geocoded {probe_count} of {len(latitude)} point(s), {len(anchors)} sampled')
+    return [results[value] for value in values]
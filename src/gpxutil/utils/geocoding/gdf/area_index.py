@@ -0,0 +1,126 @@
+from typing import Iterable, List, Optional
+
+import numpy as np
+import shapely
+from geopandas import GeoDataFrame
+from shapely import Point
+
+from src.gpxutil.models.exceptions import PointAreaNotFoundException
+
+
+class AreaIndex:
+    """
+    行政区划多边形的空间索引。
+    将各 GeoDataFrame 的多边形按原顺序合并，建一棵 STRtree。查询时先按外包矩形筛出候选，
+    再用预处理（prepared）过的多边形精确判断包含关系。多个多边形都包含该点时，取原顺序中最靠前的，与逐行遍历的结果一致。
+    """
+
+    def __init__(self, area_gdf_list: Iterable[GeoDataFrame]):
+        """
+        :param area_gdf_list: 各地区的 geojson 文件转换为 GeoDataFrame 后的列表
+        """
+        geometries = []
+        ids = []
+        for gdf in area_gdf_list:
+            geometries.extend(gdf.geometry.values)
+            # 转为 Python 的 int / str：numpy 的整数作为 SQL 参数时按 BLOB 绑定，与数据库中的代码不相等
+            ids.extend(gdf['id'].tolist())
+        geometries = np.array(geometries, dtype=object)
+        ids = np.array(ids, dtype=object)
+        valid = ~shapely.is_missing(geometries) & ~shapely.is_empty(geometries)
+        self.geometries: np.ndarray = geometries[valid]
+        """全部多边形"""
+        self.ids: np.ndarray = ids[valid]
+        """多边形对应的行政区划代码"""
+        shapely.prepare(self.geometries)
+        self.tree = shapely.STRtree(self.geometries)
+
+    def __len__(self) -> int:
+        return len(self.geometries)
+
+    def find(self, point: Point) -> Optional[str]:
+        """
+        获取给定点所在地区的行政区划代码。
+        :param point: 点
+        :return: 行政区划代码，不在任何区域内为 None
+        """
+        candidates = self.tree.query(point)
+        if len(candidates) == 0:
+            return None
+        candidates.sort()
+        contains = shapely.contains(self.geometries[candidates], point)
+        if not contains.any():
+            return None
+        return self.ids[candidates[np.argmax(contains)]]
+
+    def find_many(self, longitude: np.ndarray, latitude: np.ndarray) -> np.ndarray:
+        """
+        批量获取各点所在的多边形：所有点一次性在 STRtree 中查询，结果与逐点调用 find 一致。
+        :param longitude: 经度数组
+        :param latitude: 纬度数组
+        :return: 各点所在多边形在 geometries、ids 中的下标，不在任何区域内为 -1
+        """
+        points = shapely.points(np.asarray(longitude, dtype=np.float64), np.asarray(latitude, dtype=np.float64))
+        ret = np.full(len(points), -1, dtype=np.int64)
+        if len(points) == 0 or len(self.geometries) == 0:
+            return ret
+        # within(点, 多边形) 与 contains(多边形, 点) 等价
+        point_indices, geometry_indices = self.tree.query(points, predicate='within')
+        # 同一个点落在多个多边形内时，取下标最小的
+        order = np.lexsort((geometry_indices, point_indices))
+        point_indices = point_indices[order]
+        geometry_indices = geometry_indices[order]
+        first = np.ones(len(point_indices), dtype=bool)
+        first[1:] = point_indices[1:] != point_indices[:-1]
+        ret[point_indices[first]] = geometry_indices[first]
+        return ret
+
+    def get_area_id(self, point: Point) -> str:
+        """
+        获取给定点所在地区的行政区划代码。
+        :param point: 点
+        :return: 行政区划代码
+        """
+        area_id = self.find(point)
+        if area_id is None:
+            raise PointAreaNotFoundException(f"点 ({point.x}, {point.y}) 不在任何已知区域内")
+        return area_id
+
+
+class AreaGDFList(list):
+    """
+    各地区 GeoDataFrame 的列表，附带空间索引。
+    索引在第一次使用时建立；列表内容变化后会重新建立。
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._area_index: Optional[AreaIndex] = None
+        self._indexed_gdf_ids: Optional[List[int]] = None
+
+    @property
+    def area_index(self) -> AreaIndex:
+        gdf_ids = [id(gdf) for gdf in self]
+        if self._area_index is None or self._indexed_gdf_ids != gdf_ids:
+            self._area_index = AreaIndex(self)
+            self._indexed_gdf_ids = gdf_ids
+        return self._area_index
+
+
+_last_area_index: Optional[tuple[list, List[int], AreaIndex]] = None
+"""最近一次为普通列表建立的索引，避免对同一个列表逐点重复建索引"""
+
+
+def get_area_index(area_gdf_list: List[GeoDataFrame]) -> AreaIndex:
+    """
+    获取 GeoDataFrame 列表对应的空间索引。
+    :param area_gdf_list: 各地区的 geojson 文件转换为 GeoDataFrame 后的列表
+    :return: AreaIndex
+    """
+    global _last_area_index
+    if isinstance(area_gdf_list, AreaGDFList):
+        return area_gdf_list.area_index
+    gdf_ids = [id(gdf) for gdf in area_gdf_list]
+    if _last_area_index is None or _last_area_index[0] is not area_gdf_list or _last_area_index[1] != gdf_ids:
+        _last_area_index = (area_gdf_list, gdf_ids, AreaIndex(area_gdf_list))
+    return _last_area_index[2]
@@ -1,26 +1,31 @@
 import sqlite3
-from typing import List
+from typing import Iterable, List, Optional
+
+import numpy as np
 
 from geopandas import GeoDataFrame
+from loguru import logger
 from shapely import Point
 
 from src.gpxutil.models.exceptions import PointAreaNotFoundException
+from src.gpxutil.utils.geocoding.gdf.area_index import get_area_index
+from src.gpxutil.utils.route_util import bisect_fill
+
+
+def _sql_param(area_id):
+    """numpy 的标量（如边界数据中整数的代码）转为 Python 的 int / str，否则 sqlite3 按 BLOB 绑定，与数据库中的代码不相等"""
+    return area_id.item() if isinstance(area_id, np.generic) else area_id
 
 
 def get_area_id(point: Point, area_gdf_list: List[GeoDataFrame]) -> str:
     """
     获取给定点所在地区的行政区划代码。
+    通过所有多边形上的空间索引查询，只对外包矩形包含该点的多边形做精确判断。
     :param point: 点
     :param area_gdf_list: 各地区的 geojson 文件转换为 GeoDataFrame 后的列表
     :return:
     """
-    for i, gdf in enumerate(area_gdf_list):
-        for index, row in gdf.iterrows():
-            polygon = row['geometry']  # 获取多边形
-            if polygon.contains(point):  # 判断点是否在多边形内
-                # print(f"点 ({point.x}, {point.y}) 在区域 {row['id']} 中，区域名称为 {row['name']}")
-                return row['id']
-    raise PointAreaNotFoundException(f"点 ({point.x}, {point.y}) 不在任何已知区域内")
+    return get_area_index(area_gdf_list).get_area_id(point)
 
 
 def get_area_info(point: Point, area_gdf_list: List[GeoDataFrame], area_code_conn: sqlite3.Connection):
@@ -44,7 +49,75 @@ def get_area_info(point: Point, area_gdf_list: List[GeoDataFrame], area_code_con
         and city.code = area.cityCode
         and area.code = ?
     """
-    cursor.execute(sql, (area_id,))
+    cursor.execute(sql, (_sql_param(area_id),))
     result = cursor.fetchone()
     cursor.close()
     return result
+
+
+AREA_NAME_QUERY_CHUNK_SIZE = 500
+"""批量查询行政区划名称时，每条 SQL 中的代码个数，不超过 SQLite 的参数个数限制"""
+
+
+def get_area_names(area_ids: Iterable[str], area_code_conn: sqlite3.Connection) -> dict[str, tuple[str, str, str]]:
+    """
+    批量获取行政区划代码对应的省级、市级、县级名称。
+    :param area_ids: 行政区划代码，字符串或整数
+    :param area_code_conn: 存放行政区划代码关系的 SQLite 数据库连接
+    :return: {str(行政区划代码): (省级, 市级, 县级名称)}，数据库中没有的代码不在结果中
+    """
+    area_ids = list(dict.fromkeys(_sql_param(area_id) for area_id in area_ids))
+    ret = {}
+    cursor = area_code_conn.cursor()
+    for start in range(0, len(area_ids), AREA_NAME_QUERY_CHUNK_SIZE):
+        chunk = area_ids[start:start + AREA_NAME_QUERY_CHUNK_SIZE]
+        sql = f"""
+        select area.code, province.name, city.name, area.name
+        from province, city, area
+        where
+            province.code = area.provinceCode
+            and city.code = area.cityCode
+            and area.code in ({', '.join('?' * len(chunk))})
+        """
+        cursor.execute(sql, chunk)
+        for code, province_name, city_name, area_name in cursor.fetchall():
+            ret[str(code)] = (province_name, city_name, area_name)
+    cursor.close()
+    return ret
+
+
+def get_area_info_many(
+        longitude: np.ndarray, latitude: np.ndarray,
+        area_gdf_list: List[GeoDataFrame], area_code_conn: sqlite3.Connection,
+        bisect_step: Optional[int] = None,
+) -> tuple[np.ndarray, list[Optional[tuple[str, str, str]]]]:
+    """
+    批量获取各点所在地区的行政区划信息。所有点一次性做空间查询，不同的行政区划代码只查一次数据库。
+    :param longitude: 经度数组
+    :param latitude: 纬度数组
+    :param area_gdf_list: 各地区的 geojson 文件转换为 GeoDataFrame 后的列表
+    :param area_code_conn: 存放行政区划代码关系的 SQLite 数据库连接
+    :param bisect_step: 不为空时，各点须按行程顺序排列：每隔 bisect_step 个点判断一次，只在相邻两次结果不同时二分查找边界，
+                        见 route_util.bisect_fill。为空时判断每个点
+    :return: (各点的结果下标, 结果列表)。结果为省级、市级、县级行政区划名称，找不到为 None。
+             第 i 个点的结果为 结果列表[结果下标[i]]
+    """
+    area_index = get_area_index(area_gdf_list)
+    if bisect_step:
+        longitude = np.asarray(longitude, dtype=np.float64)
+        latitude = np.asarray(latitude, dtype=np.float64)
+        geometry_indices, probe_count = bisect_fill(
+            len(longitude), bisect_step, lambda indices: area_index.find_many(longitude[indices], latitude[indices])
+        )
+        logger.info(f"Area lookup tested {probe_count} of {len(longitude)} point(s), "
+                    f"{len(longitude) - probe_count} containment test(s) saved")
+    else:
+        geometry_indices = area_index.find_many(longitude, latitude)
+    distinct_geometry_indices, inverse = np.unique(geometry_indices, return_inverse=True)
+    found = distinct_geometry_indices[distinct_geometry_indices >= 0]
+    area_names = get_area_names((area_index.ids[i] for i in found), area_code_conn)
+    results = [
+        area_names.get(str(area_index.ids[i])) if i >= 0 else None
+        for i in distinct_geometry_indices
+    ]
+    return inverse.reshape(-1), results
@@ -0,0 +1,124 @@
+"""
+行政区划 GeoJSON 目录的二进制缓存。
+
+将目录下所有 .json/.geojson 文件编译为一个 .npz 文件：多边形存为 WKB，属性存为 JSON。
+启动时整体读入并批量解码，不再逐个解析 GeoJSON。缓存中记录了各源文件的文件名、修改时间和大小，
+源文件有增删改时自动失效，重新编译。
+"""
+
+import json
+import os
+from typing import Optional
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pyproj
+import shapely
+from loguru import logger
+
+from src.gpxutil.utils.geocoding.gdf.area_index import AreaGDFList
+
+AREA_GDF_CACHE_FILENAME = '.area_gdf_cache.npz'
+"""默认的缓存文件名，放在 GeoJSON 目录下"""
+
+AREA_GDF_CACHE_VERSION = 1
+"""缓存格式版本，格式变化时递增，使旧缓存失效"""
+
+
+def is_area_geojson_file(filename: str) -> bool:
+    return filename.endswith(".json") or filename.endswith(".geojson")
+
+
+def default_cache_path(geojson_dir: str) -> str:
+    return os.path.join(geojson_dir, AREA_GDF_CACHE_FILENAME)
+
+
+def build_manifest(geojson_dir: str) -> dict:
+    """
+    生成源文件清单，用于判断缓存是否失效。
+    :param geojson_dir: GeoJSON 目录
+    :return: {'version': 缓存格式版本, 'files': [[文件名, 修改时间（纳秒）, 大小], ...]}
+    """
+    files = []
+    for filename in sorted(os.listdir(geojson_dir)):
+        if is_area_geojson_file(filename):
+            stat = os.stat(os.path.join(geojson_dir, filename))
+            files.append([filename, stat.st_mtime_ns, stat.st_size])
+    return {'version': AREA_GDF_CACHE_VERSION, 'files': files}
+
+
+def write_area_gdf_cache(cache_path: str, gdf_list: list[gpd.GeoDataFrame], manifest: dict):
+    """
+    将 GeoDataFrame 列表写入缓存文件。
+    :param cache_path: 缓存文件路径
+    :param gdf_list: 各地区的 GeoDataFrame，与 manifest 中的文件一一对应
+    :param manifest: 源文件清单
+    :return: None
+    """
+    wkb_list = []
+    attributes = []
+    crs_list = []
+    row_counts = []
+    for gdf in gdf_list:
+        wkb_list.extend(shapely.to_wkb(gdf.geometry.values))
+        attributes.append(gdf.drop(columns=gdf.geometry.name).to_json(orient='split', force_ascii=False))
+        crs_list.append(gdf.crs.to_wkt() if gdf.crs is not None else '')
+        row_counts.append(len(gdf))
+    missing = np.array([wkb is None for wkb in wkb_list], dtype=bool)
+    lengths = np.array([len(wkb) if wkb is not None else 0 for wkb in wkb_list], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    wkb = np.frombuffer(b''.join(wkb for wkb in wkb_list if wkb is not None), dtype=np.uint8)
+    # 先写临时文件再改名，避免中断时留下不完整的缓存
+    tmp_path = cache_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(
+            f,
+            manifest=np.array(json.dumps(manifest)),
+            wkb=wkb, wkb_offsets=offsets, wkb_missing=missing,
+            row_counts=np.array(row_counts, dtype=np.int64),
+            attributes=np.array(attributes, dtype=str),
+            crs=np.array(crs_list, dtype=str),
+        )
+    os.replace(tmp_path, cache_path)
+
+
+def read_area_gdf_cache(cache_path: str, manifest: dict) -> Optional[AreaGDFList]:
+    """
+    读取缓存文件。缓存不存在、已损坏或与源文件清单不一致时返回 None。
+    :param cache_path: 缓存文件路径
+    :param manifest: 当前的源文件清单
+    :return: AreaGDFList 或 None
+    """
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with np.load(cache_path, allow_pickle=False) as cache:
+            if json.loads(str(cache['manifest'])) != manifest:
+                logger.info(f"Area GeoJSON cache is out of date: {cache_path}")
+                return None
+            wkb = cache['wkb'].tobytes()
+            offsets = cache['wkb_offsets']
+            missing = cache['wkb_missing']
+            row_counts = cache['row_counts']
+            attributes = cache['attributes']
+            crs_list = cache['crs']
+    except Exception as e:
+        logger.warning(f"Failed to read area GeoJSON cache {cache_path}: {e}")
+        return None
+    geometries = shapely.from_wkb(np.array(
+        [None if missing[i] else wkb[offsets[i]:offsets[i + 1]] for i in range(len(missing))], dtype=object
+    ))
+    gdf_list = AreaGDFList()
+    crs_objects = {}
+    start = 0
+    for row_count, attribute_json, crs in zip(row_counts, attributes, crs_list):
+        # 直接构建 DataFrame，比 pd.read_json 少了逐列的类型推断
+        split = json.loads(str(attribute_json))
+        df = pd.DataFrame(split['data'], index=split['index'], columns=split['columns'])
+        crs = str(crs)
+        if crs and crs not in crs_objects:
+            crs_objects[crs] = pyproj.CRS.from_wkt(crs)
+        gdf_list.append(gpd.GeoDataFrame(df, geometry=geometries[start:start + row_count], crs=crs_objects.get(crs)))
+        start += row_count
+    return gdf_list
@@ -2,22 +2,47 @@ import os
 import threading
 
 import geopandas as gpd
-from geopandas import GeoDataFrame
 from loguru import logger
 from tqdm import tqdm
 
 from src.gpxutil.core.config import CONFIG_HANDLER
+from src.gpxutil.utils.geocoding.gdf.area_index import AreaGDFList
+from src.gpxutil.utils.geocoding.gdf.gdf_cache import build_manifest, default_cache_path, is_area_geojson_file, \
+    read_area_gdf_cache, write_area_gdf_cache
 try:
     GEOJSON_DIR = CONFIG_HANDLER.config.area_info.gdf.gdf_dir_path
+    GEOJSON_CACHE_PATH = CONFIG_HANDLER.config.area_info.gdf.cache_path
 except Exception as e:
     logger.warning(e)
 
-def load_area_gdf_list(geojson_dir: str) -> list[GeoDataFrame]:
-    gdf_list = []
-    filename_list = os.listdir(geojson_dir)
+def load_area_gdf_list(geojson_dir: str, use_cache: bool = True, cache_path: str = None) -> AreaGDFList:
+    """
+    加载目录下各地区的 geojson 文件。
+    默认优先读取编译好的二进制缓存（见 gdf_cache）；缓存不存在或源文件有变化时逐个解析，并重新生成缓存。
+    :param geojson_dir: geojson 文件目录
+    :param use_cache: 是否使用缓存
+    :param cache_path: 缓存文件路径，默认为目录下的 .area_gdf_cache.npz
+    :return: AreaGDFList
+    """
+    if use_cache:
+        if cache_path is None:
+            cache_path = default_cache_path(geojson_dir)
+        manifest = build_manifest(geojson_dir)
+        gdf_list = read_area_gdf_cache(cache_path, manifest)
+        if gdf_list is not None:
+            logger.info(f"Area GeoJSON loaded from cache: {cache_path}")
+            return gdf_list
+    gdf_list = AreaGDFList()
+    filename_list = sorted(os.listdir(geojson_dir))
     for filename in tqdm(filename_list, total=len(filename_list), desc="Load Area GeoJSON files", unit='file(s)'):
-        if filename.endswith(".json") or filename.endswith(".geojson"):
+        if is_area_geojson_file(filename):
             gdf_list.append(gpd.read_file(os.path.join(geojson_dir, filename)))
+    if use_cache:
+        try:
+            write_area_gdf_cache(cache_path, gdf_list, manifest)
+            logger.info(f"Area GeoJSON cache written: {cache_path}")
+        except OSError as e:
+            logger.warning(f"Failed to write area GeoJSON cache {cache_path}: {e}")
     return gdf_list
 
 class GDFListHandler:
@@ -25,18 +50,22 @@ class GDFListHandler:
     _instance = None  # 显式声明类变量用于存储单例实例
     _initialized = False  # 类变量用于跟踪是否已初始化
 
-    def __init__(self, geojson_dir: str = None):
+    def __init__(self, geojson_dir: str = None, cache_path: str = None):
         # 通过类变量控制初始化逻辑，确保只执行一次
         if not GDFListHandler._initialized:
             if geojson_dir is not None:
                 self.geojson_dir = geojson_dir
+                self.cache_path = cache_path
             else:
                 if CONFIG_HANDLER.config.area_info.gdf is None:
                     logger.warning("GEOJSON_DIR is not set in config.yaml")
                     return
                 else:
                     self.geojson_dir = GEOJSON_DIR
+                    self.cache_path = cache_path if cache_path is not None else GEOJSON_CACHE_PATH
             self.list = self.load()
+            # 加载时即建立空间索引
+            logger.info(f"Area index built: {len(self.list.area_index)} polygon(s)")
             GDFListHandler._initialized = True  # 标记为已初始化
 
     def __new__(cls, *args, **kwargs):
@@ -47,7 +76,7 @@ class GDFListHandler:
         return cls._instance
 
     def load(self):
-        return load_area_gdf_list(self.geojson_dir)
+        return load_area_gdf_list(self.geojson_dir, cache_path=self.cache_path)
 
 if __name__ == '__main__':
     GDF_LIST_HANDLER = GDFListHandler()
@@ -0,0 +1,93 @@
+"""
+逆地理编码 API 共用的 HTTP 客户端。
+
+每个域名一个 requests.Session，挂载连接池大小可配置的 HTTPAdapter，请求之间复用 TCP（及 TLS）连接，
+不再每次请求都重新建立连接。各来源的请求都应通过这里的 get 发出。
+"""
+
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.gpxutil.core.config import CONFIG_HANDLER
+
+
+class HttpClientHandler:
+    """
+    按域名保存 Session 的连接池，单例。可在多个线程中共用。
+    """
+    _instance_lock = threading.Lock()
+    _instance = None
+    _initialized = False
+
+    def __init__(self):
+        if not HttpClientHandler._initialized:
+            http_config = CONFIG_HANDLER.config.area_info.http
+            self.pool_size: int = http_config.pool_size
+            """每个域名最多保持的连接数"""
+            self.timeout: tuple[float, float] = (http_config.connect_timeout, http_config.read_timeout)
+            """(建立连接的超时时间, 等待响应的超时时间)"""
+            self._sessions: dict[str, requests.Session] = {}
+            self._sessions_lock = threading.Lock()
+            HttpClientHandler._initialized = True
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            with cls._instance_lock:
+                if not cls._instance:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def session(self, url: str) -> requests.Session:
+        """
+        获取 url 所在域名的 Session，不存在则创建。
+        :param url: 请求地址
+        :return: requests.Session
+        """
+        parts = urlsplit(url)
+        key = f'{parts.scheme}://{parts.netloc}'
+        session = self._sessions.get(key)
+        if session is None:
+            with self._sessions_lock:
+                session = self._sessions.get(key)
+                if session is None:
+                    session = requests.Session()
+                    # 连接都在用时等待空闲连接，而不是新建一个用后即弃的连接
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, pool_block=True)
+                    session.mount(key, adapter)
+                    self._sessions[key] = session
+        return session
+
+    def get(self, url: str, params: dict = None, **kwargs) -> requests.Response:
+        """
+        发出 GET 请求。
+        :param url: 请求地址
+        :param params: 查询参数
+        :param kwargs: 其余传给 requests.Session.get 的参数
+        :return: requests.Response
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session(url).get(url, params=params, **kwargs)
+
+    def close(self):
+        """
+        关闭所有连接。
+        :return: None
+        """
+        with self._sessions_lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+def get(url: str, params: dict = None, **kwargs) -> requests.Response:
+    """
+    通过共用的连接池发出 GET 请求。
+    :param url: 请求地址
+    :param params: 查询参数
+    :param kwargs: 其余传给 requests.Session.get 的参数
+    :return: requests.Response
+    """
+    return HttpClientHandler().get(url, params=params, **kwargs)
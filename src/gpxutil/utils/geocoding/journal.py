@@ -0,0 +1,152 @@
+"""
+逆地理编码任务的断点记录（journal），中断后重新运行时跳过已完成的点。
+
+journal 为追加写入的 JSON Lines 文件：第一行记录输入文件与设置的哈希（见 job_hash），之后每行为一个点的结果，
+键为 (来源, 结果类型, 点的序号)。每写一行都写入操作系统，每隔 GEOCODING_JOURNAL_FSYNC_INTERVAL 秒 fsync 一次。
+打开时哈希不一致，说明是另一个文件或另一组设置（API 地址、密钥等）的记录，清空重写；最后一行不完整（写到一半时中断）时忽略。
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+from loguru import logger
+
+GEOCODING_JOURNAL_FSYNC_INTERVAL = 5
+"""每隔多少秒将 journal 写入磁盘（fsync）"""
+
+
+def file_hash(path: str) -> str:
+    """
+    计算文件内容的 SHA-256。
+    :param path: 文件路径
+    :return: 十六进制字符串
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def job_hash(input_hash: str, settings: dict) -> str:
+    """
+    将输入文件的哈希与影响结果的设置一起计算哈希，设置变化时视为另一个任务。
+    :param input_hash: 输入文件的哈希，见 file_hash；通常与设置一起计算，见 job_hash
+    :param settings: 影响结果的设置，如来源、API 地址，须能转为 JSON
+    :return: 十六进制字符串
+    """
+    key = json.dumps([input_hash, settings], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+class GeocodingJournal:
+    """
+    逆地理编码任务的断点记录。可在多个线程中共用。
+    """
+
+    def __init__(self, path: str, input_hash: str, fsync_interval: float = GEOCODING_JOURNAL_FSYNC_INTERVAL):
+        """
+        :param path: journal 文件路径
+        :param input_hash: 输入文件的哈希，见 file_hash
+        :param fsync_interval: 每隔多少秒 fsync 一次
+        """
+        self.path = path
+        self.input_hash = input_hash
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, str, int], dict] = {}
+        self._file = None
+        self._last_fsync = time.monotonic()
+        self._load()
+        if self._file is None:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._file = open(path, 'w', encoding='utf-8', newline='')
+            self._write_line({'input_hash': input_hash})
+            self._fsync()
+
+    def _load(self):
+        """读取已有的记录。哈希一致时以追加方式打开，否则保持 _file 为空"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8', newline='') as f:
+            # 每一行都以换行结尾，最后一项为空或写了一半的行
+            lines = f.read().split('\n')
+        try:
+            header = json.loads(lines[0]) if len(lines) > 1 else None
+        except ValueError:
+            header = None
+        if not isinstance(header, dict) or header.get('input_hash') != self.input_hash:
+            logger.info(f'Geocoding journal {self.path} belongs to another input or settings, starting over')
+            return
+        valid_size = len(lines[0].encode('utf-8')) + 1
+        for line in lines[1:-1]:
+            try:
+                entry = json.loads(line)
+                self._entries[(entry['source'], entry['kind'], entry['index'])] = entry['result']
+            except (ValueError, KeyError, TypeError):
+                # 中断时写了一半的行
+                break
+            valid_size += len(line.encode('utf-8')) + 1
+        # 去掉不完整的行，之后从这里追加
+        os.truncate(self.path, valid_size)
+        self._file = open(self.path, 'a', encoding='utf-8', newline='')
+        logger.info(f'Resuming from geocoding journal {self.path}: {len(self._entries)} result(s)')
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, source: str, kind: str, index: int) -> Optional[dict]:
+        """
+        读取一个点已完成的结果。
+        :param source: 来源
+        :param kind: 结果类型，如只含中文、中英文、只含英文
+        :param index: 点的序号
+        :return: 结果，没有时为 None
+        """
+        return self._entries.get((source, kind, int(index)))
+
+    def put(self, source: str, kind: str, index: int, result: dict):
+        """
+        记录一个点的结果。
+        :param source: 来源
+        :param kind: 结果类型
+        :param index: 点的序号
+        :param result: 结果
+        """
+        index = int(index)
+        with self._lock:
+            self._entries[(source, kind, index)] = result
+            self._write_line({'source': source, 'kind': kind, 'index': index, 'result': result})
+            if time.monotonic() - self._last_fsync >= self.fsync_interval:
+                self._fsync()
+
+    def _write_line(self, entry: dict):
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def _fsync(self):
+        os.fsync(self._file.fileno())
+        self._last_fsync = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None and not self._file.closed:
+                self._fsync()
+                self._file.close()
+
+    def remove(self):
+        """任务完成后删除 journal 文件"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,300 @@
+"""
+百度、高德地图 API 的多密钥轮换与每日配额计数。
+
+每个来源可配置多个密钥，各有每秒请求数上限（freq）与每日请求数上限（daily_limit）。
+请求按 freq 加权平滑轮询（smooth weighted round-robin）分配到各密钥，各密钥的请求间隔由各自的令牌桶限制。
+返回并发超限的错误码时，该密钥暂停 KEY_QPS_COOLDOWN 秒；返回配额超限或密钥无效的错误码时，当天不再使用，
+换下一个密钥重试。各密钥当天的请求数保存在本地文件中，下次运行时继续计数，按北京时间每日清零。
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from loguru import logger
+
+from src.gpxutil.core.config import CONFIG_HANDLER
+from src.gpxutil.models.exceptions import MapApiQuotaExceededException
+from src.gpxutil.utils.geocoding.rate_limit import TokenBucket
+
+KEY_QPS_COOLDOWN = 1.0
+"""密钥返回并发超限后暂停使用的秒数"""
+
+KEY_USAGE_SAVE_INTERVAL = 50
+"""每计数多少次请求保存一次用量文件"""
+
+QUOTA_TIMEZONE = timezone(timedelta(hours=8))
+"""每日配额按北京时间零点清零"""
+
+BAIDU_QPS_STATUS = {401, 402}
+"""百度：并发超限"""
+
+BAIDU_NOT_KEY_STATUS = {1, 2}
+"""百度：服务器内部错误、请求参数非法，与密钥无关，不换密钥"""
+
+AMAP_QPS_INFOCODES = {'10004', '10014', '10019', '10020', '10021'}
+"""高德：访问过于频繁、QPS 超限"""
+
+AMAP_QUOTA_INFOCODES = {'10001', '10002', '10003', '10005', '10009', '10010', '10011', '10012', '10013', '10044', '10045'}
+"""高德：密钥无效、无权限、日配额超限"""
+
+
+def baidu_key_error(resp: dict) -> Optional[str]:
+    """
+    判断百度的结果是否为与密钥有关的错误。
+    :param resp: 百度 API 的结果
+    :return: 'qps'（并发超限）、'quota'（配额超限、密钥无效等）或 None
+    """
+    status = resp.get('status')
+    if status == 0 or status in BAIDU_NOT_KEY_STATUS:
+        return None
+    return 'qps' if status in BAIDU_QPS_STATUS else 'quota'
+
+
+def amap_key_error(resp: dict) -> Optional[str]:
+    """
+    判断高德的结果是否为与密钥有关的错误。
+    :param resp: 高德 API 的结果
+    :return: 'qps'、'quota' 或 None
+    """
+    infocode = str(resp.get('infocode'))
+    if infocode in AMAP_QPS_INFOCODES:
+        return 'qps'
+    if infocode in AMAP_QUOTA_INFOCODES:
+        return 'quota'
+    return None
+
+
+KEY_ERROR_FUNCS: dict[str, Callable[[dict], Optional[str]]] = {'baidu': baidu_key_error, 'amap': amap_key_error}
+
+
+def _today() -> str:
+    return datetime.now(QUOTA_TIMEZONE).strftime('%Y-%m-%d')
+
+
+def _key_id(source: str, ak: str) -> str:
+    """用量文件中不保存密钥本身"""
+    return f'{source}:{hashlib.sha256(ak.encode("utf-8")).hexdigest()[:16]}'
+
+
+class KeyUsageStore:
+    """
+    各密钥当天的请求数，保存在 JSON 文件中。可在多个线程中共用。
+    """
+
+    def __init__(self, path: Optional[str]):
+        """
+        :param path: 用量文件路径，为空时只在内存中计数
+        """
+        self.path = path
+        self.date = _today()
+        self.counts: dict[str, int] = {}
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('date') == self.date:
+                    self.counts = {key: int(count) for key, count in data.get('counts', {}).items()}
+            except (ValueError, OSError) as e:
+                logger.warning(f'Failed to read API key usage from {path}: {e}')
+
+    def _roll_over(self):
+        today = _today()
+        if today != self.date:
+            self.date = today
+            self.counts = {}
+
+    def used(self, key_id: str) -> int:
+        with self._lock:
+            self._roll_over()
+            return self.counts.get(key_id, 0)
+
+    def add(self, key_id: str):
+        with self._lock:
+            self._roll_over()
+            self.counts[key_id] = self.counts.get(key_id, 0) + 1
+            self._unsaved += 1
+            if self._unsaved >= KEY_USAGE_SAVE_INTERVAL:
+                self._save()
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        self._unsaved = 0
+        if not self.path:
+            return
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'date': self.date, 'counts': self.counts}, f)
+        os.replace(tmp_path, self.path)
+
+
+class ApiKey:
+    """一个密钥及其状态"""
+
+    def __init__(self, source: str, ak: str, freq: Optional[float], daily_limit: Optional[int] = None):
+        self.ak = ak
+        self.id = _key_id(source, ak or '')
+        self.freq = freq
+        self.daily_limit = daily_limit
+        self.weight = freq if freq and freq > 0 else 1
+        """轮询的权重"""
+        self.current_weight = 0.0
+        self.blocked_until = 0.0
+        """并发超限后暂停到的时刻（time.monotonic）"""
+        self.exhausted_date: Optional[str] = None
+        """配额超限的日期，当天不再使用"""
+        self.rate_limiter = TokenBucket(freq) if freq and freq > 0 else None
+
+
+class KeyPool:
+    """
+    一个来源的多个密钥。可在多个线程中共用。
+    """
+
+    def __init__(self, source: str, keys: list[ApiKey], usage: KeyUsageStore):
+        """
+        :param source: 来源，baidu / amap
+        :param keys: 密钥
+        :param usage: 各密钥当天的请求数
+        """
+        if not keys:
+            raise ValueError(f'No API key for {source}')
+        self.source = source
+        self.keys = keys
+        self.usage = usage
+        self._lock = threading.Lock()
+
+    def _available(self, key: ApiKey, today: str) -> bool:
+        if key.exhausted_date == today:
+            return False
+        return key.daily_limit is None or self.usage.used(key.id) < key.daily_limit
+
+    def acquire(self) -> Optional[ApiKey]:
+        """
+        按权重轮询选出一个可用的密钥，计入当天的用量，并等待该密钥的令牌桶。
+        所有密钥都在暂停中时等待；当天的配额都已用完时返回 None。
+        :return: ApiKey 或 None
+        """
+        while True:
+            with self._lock:
+                today = _today()
+                available = [key for key in self.keys if self._available(key, today)]
+                if not available:
+                    return None
+                now = time.monotonic()
+                ready = [key for key in available if key.blocked_until <= now]
+                if ready:
+                    total = sum(key.weight for key in ready)
+                    for key in ready:
+                        key.current_weight += key.weight
+                    chosen = max(ready, key=lambda key: key.current_weight)
+                    chosen.current_weight -= total
+                    self.usage.add(chosen.id)
+                    break
+                wait = min(key.blocked_until for key in available) - now
+            time.sleep(max(wait, 0))
+        if chosen.rate_limiter is not None:
+            chosen.rate_limiter.acquire()
+        return chosen
+
+    def report(self, key: ApiKey, error: Optional[str]):
+        """
+        记录一次请求的结果。
+        :param key: 使用的密钥
+        :param error: 'qps'、'quota' 或 None，见 baidu_key_error
+        """
+        if error == 'qps':
+            logger.warning(f'{self.source} API key {key.id} exceeded its QPS limit, pausing for {KEY_QPS_COOLDOWN}s')
+            with self._lock:
+                key.blocked_until = time.monotonic() + KEY_QPS_COOLDOWN
+        elif error == 'quota':
+            logger.warning(f'{self.source} API key {key.id} is out of quota or invalid, skipped for today')
+            with self._lock:
+                key.exhausted_date = _today()
+
+
+_usage_store: Optional[KeyUsageStore] = None
+_key_pools: dict[tuple, KeyPool] = {}
+_key_pools_lock = threading.Lock()
+
+
+def get_key_usage_store() -> KeyUsageStore:
+    """
+    获取共用的用量记录，路径从配置文件中读取。程序退出时保存。
+    :return: KeyUsageStore
+    """
+    global _usage_store
+    with _key_pools_lock:
+        if _usage_store is None:
+            _usage_store = KeyUsageStore(CONFIG_HANDLER.config.area_info.key_usage_path)
+            atexit.register(_usage_store.save)
+        return _usage_store
+
+
+def get_key_pool(source: str, ak: str = None, freq: int = None) -> KeyPool:
+    """
+    获取某个来源共用的密钥池。
+    给出 ak 时只使用该密钥；否则使用配置文件中的 keys，未配置 keys 时使用配置文件中的 ak。
+    :param source: 来源，baidu / amap
+    :param ak: 密钥，默认从配置文件中读取
+    :param freq: 只有一个密钥时的每秒请求数上限，默认从配置文件中读取
+    :return: KeyPool
+    """
+    source_config = getattr(CONFIG_HANDLER.config.area_info, source, None)
+    if ak is None and source_config is not None and source_config.keys:
+        pool_key = (source,)
+        key_configs = [(key.ak, key.freq, key.daily_limit) for key in source_config.keys]
+    else:
+        ak = ak or getattr(source_config, 'ak', None)
+        freq = freq or getattr(source_config, 'freq', None)
+        pool_key = (source, ak, freq)
+        key_configs = [(ak, freq, None)]
+    pool = _key_pools.get(pool_key)
+    if pool is None:
+        usage = get_key_usage_store()
+        with _key_pools_lock:
+            pool = _key_pools.get(pool_key)
+            if pool is None:
+                pool = _key_pools[pool_key] = KeyPool(
+                    source, [ApiKey(source, *key_config) for key_config in key_configs], usage
+                )
+    return pool
+
+
+def request_with_key_pool(source: str, send: Callable[[str], dict], ak: str = None, freq: int = None) -> dict:
+    """
+    用密钥池中的密钥发出请求。密钥返回并发、配额错误时换一个密钥重试，所有密钥都试过后返回最后一次的结果。
+    :param source: 来源，baidu / amap
+    :param send: 用给定的密钥发出请求，返回 API 的结果
+    :param ak: 密钥，默认从配置文件中读取
+    :param freq: 只有一个密钥时的每秒请求数上限，默认从配置文件中读取
+    :return: API 的结果
+    :raises MapApiQuotaExceededException: 所有密钥当天的配额都已用完
+    """
+    pool = get_key_pool(source, ak, freq)
+    key_error = KEY_ERROR_FUNCS[source]
+    resp = None
+    for _ in range(len(pool.keys) + 1):
+        key = pool.acquire()
+        if key is None:
+            break
+        resp = send(key.ak)
+        error = key_error(resp)
+        pool.report(key, error)
+        if error is None:
+            return resp
+    if resp is None:
+        raise MapApiQuotaExceededException(f'All {source} API keys are out of quota for today')
+    return resp
@@ -1,8 +1,34 @@
-import requests
+import threading
+from typing import Optional
+
 from loguru import logger
 
 from src.gpxutil.core.config import CONFIG_HANDLER
+from src.gpxutil.models.config import NominatimConfig
+from src.gpxutil.utils.geocoding import http_client
+from src.gpxutil.utils.geocoding.cache import LRUCache, cached_point_info, get_lru_cache, is_en_cacheable
+from src.gpxutil.utils.geocoding.rate_limit import TokenBucket
+
+_rate_limiter: Optional[TokenBucket] = None
+"""各线程共用的令牌桶，按配置的 freq 创建"""
+_rate_limiter_lock = threading.Lock()
+
 
+def _throttle():
+    """
+    按配置的 nominatim.freq 限制每秒的请求数，未配置时不限制。每次请求 API 前调用。
+    :return: None
+    """
+    global _rate_limiter
+    nominatim_config = CONFIG_HANDLER.config.area_info.nominatim
+    freq = nominatim_config.freq if nominatim_config is not None else None
+    if not freq or freq <= 0:
+        return
+    with _rate_limiter_lock:
+        if _rate_limiter is None or _rate_limiter.rate != freq:
+            _rate_limiter = TokenBucket(freq)
+        rate_limiter = _rate_limiter
+    rate_limiter.acquire()
 
 def reverse(lat, lon, accept_language: str = 'zh-CN', host: str = None):
     host = host or CONFIG_HANDLER.config.area_info.nominatim.url
@@ -16,7 +42,8 @@ def reverse(lat, lon, accept_language: str = 'zh-CN', host: str = None):
         'zoom': 17,
         'accept-language': accept_language
     }
-    return requests.get(url, params=params).json()
+    _throttle()
+    return http_client.get(url, params=params).json()
 
 def search(query, host: str = None):
     host = host or CONFIG_HANDLER.config.area_info.nominatim.url
@@ -25,7 +52,8 @@ def search(query, host: str = None):
         'q': query,
         'addressdetails': 1,
     }
-    return requests.get(url, params=params).json()
+    _throttle()
+    return http_client.get(url, params=params).json()
 
 def details(place_id, host: str = None):
     host = host or CONFIG_HANDLER.config.area_info.nominatim.url
@@ -33,16 +61,67 @@ def details(place_id, host: str = None):
     params = {
         'place_id': place_id,
     }
-    return requests.get(url, params=params).json()
+    _throttle()
+    return http_client.get(url, params=params).json()
+
+def _get_lru_cache(name: str) -> LRUCache:
+    nominatim_config = CONFIG_HANDLER.config.area_info.nominatim or NominatimConfig(url='')
+    return get_lru_cache(name, nominatim_config.lru_cache_size, nominatim_config.lru_cache_persist)
+
+def details_names(place_id, host: str = None) -> dict:
+    """
+    获取道路的各种名称（names），按 place_id 缓存。同一道路上的连续各点只请求一次 details。
+    :param place_id: Nominatim 的 place_id
+    :param host: Nominatim API 地址
+    :return: details 结果中的 names
+    """
+    cache = _get_lru_cache('nominatim_details')
+    key = f'{host or CONFIG_HANDLER.config.area_info.nominatim.url} {place_id}'
+    names = cache.get(key)
+    if names is None:
+        names = details(place_id, host=host)['names']
+        cache.put(key, names)
+    return names
+
+def reverse_en(lat, lon, geocoding: dict, host: str = None) -> dict:
+    """
+    获取给定点英文的行政区划与名称。
+    按中文结果中的地点（osm_type、osm_id）及中文行政区划缓存，同一地点、同一行政区划内的各点只请求一次英文结果。
+    :param lat: 纬度
+    :param lon: 经度
+    :param geocoding: 该点中文 reverse 结果中的 geocoding
+    :param host: Nominatim API 地址
+    :return: {'admin': 英文行政区划, 'name': 英文名称}
+    """
+    osm_id = geocoding.get('osm_id')
+    cache = _get_lru_cache('nominatim_en') if osm_id is not None else None
+    key = None
+    if cache is not None:
+        admin_dict = geocoding['admin']
+        key = (host or CONFIG_HANDLER.config.area_info.nominatim.url, geocoding.get('osm_type'), osm_id,
+               admin_dict.get('level4', ''), admin_dict.get('level5', ''), admin_dict.get('level6', ''), admin_dict.get('level8', ''))
+        result = cache.get(key)
+        if result is not None:
+            return result
+    geocoding_en = reverse(lat, lon, 'en', host=host)['features'][0]['properties']['geocoding']
+    result = {'admin': geocoding_en['admin'], 'name': geocoding_en.get('name')}
+    if cache is not None:
+        cache.put(key, result)
+    return result
 
-def get_point_info(lat, lon, host: str = None):
+@cached_point_info('nominatim', language=lambda get_en_result=True, **_: 'zh-CN,en' if get_en_result else 'zh-CN')
+def get_point_info(lat, lon, host: str = None, get_en_result: bool = True):
     host = host or CONFIG_HANDLER.config.area_info.nominatim.url
     province, city, area, town, road_name, road_num, province_en, city_en, area_en, town_en, road_name_en, road_num_en, memo = '', '', '', '', '', '', '', '', '', '', '', '', ''
+    rev = None
     try:
         rev = reverse(lat, lon, host=host)
-        rev_en = reverse(lat, lon, 'en', host=host)
-        admin_dict = rev['features'][0]['properties']['geocoding']['admin']
-        admin_dict_en = rev_en['features'][0]['properties']['geocoding']['admin']
+        geocoding = rev['features'][0]['properties']['geocoding']
+        # 英文请求在中文请求之后发出（不像百度那样同时发出）：reverse_en 的缓存键取自中文结果，
+        # 同一地点、同一行政区划内的后续各点命中缓存，不再请求英文结果
+        rev_en = reverse_en(lat, lon, geocoding, host=host) if get_en_result else {'admin': {}, 'name': ''}
+        admin_dict = geocoding['admin']
+        admin_dict_en = rev_en['admin']
         province = admin_dict.get('level4', '')
         city = admin_dict.get('level5', '')
         area = admin_dict.get('level6', '')
@@ -51,16 +130,16 @@ def get_point_info(lat, lon, host: str = None):
         city_en = admin_dict_en.get('level5', '')
         area_en = admin_dict_en.get('level6', '')
         town_en = admin_dict_en.get('level8', '')
-        if rev['features'][0]['properties']['geocoding']['osm_type'] == 'way':
-            road_name = rev['features'][0]['properties']['geocoding']['name']
-            road_name_en = rev_en['features'][0]['properties']['geocoding']['name']
+        if geocoding['osm_type'] == 'way':
+            road_name = geocoding['name']
+            road_name_en = rev_en['name']
             if road_name_en == road_name:
                 road_name_en = ''
-            road_detail = details(rev['features'][0]['properties']['geocoding']['place_id'])
-            if 'ref' in road_detail['names']:
-                road_num = ','.join(road_detail['names']['ref'].split(';'))
+            road_names = details_names(geocoding['place_id'], host=host)
+            if 'ref' in road_names:
+                road_num = ','.join(road_names['ref'].split(';'))
     except Exception as e:
-        logger.warning('Some info of (%s, %s) is empty. API response: %s' % (lat, lon, rev['features'][0]['properties']['geocoding']))
+        logger.warning('Some info of (%s, %s) is empty. API response: %s' % (lat, lon, rev))
         memo = str(e)
     return {
         'province': province,
@@ -76,6 +155,47 @@ def get_point_info(lat, lon, host: str = None):
         'road_name_en': road_name_en,
         'memo': memo
     }
+
+@cached_point_info('nominatim', language=lambda **_: 'en', cacheable=is_en_cacheable)
+def get_point_info_en(lat, lon, point_info: dict, host: str = None) -> dict:
+    """
+    只获取给定点的英文名。
+    按中文的行政区划与道路名缓存（与 reverse_en 共用 nominatim_en），中文相同的各点只请求一次英文结果。
+    :param lat: 纬度
+    :param lon: 经度
+    :param point_info: 同一点只含中文的 get_point_info 结果，用于判断道路英文名是否与中文相同
+    :param host: Nominatim API 地址
+    :return: 英文名各字段（province_en、city_en、area_en、town_en、road_name_en）
+    """
+    province_en, city_en, area_en, town_en, road_name_en = '', '', '', '', ''
+    try:
+        cache = _get_lru_cache('nominatim_en')
+        key = (host or CONFIG_HANDLER.config.area_info.nominatim.url, 'names', point_info['province'], point_info['city'],
+               point_info['area'], point_info['town'], point_info['road_name'])
+        rev_en = cache.get(key)
+        if rev_en is None:
+            geocoding_en = reverse(lat, lon, 'en', host=host)['features'][0]['properties']['geocoding']
+            rev_en = {'admin': geocoding_en['admin'], 'name': geocoding_en.get('name') if geocoding_en['osm_type'] == 'way' else None}
+            cache.put(key, rev_en)
+        admin_dict_en = rev_en['admin']
+        province_en = admin_dict_en.get('level4', '')
+        city_en = admin_dict_en.get('level5', '')
+        area_en = admin_dict_en.get('level6', '')
+        town_en = admin_dict_en.get('level8', '')
+        if point_info['road_name'] and rev_en['name']:
+            road_name_en = rev_en['name']
+            if road_name_en == point_info['road_name']:
+                road_name_en = ''
+    except Exception as e:
+        logger.warning('English info of (%s, %s) is empty: %s' % (lat, lon, e))
+    return {
+        'province_en': province_en,
+        'city_en': city_en,
+        'area_en': area_en,
+        'town_en': town_en,
+        'road_name_en': road_name_en,
+    }
+
 if __name__ == '__main__':
     lat = 30.44094238
     lon = 114.61355524
@@ -0,0 +1,47 @@
+"""
+逆地理编码 API 的请求频率限制。
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    令牌桶，可在多个线程中共用。
+    令牌以 rate 个/秒的速度补充，最多存 capacity 个。每次请求取一个令牌；令牌不足时预支，
+    按预支的先后顺序等待，因此多个线程同时请求时，请求仍按 1/rate 秒的间隔依次发出。
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        """
+        :param rate: 每秒补充的令牌数，即每秒请求数上限
+        :param capacity: 最多存放的令牌数，即允许的突发请求数
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        取一个令牌。
+        :return: 取到令牌前需要等待的秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self):
+        """
+        取一个令牌，不足时阻塞等待。
+        :return: None
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
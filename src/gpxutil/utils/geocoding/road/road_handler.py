@@ -0,0 +1,28 @@
+import threading
+
+from loguru import logger
+
+from src.gpxutil.core.config import CONFIG_HANDLER
+from src.gpxutil.utils.geocoding.road.road_index import RoadIndex
+from src.gpxutil.utils.geocoding.road.road_store import read_road_store
+
+
+class RoadIndexHandler:
+    _instance_lock = threading.Lock()
+    _instance = None  # 显式声明类变量用于存储单例实例
+    _initialized = False  # 类变量用于跟踪是否已初始化
+
+    def __init__(self, store_path: str = None):
+        # 通过类变量控制初始化逻辑，确保只执行一次
+        if not RoadIndexHandler._initialized:
+            self.store_path = store_path if store_path is not None else CONFIG_HANDLER.config.area_info.osm_road.store_path
+            self.index = RoadIndex(read_road_store(self.store_path))
+            logger.info(f"Road index built: {len(self.index)} segment(s) from {self.store_path}")
+            RoadIndexHandler._initialized = True  # 标记为已初始化
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            with cls._instance_lock:
+                if not cls._instance:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
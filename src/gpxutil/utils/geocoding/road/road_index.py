@@ -0,0 +1,125 @@
+"""
+道路线段的空间索引，离线匹配各点所在的道路。
+
+道路（OSM 的 way）拆成线段，所有线段建一棵 STRtree。匹配时先按经纬度筛出距离阈值内的候选线段，
+再在各点附近的局部平面（等距圆柱投影）上计算到线段的精确距离（米）和线段的方向，
+排除与行进方向相差超过容差的线段（道路不分方向，按 180 度取模），取最近的一条。
+"""
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+import shapely
+
+METERS_PER_DEGREE = 111320.0
+"""纬度每度的长度（米）"""
+
+
+@dataclass
+class RoadNetwork:
+    """按列存放的道路线段"""
+    segments: np.ndarray
+    """各线段的端点，形状为 (线段数, 4)，每行为起点经度、起点纬度、终点经度、终点纬度"""
+    segment_way: np.ndarray
+    """各线段所属道路的下标"""
+    names: np.ndarray
+    """各道路的名称（name），没有时为空字符串"""
+    names_en: np.ndarray
+    """各道路的英文名称（name:en）"""
+    refs: np.ndarray
+    """各道路的编号（ref），多个编号以分号分隔"""
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+
+class RoadIndex:
+    """
+    道路线段的空间索引。
+    """
+
+    def __init__(self, network: RoadNetwork):
+        """
+        :param network: 道路线段
+        """
+        self.network = network
+        segments = network.segments
+        self.tree = shapely.STRtree(shapely.linestrings(segments.reshape(-1, 2, 2)))
+        # 线段方向（度，正北为 0，顺时针），按 180 度取模
+        mid_lat = np.radians((segments[:, 1] + segments[:, 3]) / 2)
+        self.bearing = np.degrees(np.arctan2(
+            (segments[:, 2] - segments[:, 0]) * np.cos(mid_lat), segments[:, 3] - segments[:, 1]
+        )) % 180
+
+    def __len__(self) -> int:
+        return len(self.network)
+
+    def match_many(self, longitude: np.ndarray, latitude: np.ndarray, course: np.ndarray = None,
+                   max_distance: float = 30, heading_tolerance: float = 45) -> np.ndarray:
+        """
+        批量匹配各点所在的道路。
+        :param longitude: 经度数组
+        :param latitude: 纬度数组
+        :param course: 各点的行进方向（度），为空或为 NaN 时不按方向筛选
+        :param max_distance: 距离阈值（米）
+        :param heading_tolerance: 行进方向与道路方向的容差（度）
+        :return: 各点所在道路的下标，没有匹配到为 -1
+        """
+        longitude = np.asarray(longitude, dtype=np.float64)
+        latitude = np.asarray(latitude, dtype=np.float64)
+        ret = np.full(len(longitude), -1, dtype=np.int64)
+        if len(longitude) == 0 or len(self.network) == 0:
+            return ret
+        # 经度方向每度最短的地方决定候选范围，保证不漏
+        max_abs_lat = min(float(np.nanmax(np.abs(latitude))), 89.0)
+        search_degrees = max_distance / (METERS_PER_DEGREE * math.cos(math.radians(max_abs_lat)))
+        point_indices, segment_indices = self.tree.query(
+            shapely.points(longitude, latitude), predicate='dwithin', distance=search_degrees
+        )
+        if len(point_indices) == 0:
+            return ret
+
+        # 以各点为原点的局部平面坐标（米）
+        segments = self.network.segments[segment_indices]
+        kx = METERS_PER_DEGREE * np.cos(np.radians(latitude[point_indices]))
+        ax = (segments[:, 0] - longitude[point_indices]) * kx
+        ay = (segments[:, 1] - latitude[point_indices]) * METERS_PER_DEGREE
+        dx = (segments[:, 2] - longitude[point_indices]) * kx - ax
+        dy = (segments[:, 3] - latitude[point_indices]) * METERS_PER_DEGREE - ay
+        length2 = dx * dx + dy * dy
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = np.where(length2 > 0, np.clip(-(ax * dx + ay * dy) / length2, 0, 1), 0)
+        distance = np.hypot(ax + t * dx, ay + t * dy)
+        keep = distance <= max_distance
+        if course is not None:
+            point_course = np.asarray(course, dtype=np.float64)[point_indices]
+            diff = np.abs(point_course - self.bearing[segment_indices]) % 180
+            keep &= np.isnan(point_course) | (np.minimum(diff, 180 - diff) <= heading_tolerance)
+        point_indices = point_indices[keep]
+        segment_indices = segment_indices[keep]
+        distance = distance[keep]
+
+        # 每个点取最近的线段
+        order = np.lexsort((distance, point_indices))
+        point_indices = point_indices[order]
+        segment_indices = segment_indices[order]
+        first = np.ones(len(point_indices), dtype=bool)
+        first[1:] = point_indices[1:] != point_indices[:-1]
+        ret[point_indices[first]] = self.network.segment_way[segment_indices[first]]
+        return ret
+
+    def road_info(self, way: int) -> dict:
+        """
+        道路的名称、英文名称与编号，格式与 get_point_info 结果中的道路字段相同。
+        :param way: 道路的下标，-1 表示没有匹配到
+        :return: {'road_name', 'road_name_en', 'road_num'}，没有的字段为 None
+        """
+        if way < 0:
+            return {'road_name': None, 'road_name_en': None, 'road_num': None}
+        ref = str(self.network.refs[way])
+        return {
+            'road_name': str(self.network.names[way]) or None,
+            'road_name_en': str(self.network.names_en[way]) or None,
+            'road_num': ','.join(part.strip() for part in ref.split(';') if part.strip()) or None,
+        }
@@ -0,0 +1,168 @@
+"""
+离线道路数据的导入与存储。
+
+从 OSM 的 .osm.pbf 文件或道路 GeoJSON 中取出有名称（name）或编号（ref）的道路，拆成线段，
+与名称、英文名称（name:en）、编号一起存为一个 .npz 文件。读取 .osm.pbf 需要 pyosmium（pip install osmium）。
+"""
+
+import json
+import os
+
+import numpy as np
+from loguru import logger
+
+from src.gpxutil.utils.geocoding.road.road_index import RoadNetwork
+
+ROAD_STORE_VERSION = 1
+"""存储格式版本，格式变化时递增"""
+
+
+class _RoadNetworkBuilder:
+    """逐条添加道路，最后合并为 RoadNetwork"""
+
+    def __init__(self):
+        self.segments: list[np.ndarray] = []
+        self.segment_way: list[np.ndarray] = []
+        self.names: list[str] = []
+        self.names_en: list[str] = []
+        self.refs: list[str] = []
+
+    def add(self, coordinates, name: str, name_en: str, ref: str):
+        """
+        添加一条道路。
+        :param coordinates: 道路各节点的 (经度, 纬度)
+        :param name: 名称
+        :param name_en: 英文名称
+        :param ref: 编号
+        """
+        coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+        if len(coordinates) < 2 or not (name or ref):
+            return
+        way = len(self.names)
+        self.segments.append(np.hstack([coordinates[:-1], coordinates[1:]]))
+        self.segment_way.append(np.full(len(coordinates) - 1, way, dtype=np.int32))
+        self.names.append(name or '')
+        self.names_en.append(name_en or '')
+        self.refs.append(ref or '')
+
+    def build(self) -> RoadNetwork:
+        return RoadNetwork(
+            segments=np.concatenate(self.segments) if self.segments else np.empty((0, 4), dtype=np.float64),
+            segment_way=np.concatenate(self.segment_way) if self.segment_way else np.empty(0, dtype=np.int32),
+            names=np.array(self.names, dtype=str),
+            names_en=np.array(self.names_en, dtype=str),
+            refs=np.array(self.refs, dtype=str),
+        )
+
+
+def read_road_geojson(path: str) -> RoadNetwork:
+    """
+    读取道路 GeoJSON（如 osmium export 或 Overpass 导出的结果）。
+    只取 LineString、MultiLineString，属性中的 name、name:en、ref 分别作为名称、英文名称、编号。
+    :param path: GeoJSON 文件路径
+    :return: RoadNetwork
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        features = json.load(f).get('features', [])
+    builder = _RoadNetworkBuilder()
+    for feature in features:
+        geometry = feature.get('geometry') or {}
+        properties = feature.get('properties') or {}
+        name, name_en, ref = properties.get('name'), properties.get('name:en'), properties.get('ref')
+        if geometry.get('type') == 'LineString':
+            builder.add(geometry['coordinates'], name, name_en, ref)
+        elif geometry.get('type') == 'MultiLineString':
+            for line in geometry['coordinates']:
+                builder.add(line, name, name_en, ref)
+    return builder.build()
+
+
+def read_road_pbf(path: str) -> RoadNetwork:
+    """
+    读取 OSM 的 .osm.pbf 文件，取出带 highway 标签的道路。
+    :param path: .osm.pbf 文件路径
+    :return: RoadNetwork
+    """
+    try:
+        import osmium
+    except ImportError as e:
+        raise ImportError('Reading .osm.pbf files needs pyosmium: pip install osmium') from e
+
+    builder = _RoadNetworkBuilder()
+
+    class WayHandler(osmium.SimpleHandler):
+        def way(self, w):
+            tags = w.tags
+            if 'highway' not in tags or not ('name' in tags or 'ref' in tags):
+                return
+            try:
+                coordinates = [(node.lon, node.lat) for node in w.nodes]
+            except osmium.InvalidLocationError:
+                # 节点不在文件中（裁剪边界上的道路）
+                return
+            builder.add(coordinates, tags.get('name'), tags.get('name:en'), tags.get('ref'))
+
+    # locations=True：按节点编号查出坐标，节点较多时使用磁盘上的索引
+    WayHandler().apply_file(path, locations=True, idx='flex_mem')
+    return builder.build()
+
+
+def read_road_source(path: str) -> RoadNetwork:
+    """
+    按扩展名读取 .osm.pbf 或 GeoJSON 文件。
+    :param path: 文件路径
+    :return: RoadNetwork
+    """
+    if path.endswith('.pbf'):
+        return read_road_pbf(path)
+    return read_road_geojson(path)
+
+
+def write_road_store(store_path: str, network: RoadNetwork):
+    """
+    将道路线段写入 .npz 文件。
+    :param store_path: 存储文件路径
+    :param network: 道路线段
+    :return: None
+    """
+    if os.path.dirname(store_path):
+        os.makedirs(os.path.dirname(store_path), exist_ok=True)
+    # 先写临时文件再改名，避免中断时留下不完整的文件
+    tmp_path = store_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(
+            f,
+            version=np.array(ROAD_STORE_VERSION),
+            segments=network.segments, segment_way=network.segment_way,
+            names=network.names, names_en=network.names_en, refs=network.refs,
+        )
+    os.replace(tmp_path, store_path)
+
+
+def read_road_store(store_path: str) -> RoadNetwork:
+    """
+    读取 .npz 文件中的道路线段。
+    :param store_path: 存储文件路径
+    :return: RoadNetwork
+    """
+    with np.load(store_path, allow_pickle=False) as store:
+        if int(store['version']) != ROAD_STORE_VERSION:
+            raise ValueError(f'Road store {store_path} has version {int(store["version"])}, '
+                             f'expected {ROAD_STORE_VERSION}. Please import it again')
+        return RoadNetwork(
+            segments=store['segments'], segment_way=store['segment_way'],
+            names=store['names'], names_en=store['names_en'], refs=store['refs'],
+        )
+
+
+def import_roads(source_path: str, store_path: str) -> RoadNetwork:
+    """
+    读取 .osm.pbf 或 GeoJSON 文件中的道路，写入存储文件。
+    :param source_path: .osm.pbf 或 GeoJSON 文件路径
+    :param store_path: 存储文件路径
+    :return: RoadNetwork
+    """
+    network = read_road_source(source_path)
+    write_road_store(store_path, network)
+    logger.info(f'Imported {len(network.names)} road(s), {len(network)} segment(s) into {store_path}')
+    return network
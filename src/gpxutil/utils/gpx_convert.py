@@ -1,8 +1,9 @@
 import io
 from typing import Literal, TextIO, IO
 from xml.dom.minidom import parse, Document
-import codecs
+from xml.parsers import expat
 from tqdm import tqdm
+import numpy as np
 
 import sys
 from pathlib import Path
@@ -16,8 +17,13 @@ sys.path.insert(0, vendor_path)
 
 from vendor.coordTransform_py.coord_converter import convert_by_type
 
+from src.gpxutil.utils import coord_transform
+
 coordinate_type_hint = Literal['wgs84', 'gcj02', 'bd09']
 
+CONVERT_GPX_BATCH_SIZE = 8192
+"""流式转换 GPX 时，每批转换的点数"""
+
 def convert_single_point(
         lng, lat,
         original_coordinate_type: coordinate_type_hint,
@@ -44,6 +50,38 @@ def convert_single_point(
         return None
     raise AttributeError('Invalid coordinate type')
 
+def convert_points(
+        lng, lat,
+        original_coordinate_type: coordinate_type_hint,
+        transformed_coordinate_type: coordinate_type_hint,
+        tolerance: float = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    批量转换坐标，结果与逐点调用 convert_single_point 一致。
+    :param lng: 经度数组
+    :param lat: 纬度数组
+    :param original_coordinate_type: 原坐标类型
+    :param transformed_coordinate_type: 要转换为的坐标类型
+    :param tolerance: 转换为 WGS84 时迭代求逆的容差（度）。为 None 时与逐点函数一样只做一步近似
+    :return: (经度数组, 纬度数组)
+    """
+    if original_coordinate_type == transformed_coordinate_type:
+        return np.array(lng, dtype=np.float64), np.array(lat, dtype=np.float64)
+    match original_coordinate_type, transformed_coordinate_type:
+        case 'wgs84', 'gcj02':
+            return coord_transform.wgs84_to_gcj02(lng, lat)
+        case 'wgs84', 'bd09':
+            return coord_transform.wgs84_to_bd09(lng, lat)
+        case 'gcj02', 'wgs84':
+            return coord_transform.gcj02_to_wgs84(lng, lat, tolerance=tolerance)
+        case 'gcj02', 'bd09':
+            return coord_transform.gcj02_to_bd09(lng, lat)
+        case 'bd09', 'wgs84':
+            return coord_transform.bd09_to_wgs84(lng, lat, tolerance=tolerance)
+        case 'bd09', 'gcj02':
+            return coord_transform.bd09_to_gcj02(lng, lat)
+    raise AttributeError('Invalid coordinate type')
+
 def gen_convert_type(
         original_coordinate_type: coordinate_type_hint,
         transformed_coordinate_type: coordinate_type_hint
@@ -96,18 +134,185 @@ def convert_gpx(
     return dom_tree
 
 
+def _escape(data: str) -> str:
+    """与 xml.dom.minidom 写出文本、属性值时的转义一致"""
+    return data.replace("&", "&amp;").replace("<", "&lt;").replace("\"", "&quot;").replace(">", "&gt;")
+
+
+class _GpxStreamConverter:
+    """
+    基于 expat 事件流转换 GPX 中的坐标，边读边写。
+    输出与 minidom 解析后 writexml 的结果逐字节一致（坐标值除外），各点坐标攒够一批后批量转换。
+    """
+
+    def __init__(
+            self, out: TextIO,
+            original_coordinate_type: coordinate_type_hint,
+            transformed_coordinate_type: coordinate_type_hint,
+            point_tags: tuple[str, ...],
+            batch_size: int,
+    ):
+        self.out = out
+        self.original_coordinate_type = original_coordinate_type
+        self.transformed_coordinate_type = transformed_coordinate_type
+        self.point_tags = set(point_tags)
+        self.batch_size = batch_size
+        self.buffer: list[str] = []
+        """待写出的文本片段"""
+        self.lng: list[float] = []
+        self.lat: list[float] = []
+        self.lng_slots: list[int] = []
+        """待转换的经度在 buffer 中的位置"""
+        self.lat_slots: list[int] = []
+        """待转换的纬度在 buffer 中的位置"""
+        self.start_tag_open = False
+        """开始标签是否还没有写出结尾。没有子节点的元素按 minidom 的做法写为 <tag/>"""
+        self.in_cdata = False
+        self.cdata_written = False
+        self.progress = tqdm(desc='Converting GPX points', unit='point(s)')
+
+    def _close_start_tag(self):
+        if self.start_tag_open:
+            self.buffer.append('>')
+            self.start_tag_open = False
+
+    def _flush(self):
+        if self.lng:
+            lng, lat = convert_points(self.lng, self.lat, self.original_coordinate_type, self.transformed_coordinate_type)
+            for slot, value in zip(self.lng_slots, lng.tolist()):
+                self.buffer[slot] = str(value)
+            for slot, value in zip(self.lat_slots, lat.tolist()):
+                self.buffer[slot] = str(value)
+            self.progress.update(len(self.lng))
+            self.lng, self.lat, self.lng_slots, self.lat_slots = [], [], [], []
+        self.out.write(''.join(self.buffer))
+        self.buffer = []
+
+    def start_doctype(self, name: str, system_id: str, public_id: str, has_internal_subset: int):
+        if has_internal_subset:
+            raise ValueError('DOCTYPE with internal subset is not supported')
+        self.buffer.append('<!DOCTYPE ' + name)
+        if public_id:
+            self.buffer.append("  PUBLIC '%s'  '%s'" % (public_id, system_id))
+        elif system_id:
+            self.buffer.append("  SYSTEM '%s'" % system_id)
+        self.buffer.append('>')
+
+    def start_element(self, name: str, attributes: list[str]):
+        self._close_start_tag()
+        self.buffer.append('<' + name)
+        names = attributes[0::2]
+        values = attributes[1::2]
+        # minidom 把命名空间声明放在其他属性之前
+        order = ([i for i, attr_name in enumerate(names) if attr_name == 'xmlns' or attr_name.startswith('xmlns:')]
+                 + [i for i, attr_name in enumerate(names) if not (attr_name == 'xmlns' or attr_name.startswith('xmlns:'))])
+        convert = name in self.point_tags and self.original_coordinate_type != self.transformed_coordinate_type
+        for i in order:
+            self.buffer.append(' %s="' % names[i])
+            if convert and names[i] == 'lon':
+                self.lng.append(float(values[i]))
+                self.lng_slots.append(len(self.buffer))
+            elif convert and names[i] == 'lat':
+                self.lat.append(float(values[i]))
+                self.lat_slots.append(len(self.buffer))
+            self.buffer.append(_escape(values[i]))
+            self.buffer.append('"')
+        self.start_tag_open = True
+
+    def end_element(self, name: str):
+        if self.start_tag_open:
+            self.buffer.append('/>')
+            self.start_tag_open = False
+        else:
+            self.buffer.append('</%s>' % name)
+        if len(self.lng) >= self.batch_size or len(self.buffer) >= self.batch_size * 16:
+            self._flush()
+
+    def character_data(self, data: str):
+        self._close_start_tag()
+        if self.in_cdata:
+            if not self.cdata_written:
+                self.buffer.append('<![CDATA[')
+                self.cdata_written = True
+            self.buffer.append(data)
+        else:
+            self.buffer.append(_escape(data))
+
+    def start_cdata(self):
+        self.in_cdata = True
+        self.cdata_written = False
+
+    def end_cdata(self):
+        if self.cdata_written:
+            self.buffer.append(']]>')
+        self.in_cdata = False
+
+    def comment(self, data: str):
+        self._close_start_tag()
+        self.buffer.append('<!--%s-->' % data)
+
+    def processing_instruction(self, target: str, data: str):
+        self._close_start_tag()
+        self.buffer.append('<?%s %s?>' % (target, data))
+
+    def convert(self, file: IO):
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        parser.ordered_attributes = True
+        parser.StartDoctypeDeclHandler = self.start_doctype
+        parser.StartElementHandler = self.start_element
+        parser.EndElementHandler = self.end_element
+        parser.CharacterDataHandler = self.character_data
+        parser.StartCdataSectionHandler = self.start_cdata
+        parser.EndCdataSectionHandler = self.end_cdata
+        parser.CommentHandler = self.comment
+        parser.ProcessingInstructionHandler = self.processing_instruction
+        self.buffer.append('<?xml version="1.0" encoding="utf-8"?>')
+        try:
+            parser.ParseFile(file)
+            self._flush()
+        finally:
+            self.progress.close()
+
+
+def convert_gpx_stream(
+        file: str | IO,
+        out: TextIO,
+        original_coordinate_type: coordinate_type_hint,
+        transformed_coordinate_type: coordinate_type_hint,
+        point_tags: tuple[str, ...] = ('trkpt',),
+        batch_size: int = CONVERT_GPX_BATCH_SIZE,
+):
+    """
+    流式转换 GPX 中各点的坐标，直接写出到 out，内存占用与文件大小无关。
+    输出与 convert_gpx 得到的文档 writexml 的结果一致（坐标值的末位可能不同）。
+    :param file: GPX 文件路径或以二进制方式打开的文件
+    :param out: 输出的文本流
+    :param original_coordinate_type: 原坐标类型
+    :param transformed_coordinate_type: 要转换为的坐标类型
+    :param point_tags: 要转换坐标的元素，默认只转换 trkpt，可以加上 wpt、rtept
+    :param batch_size: 每批转换的点数
+    :return: None
+    """
+    gen_convert_type(original_coordinate_type, transformed_coordinate_type)
+    converter = _GpxStreamConverter(out, original_coordinate_type, transformed_coordinate_type, point_tags, batch_size)
+    if isinstance(file, str):
+        with open(file, 'rb') as f:
+            converter.convert(f)
+    else:
+        converter.convert(file)
+
+
 def convert_gpx_to_file(
         in_path,
         out_path,
         original_coordinate_type,
         transformed_coordinate_type,
+        point_tags: tuple[str, ...] = ('trkpt',),
 ):
-    dom_tree = convert_gpx(in_path, original_coordinate_type, transformed_coordinate_type)
-
-    with open(out_path, 'wb+') as f:
-        #解决写入中文乱码问题
-        f = codecs.lookup("utf-8")[3](f)
-        dom_tree.writexml(f, encoding='utf-8')
+    # newline='' 不转换换行符，与以二进制方式写出一致
+    with open(out_path, 'w', encoding='utf-8', newline='') as f:
+        convert_gpx_stream(in_path, f, original_coordinate_type, transformed_coordinate_type, point_tags)
 
 if __name__ == '__main__':
     # convert_gpx_to_file(r"E:\project\recorded\202504旅游轨迹\20250402083731.gpx", 'gcj.gpx', original_coordinate_type='wgs84', transformed_coordinate_type='gcj02')
@@ -0,0 +1,198 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone, tzinfo
+from typing import IO, Iterator, Optional
+import xml.etree.ElementTree as ET
+
+import gpxpy.gpx
+import numpy as np
+
+from src.gpxutil.models.route_columns import datetimes_to_datetime64
+
+TRACK_POINT_BATCH_SIZE = 8192
+"""流式读取时，每批产出的点数"""
+
+
+@dataclass
+class TrackPointBatch:
+    """
+    一批轨迹点的数据，按列存放。
+    """
+    latitude: np.ndarray
+    """纬度"""
+
+    longitude: np.ndarray
+    """经度"""
+
+    elevation: np.ndarray
+    """高度，无高度为 NaN"""
+
+    time: np.ndarray
+    """时间，datetime64[us]（UTC），无时间为 NaT"""
+
+    course: np.ndarray
+    """GPX 中记录的方向，无记录为 NaN"""
+
+    time_tz: Optional[tzinfo] = None
+    """GPX 中时间的时区"""
+
+    def __len__(self) -> int:
+        return len(self.latitude)
+
+    @staticmethod
+    def concatenate(batches: list['TrackPointBatch']) -> 'TrackPointBatch':
+        """
+        将多批数据拼接为一批。
+        :param batches: 各批数据
+        :return: TrackPointBatch
+        """
+        if not batches:
+            return TrackPointBatch(np.empty(0), np.empty(0), np.empty(0), np.empty(0, dtype='datetime64[us]'), np.empty(0))
+        return TrackPointBatch(
+            latitude=np.concatenate([batch.latitude for batch in batches]),
+            longitude=np.concatenate([batch.longitude for batch in batches]),
+            elevation=np.concatenate([batch.elevation for batch in batches]),
+            time=np.concatenate([batch.time for batch in batches]),
+            course=np.concatenate([batch.course for batch in batches]),
+            time_tz=next((batch.time_tz for batch in batches if batch.time_tz is not None), None),
+        )
+
+    @staticmethod
+    def from_gpx_points(points: list[gpxpy.gpx.GPXTrackPoint]) -> 'TrackPointBatch':
+        """
+        从 gpxpy 的点列表生成。
+        :param points: gpxpy 的点列表
+        :return: TrackPointBatch
+        """
+        size = len(points)
+        time, time_tz = datetimes_to_datetime64((point.time for point in points), size)
+        return TrackPointBatch(
+            latitude=np.fromiter((point.latitude for point in points), dtype=np.float64, count=size),
+            longitude=np.fromiter((point.longitude for point in points), dtype=np.float64, count=size),
+            elevation=np.fromiter((point.elevation if point.elevation is not None else np.nan for point in points),
+                                  dtype=np.float64, count=size),
+            time=time,
+            course=np.fromiter((point.course if point.course is not None else np.nan for point in points),
+                               dtype=np.float64, count=size),
+            time_tz=time_tz,
+        )
+
+
+def _local_name(tag: str) -> str:
+    """去掉命名空间，如 {http://www.topografix.com/GPX/1/1}trkpt -> trkpt"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _parse_float(text: Optional[str]) -> float:
+    if text is None or not text.strip():
+        return np.nan
+    return float(text)
+
+
+def _parse_times(texts: list[Optional[str]]) -> tuple[np.ndarray, Optional[tzinfo]]:
+    """
+    批量解析 GPX 中的时间。常见的 UTC 时间（以 Z 结尾）直接交给 NumPy 解析，其他格式逐个解析。
+    """
+    time_tz = None
+    stripped = []
+    for text in texts:
+        if text is None:
+            stripped.append('NaT')
+        elif text.endswith('Z'):
+            stripped.append(text[:-1])
+            time_tz = timezone.utc
+        else:
+            break
+    else:
+        try:
+            return np.array(stripped, dtype='datetime64[us]'), time_tz
+        except ValueError:
+            pass
+    return datetimes_to_datetime64(
+        (datetime.fromisoformat(text.strip()) if text is not None else None for text in texts), len(texts)
+    )
+
+
+def _make_batch(latitude: list, longitude: list, elevation: list, time: list, course: list) -> TrackPointBatch:
+    time_array, time_tz = _parse_times(time)
+    return TrackPointBatch(
+        latitude=np.array(latitude, dtype=np.float64),
+        longitude=np.array(longitude, dtype=np.float64),
+        elevation=np.array(elevation, dtype=np.float64),
+        time=time_array,
+        course=np.array(course, dtype=np.float64),
+        time_tz=time_tz,
+    )
+
+
+def iter_track_point_batches(
+        gpx_file: str | IO, track_index: int = 0, segment_index: int = 0, batch_size: int = TRACK_POINT_BATCH_SIZE
+) -> Iterator[TrackPointBatch]:
+    """
+    流式读取 GPX 文件中指定 track、segment 的点，每次产出一批。
+    不构建完整的对象树：处理完的元素会立即从父元素中移除，内存占用与文件大小基本无关。
+    读完指定的 segment 后即停止解析。
+    :param gpx_file: GPX 文件路径或以二进制方式打开的文件
+    :param track_index: track 序号
+    :param segment_index: segment 序号
+    :param batch_size: 每批的点数
+    :return: Iterator[TrackPointBatch]
+    """
+    latitude, longitude, elevation, time, course = [], [], [], [], []
+    current_track_index = -1
+    current_segment_index = -1
+    found = False
+    stack: list[ET.Element] = []
+    for event, element in ET.iterparse(gpx_file, events=('start', 'end')):
+        if event == 'start':
+            stack.append(element)
+            name = _local_name(element.tag)
+            if name == 'trk':
+                current_track_index += 1
+                current_segment_index = -1
+            elif name == 'trkseg' and current_track_index == track_index:
+                current_segment_index += 1
+                found = found or current_segment_index == segment_index
+            continue
+
+        stack.pop()
+        name = _local_name(element.tag)
+        selected = current_track_index == track_index and current_segment_index == segment_index
+        if name == 'trkpt':
+            if selected:
+                point_elevation = point_time = point_course = None
+                for child in element:
+                    match _local_name(child.tag):
+                        case 'ele':
+                            point_elevation = child.text
+                        case 'time':
+                            point_time = child.text
+                        case 'course':
+                            point_course = child.text
+                latitude.append(float(element.attrib['lat']))
+                longitude.append(float(element.attrib['lon']))
+                elevation.append(_parse_float(point_elevation))
+                time.append(point_time.strip() if point_time is not None and point_time.strip() else None)
+                course.append(_parse_float(point_course))
+                if len(latitude) >= batch_size:
+                    yield _make_batch(latitude, longitude, elevation, time, course)
+                    latitude, longitude, elevation, time, course = [], [], [], [], []
+        elif name == 'trkseg' and selected:
+            break
+        # trkpt 内的子元素等 trkpt 读完再释放；其余元素读完即从父元素中移除
+        if stack and _local_name(stack[-1].tag) != 'trkpt':
+            stack[-1].remove(element)
+    if not found:
+        raise IndexError(f'track {track_index} segment {segment_index} not found in GPX file')
+    if latitude:
+        yield _make_batch(latitude, longitude, elevation, time, course)
+
+
+def read_track_points(gpx_file: str | IO, track_index: int = 0, segment_index: int = 0) -> TrackPointBatch:
+    """
+    流式读取 GPX 文件中指定 track、segment 的全部点。
+    :param gpx_file: GPX 文件路径或以二进制方式打开的文件
+    :param track_index: track 序号
+    :param segment_index: segment 序号
+    :return: TrackPointBatch
+    """
+    return TrackPointBatch.concatenate(list(iter_track_point_batches(gpx_file, track_index, segment_index)))
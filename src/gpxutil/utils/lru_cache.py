@@ -0,0 +1,79 @@
+"""
+容量有限的内存缓存（LRU），可选地同时存入持久化的缓存。逆地理编码、信息图等各处共用。
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LRUCache:
+    """
+    容量有限的内存缓存，超出容量时淘汰最久未使用的。可在多个线程中共用。
+    给定 store 时，内存中没有的键再到 store 中查找，写入时同时写入 store。
+    """
+
+    def __init__(self, name: str, maxsize: int, store=None):
+        """
+        :param name: 名称，也是在 store 中的数据类别
+        :param maxsize: 内存中最多存放的条数
+        :param store: 持久化的缓存，提供 get_item(namespace, key)、put_item(namespace, key, value)，如 GeocodingCache。为空时只存在内存中
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _store_key(key: Hashable) -> str:
+        return key if isinstance(key, str) else json.dumps(key, ensure_ascii=False)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        读取缓存的值。
+        :param key: 键，须能转为 JSON
+        :return: 缓存的值，不存在为 None
+        """
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+        value = self.store.get_item(self.name, self._store_key(key)) if self.store is not None else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._set(key, value)
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        """
+        写入值。
+        :param key: 键，须能转为 JSON
+        :param value: 值，须能转为 JSON，不能为 None
+        :return: None
+        """
+        with self._lock:
+            self._set(key, value)
+        if self.store is not None:
+            self.store.put_item(self.name, self._store_key(key), value)
+
+    def _set(self, key: Hashable, value: Any):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        hit_rate = self.hits / total * 100 if total else 0
+        return f"{self.name} cache: {self.hits} hit(s), {self.misses} miss(es), hit rate {hit_rate:.1f}%"
@@ -1,6 +1,10 @@
 import math
+from dataclasses import dataclass
+from typing import Callable, Optional
 
 import gpxpy.gpx
+import numpy as np
+from gpxpy.geo import ONE_DEGREE, EARTH_RADIUS
 
 
 def calculate_bearing(point1: gpxpy.gpx.GPXTrackPoint, point2: gpxpy.gpx.GPXTrackPoint):
@@ -21,3 +25,241 @@ def calculate_bearing(point1: gpxpy.gpx.GPXTrackPoint, point2: gpxpy.gpx.GPXTrac
     bearing = math.degrees(bearing)
     bearing = (bearing + 360) % 360
     return bearing
+
+
+def calculate_bearing_array(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """
+    批量计算方位角，算法与 calculate_bearing 相同。
+    :param lat1: 起始点纬度
+    :param lon1: 起始点经度
+    :param lat2: 结束点纬度
+    :param lon2: 结束点经度
+    :return: 方位角数组
+    """
+    rad_lat1 = np.radians(lat1)
+    rad_lat2 = np.radians(lat2)
+    rad_dlon = np.radians(lon2 - lon1)
+    x = np.cos(rad_lat2) * np.sin(rad_dlon)
+    y = np.cos(rad_lat1) * np.sin(rad_lat2) - np.sin(rad_lat1) * np.cos(rad_lat2) * np.cos(rad_dlon)
+    bearing = np.degrees(np.arctan2(x, y))
+    return (bearing + 360) % 360
+
+
+def calculate_distance_3d_array(
+        lat1: np.ndarray, lon1: np.ndarray, ele1: np.ndarray,
+        lat2: np.ndarray, lon2: np.ndarray, ele2: np.ndarray
+) -> np.ndarray:
+    """
+    批量计算两点间距离，算法与 gpxpy 的 distance_3d 相同：
+    相距较远（经纬度差大于 0.2 度）时用不计高度的 haversine 公式，否则用平面近似并计入高度差。
+    高度为 NaN 时视为无高度。
+    :return: 距离数组（米）
+    """
+    # 平面近似
+    coef = np.cos(np.radians(lat1))
+    x = lat1 - lat2
+    y = (lon1 - lon2) * coef
+    distance_2d = np.sqrt(x * x + y * y) * ONE_DEGREE
+    d_ele = ele1 - ele2
+    no_ele = np.isnan(d_ele) | (d_ele == 0)
+    distance = np.where(no_ele, distance_2d, np.sqrt(distance_2d ** 2 + np.where(no_ele, 0, d_ele) ** 2))
+
+    # haversine
+    far = (np.abs(lat1 - lat2) > .2) | (np.abs(lon1 - lon2) > .2)
+    if far.any():
+        rad_lat1 = np.radians(lat1[far])
+        rad_lat2 = np.radians(lat2[far])
+        d_lon = np.radians(lon1[far] - lon2[far])
+        d_lat = rad_lat1 - rad_lat2
+        a = np.sin(d_lat / 2) ** 2 + np.sin(d_lon / 2) ** 2 * np.cos(rad_lat1) * np.cos(rad_lat2)
+        distance[far] = EARTH_RADIUS * 2 * np.arcsin(np.sqrt(a))
+    return distance
+
+
+@dataclass
+class RouteKinematics:
+    """
+    一段轨迹的运动学信息。各数组与输入的点一一对应。
+    """
+    keep: np.ndarray
+    """是否保留该点。与上一点时间差为 0 的点不保留"""
+
+    elapsed_time: np.ndarray
+    """距第一个点经过的秒数"""
+
+    distance: np.ndarray
+    """累计距离（只累计保留的点）"""
+
+    speed: np.ndarray
+    """与上一点之间的速度"""
+
+    course: np.ndarray
+    """方向"""
+
+
+def calculate_kinematics(
+        latitude: np.ndarray, longitude: np.ndarray, elevation: np.ndarray, time: np.ndarray,
+        course: Optional[np.ndarray] = None
+) -> RouteKinematics:
+    """
+    批量计算一段轨迹的累计距离、速度和方向，规则与逐点计算时相同：
+    与上一点时间差为 0 的点跳过，不计入距离；
+    优先使用 GPX 中记录的方向，没有记录（或为 0）时按与上一点的方位角计算；
+    方位角为 0 时沿用上一个方向。
+    :param latitude: 纬度
+    :param longitude: 经度
+    :param elevation: 高度，无高度为 NaN
+    :param time: 时间，datetime64 数组
+    :param course: GPX 中记录的方向，无记录为 NaN。为 None 时视为都没有记录
+    :return: RouteKinematics
+    """
+    size = len(latitude)
+    time_us = time.astype('datetime64[us]').astype(np.int64).astype(np.float64)
+    time_us[np.isnat(time)] = np.nan
+    elapsed_time = np.abs(time_us - time_us[0]) / 1e6 if size else np.empty(0)
+
+    step_distance = np.zeros(size)
+    step_time = np.full(size, np.nan)
+    step_bearing = np.zeros(size)
+    if size > 1:
+        step_distance[1:] = calculate_distance_3d_array(
+            latitude[1:], longitude[1:], elevation[1:], latitude[:-1], longitude[:-1], elevation[:-1]
+        )
+        step_time[1:] = np.abs(np.diff(time_us)) / 1e6
+        step_bearing[1:] = calculate_bearing_array(latitude[:-1], longitude[:-1], latitude[1:], longitude[1:])
+
+    keep = step_time != 0
+    keep[:1] = True
+    distance = np.cumsum(np.where(keep, step_distance, 0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        speed = np.where(keep, step_distance / step_time, np.nan)
+    speed[:1] = 0
+
+    # 每个点的候选方向：GPX 中的方向 > 非 0 的方位角 > 沿用之前的方向（NaN）
+    if course is None:
+        course = np.full(size, np.nan)
+    has_course = ~np.isnan(course) & (course != 0)
+    candidate = np.where(has_course, course, np.where(step_bearing != 0, step_bearing, np.nan))
+    candidate[~keep] = np.nan
+    candidate[:1] = 0
+    # 向后填充 NaN
+    last_valid = np.maximum.accumulate(np.where(np.isnan(candidate), 0, np.arange(size)))
+    carried_course = candidate[last_valid] if size else candidate
+
+    return RouteKinematics(
+        keep=keep,
+        elapsed_time=elapsed_time,
+        distance=distance,
+        speed=speed,
+        course=carried_course,
+    )
+
+
+def sample_anchors(distance: np.ndarray, elapsed_time: np.ndarray,
+                   distance_step: Optional[float] = None, time_step: Optional[float] = None) -> np.ndarray:
+    """
+    按距离或时间选取锚点，供 bisect_fill 使用：从上一个锚点起，走过 distance_step 米或经过 time_step 秒（先到者为准）后的第一个点作为下一个锚点。
+    距离或时间为 NaN 的点不因该项取锚点。
+    :param distance: 各点的累计距离（米）
+    :param elapsed_time: 各点的累计时间（秒）
+    :param distance_step: 距离间隔，为空时不按距离取
+    :param time_step: 时间间隔，为空时不按时间取
+    :return: 锚点的下标数组，升序，包含首尾两点。两个间隔都为空时为全部点
+    """
+    size = len(distance)
+    if not distance_step and not time_step:
+        return np.arange(size)
+    limits = []
+    for values, step in ((distance, distance_step), (elapsed_time, time_step)):
+        if step:
+            # 转为单调不减，便于二分查找；开头的 NaN 记为 -inf
+            values = np.fmax.accumulate(np.asarray(values, dtype=np.float64))
+            limits.append((np.where(np.isnan(values), -np.inf, values), step))
+    anchors = [0]
+    # 循环次数与锚点数相同，而不是与点数相同
+    while anchors[-1] < size - 1:
+        anchor = anchors[-1]
+        next_anchor = size - 1
+        for values, step in limits:
+            if values[anchor] != -np.inf:
+                next_anchor = min(next_anchor, int(np.searchsorted(values, values[anchor] + step, side='left')))
+        anchors.append(max(next_anchor, anchor + 1))
+    return np.array(anchors[:size], dtype=np.int64)
+
+
+def bisect_fill(size: int, step: Optional[int], probe: Callable[[np.ndarray], np.ndarray],
+                anchors: Optional[np.ndarray] = None) -> tuple[np.ndarray, int]:
+    """
+    沿行程填写逐点的离散取值（如所在地区），只在取值变化处逐点判断。
+    先每隔 step 个点（或在给定的锚点）求值；相邻两个锚点取值相同，则认为中间各点取值也相同；
+    取值不同，则不断二分，直到找到变化的确切位置。求值次数与变化的次数成正比，而不是与点数成正比。
+    两个锚点之间离开又回到同一取值的情况会被忽略，锚点间隔应小于这种往返所需的点数。
+    每一轮的全部待求点一次性交给 probe，便于批量计算。
+    :param size: 点数
+    :param step: 锚点间隔，至少为 1。为 1 时逐点求值。给定 anchors 时不使用
+    :param probe: 批量求值函数，输入点的下标数组，返回等长的整数数组
+    :param anchors: 锚点的下标数组，如 sample_anchors 的结果。首尾两点总会求值
+    :return: 各点的取值，以及实际求值的点数
+    """
+    values = np.zeros(size, dtype=np.int64)
+    if size == 0:
+        return values, 0
+    known = np.zeros(size, dtype=bool)
+    if anchors is not None:
+        indices = np.unique(np.concatenate([[0, size - 1], np.asarray(anchors, dtype=np.int64)]))
+    else:
+        step = max(int(step), 1)
+        indices = np.unique(np.append(np.arange(0, size, step), size - 1))
+    probe_count = 0
+    while len(indices):
+        values[indices] = probe(indices)
+        known[indices] = True
+        probe_count += len(indices)
+        # 取值不同、且中间还有未求值的点的相邻已知点对，取中点继续求值
+        known_indices = np.flatnonzero(known)
+        lo = known_indices[:-1]
+        hi = known_indices[1:]
+        split = (values[lo] != values[hi]) & (hi - lo > 1)
+        indices = (lo[split] + hi[split]) // 2
+    # 未求值的点位于取值相同的两个已知点之间，沿用前一个已知点的取值
+    filled_from = np.maximum.accumulate(np.where(known, np.arange(size), 0))
+    return values[filled_from], probe_count
+
+
+def heading_runs(group: np.ndarray, course: np.ndarray, distance: np.ndarray,
+                 heading_tolerance: float, max_distance: Optional[float] = None) -> np.ndarray:
+    """
+    将行程分为若干段，同一段内的各点可认为在同一条道路上：分组（如所在地区）相同，方向与段内第一个有方向的点相差不超过
+    heading_tolerance 度，且与段首相距不超过 max_distance 米。方向为 NaN（如静止）的点不因方向分段。
+    :param group: 各点的分组，一维数组，或每行为一个点的二维数组（各列都相同才算同组）
+    :param course: 各点的方向（度）
+    :param distance: 各点的累计距离（米）
+    :param heading_tolerance: 方向变化的容差（度）
+    :param max_distance: 每段的最大长度，为空时不按距离分段
+    :return: 各段起点的下标数组，升序，以 0 开始
+    """
+    size = len(course)
+    if size == 0:
+        return np.empty(0, dtype=np.int64)
+    group = np.asarray(group).reshape(size, -1)
+    group_changed = np.zeros(size, dtype=bool)
+    group_changed[1:] = np.any(group[1:] != group[:-1], axis=1)
+    course = np.asarray(course, dtype=np.float64).tolist()
+    distance = np.asarray(distance, dtype=np.float64).tolist()
+    changed = group_changed.tolist()
+    starts = [0]
+    start_course, start_distance = course[0], distance[0]
+    for i in range(1, size):
+        if not changed[i]:
+            if course[i] == course[i] and start_course == start_course:
+                if abs((course[i] - start_course + 180) % 360 - 180) > heading_tolerance:
+                    changed[i] = True
+            if max_distance and distance[i] - start_distance > max_distance:
+                changed[i] = True
+        if changed[i]:
+            starts.append(i)
+            start_course, start_distance = course[i], distance[i]
+        elif start_course != start_course:
+            # 段首没有方向时，以段内第一个有方向的点为准
+            start_course = course[i]
+    return np.array(starts, dtype=np.int64)
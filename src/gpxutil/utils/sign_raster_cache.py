@@ -0,0 +1,99 @@
+"""
+道路编号标志的栅格缓存。
+
+叠加层中的标志按固定高度等比例缩放。每种标志只生成一次 SVG、栅格化、缩放一次，
+结果（RGBA 图片）在内存中缓存，并以 PNG 存入缓存目录，之后的运行直接读取。
+缓存键包含标志的类型与参数、目标高度，以及颜色、模板、字体的哈希（见 SignRenderer.style_hash），
+样式变化后旧的缓存自动不再使用。
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Optional
+
+from loguru import logger
+from PIL import Image
+from svgwrite import Drawing
+
+from src.gpxutil.utils.svg_gen import SignRenderer, get_sign_renderer
+
+SIGN_RASTER_CACHE_VERSION = 1
+"""缓存格式版本，栅格化方式变化时递增，使旧缓存失效"""
+
+
+class SignRasterCache:
+    """
+    按叠加层尺寸栅格化的道路编号标志。可在多个线程中共用，返回的图片为多处共用，不应修改。
+    """
+
+    def __init__(self, rasterize: Callable[[Drawing], Image.Image], height: int, cache_dir: Optional[str] = None,
+                 renderer: SignRenderer = None):
+        """
+        :param rasterize: 将 SVG 栅格化为图片
+        :param height: 标志的目标高度，宽度等比例缩放
+        :param cache_dir: 缓存目录，为空时只在内存中缓存
+        :param renderer: 交通标志生成器，默认为共用的生成器
+        """
+        self.rasterize = rasterize
+        self.height = height
+        self.cache_dir = cache_dir
+        self.renderer = renderer or get_sign_renderer()
+        self._images: dict[tuple, Image.Image] = {}
+        self._lock = threading.Lock()
+        self.rasterized = 0
+        """本次运行中栅格化的标志数"""
+
+    def _file_path(self, key: tuple) -> str:
+        digest = hashlib.sha256(json.dumps(
+            [SIGN_RASTER_CACHE_VERSION, self.renderer.style_hash, self.height, *key], ensure_ascii=False
+        ).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f'{digest[:32]}.png')
+
+    def get(self, code: str, province: str = None, name: str = None) -> Image.Image:
+        """
+        获取标志的图片，参数见 SignRenderer.render。
+        :return: 高为 height 的 RGBA 图片
+        """
+        key = self.renderer.sign_key(code, province, name)
+        image = self._images.get(key)
+        if image is not None:
+            return image
+        file_path = self._file_path(key) if self.cache_dir else None
+        image = self._read(file_path) if file_path else None
+        if image is None:
+            image = self._rasterize(self.renderer.render(code, province, name))
+            if file_path:
+                self._write(file_path, image)
+        with self._lock:
+            # 多个线程同时生成时，都使用先存入的一张
+            return self._images.setdefault(key, image)
+
+    def _rasterize(self, drawing: Drawing) -> Image.Image:
+        image = self.rasterize(drawing).convert('RGBA')
+        self.rasterized += 1
+        # 固定高度，等比例缩放
+        width = int(image.size[0] * self.height / image.size[1])
+        return image.resize((width, self.height))
+
+    def _read(self, file_path: str) -> Optional[Image.Image]:
+        if not os.path.exists(file_path):
+            return None
+        try:
+            with Image.open(file_path) as image:
+                image = image.convert('RGBA')
+        except OSError as e:
+            logger.warning(f'Failed to read sign cache {file_path}: {e}')
+            return None
+        return image if image.size[1] == self.height else None
+
+    def _write(self, file_path: str, image: Image.Image):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # 先写临时文件再替换，中断时不留下不完整的缓存
+        tmp_path = f'{file_path}.{threading.get_ident()}.tmp'
+        try:
+            image.save(tmp_path, 'PNG')
+            os.replace(tmp_path, file_path)
+        except OSError as e:
+            logger.warning(f'Failed to write sign cache {file_path}: {e}')
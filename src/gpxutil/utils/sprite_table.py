@@ -0,0 +1,54 @@
+"""
+预先旋转的图片（精灵）表。
+
+指南针等每帧只有角度不同的图片，启动时按固定的角度间隔旋转一遍，存入一个 (角度数, 高, 宽, 4) 的 uint8 数组。
+生成每帧时取角度最接近的一张，不再栅格化、旋转。
+"""
+
+import math
+
+import numpy as np
+from PIL import Image
+
+DEFAULT_ANGLE_STEP = 0.5
+"""默认的角度间隔（度）"""
+
+
+class RotatedSpriteTable:
+    """
+    一张图片按固定角度间隔旋转后的结果。可在多个线程中共用。
+    """
+
+    def __init__(self, image: Image.Image, step: float = DEFAULT_ANGLE_STEP):
+        """
+        :param image: 原图，旋转中心为图片中心，不扩大画布
+        :param step: 角度间隔（度），实际间隔为 360 除以角度数，使表首尾相接
+        """
+        image = image.convert('RGBA')
+        self.count = max(1, round(360 / step))
+        """表中的角度数"""
+        self.step = 360 / self.count
+        self.sprites = np.empty((self.count, image.size[1], image.size[0], 4), dtype=np.uint8)
+        for i in range(self.count):
+            self.sprites[i] = np.asarray(image.rotate(i * self.step, expand=False))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def index(self, angle: float) -> int:
+        """
+        最接近给定角度的一张在表中的下标。
+        :param angle: 逆时针旋转的角度（度），与 Image.rotate 相同
+        :return: 下标
+        """
+        if not math.isfinite(angle):
+            return 0
+        return int(round(angle / self.step)) % self.count
+
+    def get(self, angle: float) -> Image.Image:
+        """
+        最接近给定角度的一张。返回的图片与表共用内存，不应修改。
+        :param angle: 逆时针旋转的角度（度）
+        :return: RGBA 图片
+        """
+        return Image.fromarray(self.sprites[self.index(angle)])
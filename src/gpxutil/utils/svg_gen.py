@@ -1,7 +1,14 @@
-from functools import reduce
+import hashlib
+import json
+import os
+import string
+import threading
+from functools import cached_property, lru_cache, reduce
+from typing import Optional
 import xml.etree.ElementTree as ET
 
 import svgwrite
+from svgwrite import Drawing
 from svgpathtools import svg2paths
 from svgpathtools import parse_path
 from svgpathtools.path import Path
@@ -10,6 +17,7 @@ from fontTools.ttLib import TTFont
 from fontTools.pens.svgPathPen import SVGPathPen
 
 from src.gpxutil.core.config import CONFIG_HANDLER
+from src.gpxutil.models.config import TrafficSignConfig
 
 # Brown  -- Panose 469 -- RGB 97,54,29  61361D
 # Green  -- Panose 342 -- RGB 0,110,85  006E55
@@ -25,21 +33,6 @@ from src.gpxutil.core.config import CONFIG_HANDLER
 # Yellow -- CMYK 0/0/100/0   -- RGB 255,242,0   FFF200
 # Orange -- CMYK 0/51/87/0   -- RGB 247,146,51  F79233
 
-# 此部分应该从配置文件中读取
-RED = ''
-WHITE = ''
-YELLOW = ''
-BLACK = ''
-GREEN = ''
-EXPWY_TEMPLATE_DICT = {
-    '1': '',
-    '2': '',
-    '4': '',
-    '1_name': '',
-    '2_name': '',
-    '4_name': '',
-}
-
 # 此部分按照模板和国标硬编码
 WAY_NUM_PAD_WIDTH = 400
 WAY_NUM_PAD_HEIGHT = 200
@@ -102,44 +95,74 @@ EXPWY_BANNER_TEXT_WIDTH_DICT = {
 EXPWY_BANNER_TEXT_HEIGHT = 100
 
 
-def set_const():
+GLYPH_CACHE_SIZE = 4096
+"""各字体、字符的字形轮廓在内存中缓存的条数"""
+
+
+@lru_cache(maxsize=None)
+def load_font(font_path: str) -> tuple[dict, object]:
     """
-    读配置，写入对应的变量，供使用。应该在使用它们的函数最开始执行。
-    :return: None
+    加载字体，每个进程每个字体只加载一次。
+    :param font_path: 字体文件路径
+    :return: 字符编码到字形名称的映射（cmap）、字形集合（glyph set）
     """
-    global RED, WHITE, YELLOW, BLACK, GREEN, EXPWY_TEMPLATE_DICT
-    RED = CONFIG_HANDLER.config.traffic_sign.color.red
-    WHITE = CONFIG_HANDLER.config.traffic_sign.color.white
-    YELLOW = CONFIG_HANDLER.config.traffic_sign.color.yellow
-    BLACK = CONFIG_HANDLER.config.traffic_sign.color.black
-    GREEN = CONFIG_HANDLER.config.traffic_sign.color.green
-    EXPWY_TEMPLATE_DICT = {
-        '1': CONFIG_HANDLER.config.traffic_sign.expwy_code_sign.without_name.num_1.template_path,
-        '2': CONFIG_HANDLER.config.traffic_sign.expwy_code_sign.without_name.num_2.template_path,
-        '4': CONFIG_HANDLER.config.traffic_sign.expwy_code_sign.without_name.num_4.template_path,
-        '1_name': CONFIG_HANDLER.config.traffic_sign.expwy_code_sign.with_name.num_1.template_path,
-        '2_name': CONFIG_HANDLER.config.traffic_sign.expwy_code_sign.with_name.num_2.template_path,
-        '4_name': CONFIG_HANDLER.config.traffic_sign.expwy_code_sign.with_name.num_4.template_path,
-    }
-
-def char_to_svg_path(font_path, char) -> Path:
-    # 加载字体
     font = TTFont(font_path)
+    return font.getBestCmap(), font.getGlyphSet()
 
-    # 获取字符对应的字形名称
-    cmap = font.getBestCmap()
-    glyph_name = cmap[ord(char)]
 
-    # 获取字形对象
-    glyph_set = font.getGlyphSet()
+@lru_cache(maxsize=GLYPH_CACHE_SIZE)
+def glyph_outline(font_path: str, char: str) -> tuple[Path, tuple[float, float, float, float]]:
+    """
+    字符的字形轮廓及其边界，按 (字体, 字符) 缓存。返回的 Path 为多处共用，不应修改。
+    :param font_path: 字体文件路径
+    :param char: 字符
+    :return: 字形轮廓（已上下翻转）、边界 (minx, maxx, miny, maxy)
+    """
+    cmap, glyph_set = load_font(font_path)
+    glyph_name = cmap[ord(char)]
     glyph = glyph_set[glyph_name]
 
     # 创建SVG路径
     pen = SVGPathPen(glyph_set)
     glyph.draw(pen)
-    svg_path = pen.getCommands()
     # 输出图形会上下颠倒
-    return parse_path(svg_path).scaled(1, -1)
+    path = parse_path(pen.getCommands()).scaled(1, -1)
+    return path, path.bbox()
+
+
+def char_to_svg_path(font_path, char) -> Path:
+    """
+    字符的字形轮廓，见 glyph_outline。
+    :param font_path: 字体文件路径
+    :param char: 字符
+    :return: 字形轮廓
+    """
+    return glyph_outline(font_path, char)[0]
+
+
+@lru_cache(maxsize=GLYPH_CACHE_SIZE)
+def _scaled_glyph(font_path: str, char: str, height: int | float) -> tuple[Path, float]:
+    """
+    缩放到给定高度、左上角移到原点的字形轮廓，按 (字体, 字符, 高度) 缓存。
+    :param font_path: 字体文件路径
+    :param char: 字符
+    :param height: 字形的高
+    :return: 字形轮廓、缩放后的宽
+    """
+    path, (char_minx, char_maxx, char_miny, char_maxy) = glyph_outline(font_path, char)
+    ratio = height / (char_maxy - char_miny)
+    # 缩放后的边界即原边界乘以 ratio
+    return path.scaled(ratio).translated(complex(-char_minx * ratio, -char_miny * ratio)), (char_maxx - char_minx) * ratio
+
+
+def clear_glyph_cache():
+    """
+    清空已加载的字体与字形缓存。字体文件被替换后调用。
+    :return: None
+    """
+    load_font.cache_clear()
+    glyph_outline.cache_clear()
+    _scaled_glyph.cache_clear()
 
 
 def get_svg_dimensions(svg_path: str):
@@ -183,23 +206,7 @@ def calculate_scaled_char_info(code: str, start_x: int | float, start_y: int | f
     scaled_char_width_list = []
     char_pos_list = []
     for i in code:
-        # i_ord = 'u{:0>4x}'.format(ord(i))
-        # input_file_char = '{}/u{:0>4x}.svg'.format(font, ord(i))
-        # paths_char, attributes_char = svg2paths(input_file_char)
-        # char_minx, char_maxx, char_miny, char_maxy = paths_char[0].bbox()
-        paths_char = char_to_svg_path(font, i)
-        char_minx, char_maxx, char_miny, char_maxy = paths_char.bbox()
-        char_width = char_maxx - char_minx
-        char_height = char_maxy - char_miny
-        ratio = height / char_height
-        # print('original %s: (%s, %s), (%s * %s)' % (i, char_minx, char_miny, char_width, char_height))
-        # scaled_path_char = paths_char[0].scaled(ratio)
-        scaled_path_char = paths_char.scaled(ratio)
-        scaled_char_minx, scaled_char_maxx, scaled_char_miny, scaled_char_maxy = scaled_path_char.bbox()
-        scaled_char_width = scaled_char_maxx - scaled_char_minx
-        scaled_char_height = scaled_char_maxy - scaled_char_miny
-        scaled_path_char = scaled_path_char.translated(complex(-scaled_char_minx, -scaled_char_miny))
-        # print('scaled %s: (%s, %s), (%s * %s)' % (i, scaled_char_minx, scaled_char_miny, scaled_char_width, scaled_char_height))
+        scaled_path_char, scaled_char_width = _scaled_glyph(font, i, height)
         scaled_char_width_list.append(scaled_char_width)
         scaled_char_path_list.append(scaled_path_char)
     if len(code) > 1:
@@ -216,190 +223,323 @@ def calculate_scaled_char_info(code: str, start_x: int | float, start_y: int | f
     scaled_char_path_list = [path.translated(complex(*pos)) for path, pos in zip(scaled_char_path_list, char_pos_list)]
     return scaled_char_path_list
 
-def generate_way_num_pad(code: str):
-    set_const()
-    match code[0]:
-        case 'G':
-            background_color = RED
-            stroke_color = WHITE
-        case 'S':
-            background_color = YELLOW
-            stroke_color = BLACK
-        case _:
-            background_color = WHITE
-            stroke_color = BLACK
-
-
-    paths, attributes = svg2paths(CONFIG_HANDLER.config.traffic_sign.way_num_pad.template_path)
-
-    scaled_char_path_list = calculate_scaled_char_info(
-        code, WAY_NUM_PAD_WORD_START_X, WAY_NUM_PAD_WORD_START_Y, WAY_NUM_PAD_WORD_WIDTH, WAY_NUM_PAD_WORD_HEIGHT,
-        CONFIG_HANDLER.config.traffic_sign.font_path.B
-    )
-
-    dwg = svgwrite.Drawing('output.svg', size=(f'{WAY_NUM_PAD_WIDTH}', f'{WAY_NUM_PAD_HEIGHT}'))
-    for path, attr in zip(paths, attributes):
-        insert_x = 0
-        insert_y = 0
-        insert_rx = 0
-        insert_ry = 0
-        fill = stroke_color
-        if 'x' in attr:
-            insert_x = attr['x']
-        if 'y' in attr:
-            insert_y = attr['y']
-        if 'rx' in attr:
-            insert_rx = attr['rx']
-        if 'ry' in attr:
-            insert_ry = attr['ry']
-        if 'class' in attr:
-            if attr['class'] == 'background':
-                fill = background_color
-            if attr['class'] == 'stroke':
-                fill = stroke_color
-        dwg.add(dwg.rect(insert=(insert_x, insert_y), size=(attr['width'], attr['height']), rx=insert_rx, ry=insert_ry, fill=fill))
-    for path in scaled_char_path_list:
-        dwg.add(dwg.path(d=path.d(), fill=stroke_color))
-    return dwg
+SIGN_CACHE_SIZE = 1024
+"""SignRenderer 缓存的标志数"""
 
 
-def generate_way_num_pad_to_file(code: str, path: str):
-    generate_way_num_pad(code).saveas(path)
+class SignRenderer:
+    """
+    交通标志生成器。模板只解析一次，颜色、模板路径在创建时从配置文件中读取，生成的标志按参数缓存。
+    返回的 Drawing 为多处共用，不应修改。可在多个线程中共用。
+    """
 
-def generate_expwy_pad(code: str, province: str = None, name: str = None):
-    set_const()
-    code_start_x_index: str = '2'
-    code_start_y_index: str = 'big'
-    code_width_index: str = '2_4_big'
-    code_height_index: str = 'big'
-
-    small_code_start_x_index: str = '4_small'
-    small_code_start_y_index: str = 'small'
-    small_code_width_index: str = '4_small'
-    small_code_height_index: str = 'small'
-
-    name_start_x_index: str = '2_4'
-    # EXPWY_NAME_START_Y
-    name_width_index: int = 2
-    # EXPWY_NAME_HEIGHT
-
-    banner_text_start_x_index: str = ''
-    banner_text_start_y_index: str = 'without_name'
-    banner_text_width_index: str = ''
-    # EXPWY_BANNER_TEXT_HEIGHT
-
-    banner_text = '国家高速'
-
-    background_color = GREEN
-    banner_color = RED
-    banner_char_color = WHITE
-    stroke_color = WHITE
-
-    if province:
-        banner_text = province + '高速'
-        if not code.startswith('S'):
-            code = 'S' + code
-        banner_color = YELLOW
-        banner_char_color = BLACK
-        banner_text_start_x_index = 'province_'
-    else:
-        banner_text_start_x_index = 'national_'
-        if not code.startswith('G'):
-            code = 'G' + code
-
-    code_num_len = len(code) - 1
-    banner_text_start_x_index += str(code_num_len)
-
-    if code_num_len == 4:
-        banner_text_width_index = '4'
-        banner_text_start_x_index = '4'
-    elif province:
-        banner_text_width_index = 'province_1_2'
-    else:
-        banner_text_width_index = 'national_1_2'
-
-    template_index = str(len(code) - 1)
-    if name:
-        template_index += '_name'
-        code_start_y_index = 'big_name'
-        small_code_start_y_index = 'small_name'
-        banner_text_start_y_index = 'with_name'
-
-    match code_num_len:
-        case 1:
-            code_start_x_index = '1'
-            code_width_index = '1'
-            name_start_x_index = '1'
-            name_width_index = 1
-        case 2:
-            code_start_x_index = '2'
-            code_width_index = '2_4_big'
-            name_start_x_index = '2_4'
-            name_width_index = 2
-        case 4:
-            code_start_x_index = '4_big'
-            code_width_index = '2_4_big'
-            name_start_x_index = '2_4'
-            name_width_index = 4
-
-    big_code = None
-    small_code = None
-    if code_num_len == 4:
-        big_code = code[:3]
-        small_code = code[3:]
-    else:
-        big_code = code
-
-    paths, attributes = svg2paths(EXPWY_TEMPLATE_DICT[template_index])
-
-    scaled_banner_text_char_path_list = calculate_scaled_char_info(
-        banner_text, EXPWY_BANNER_TEXT_START_X_DICT[banner_text_start_x_index],
-        EXPWY_BANNER_TEXT_START_Y_DICT[banner_text_start_y_index],
-        EXPWY_BANNER_TEXT_WIDTH_DICT[banner_text_width_index], EXPWY_BANNER_TEXT_HEIGHT,
-        CONFIG_HANDLER.config.traffic_sign.font_path.A
-    )
-
-    scaled_big_code_char_path_list = calculate_scaled_char_info(
-        big_code, EXPWY_CODE_START_X_DICT[code_start_x_index], EXPWY_CODE_START_Y_DICT[code_start_y_index],
-        EXPWY_CODE_WIDTH_DICT[code_width_index], EXPWY_CODE_HEIGHT_DICT[code_height_index],
-        CONFIG_HANDLER.config.traffic_sign.font_path.B
-    )
-    if small_code:
-        scaled_small_code_char_path_list = calculate_scaled_char_info(
-            small_code, EXPWY_CODE_START_X_DICT[small_code_start_x_index],
-            EXPWY_CODE_START_Y_DICT[small_code_start_y_index], EXPWY_CODE_WIDTH_DICT[small_code_width_index],
-            EXPWY_CODE_HEIGHT_DICT[small_code_height_index], CONFIG_HANDLER.config.traffic_sign.font_path.C
-        )
-    if name:
-        scaled_name_char_path_list = calculate_scaled_char_info(
-            name, EXPWY_NAME_START_X_DICT[name_start_x_index], EXPWY_NAME_START_Y, EXPWY_NAME_WIDTH_DICT[name_width_index],
-            EXPWY_NAME_HEIGHT, CONFIG_HANDLER.config.traffic_sign.font_path.A
+    def __init__(self, traffic_sign_config: TrafficSignConfig = None, cache_size: int = SIGN_CACHE_SIZE):
+        """
+        :param traffic_sign_config: 交通标志的配置，默认从配置文件中读取
+        :param cache_size: 缓存的标志数
+        """
+        config = traffic_sign_config or CONFIG_HANDLER.config.traffic_sign
+        self.red = config.color.red
+        self.white = config.color.white
+        self.yellow = config.color.yellow
+        self.black = config.color.black
+        self.green = config.color.green
+        self.font_a = config.font_path.A
+        self.font_b = config.font_path.B
+        self.font_c = config.font_path.C
+        self.way_num_pad_template_path = config.way_num_pad.template_path
+        self.expwy_template_dict = {
+            '1': config.expwy_code_sign.without_name.num_1.template_path,
+            '2': config.expwy_code_sign.without_name.num_2.template_path,
+            '4': config.expwy_code_sign.without_name.num_4.template_path,
+            '1_name': config.expwy_code_sign.with_name.num_1.template_path,
+            '2_name': config.expwy_code_sign.with_name.num_2.template_path,
+            '4_name': config.expwy_code_sign.with_name.num_4.template_path,
+        }
+        self._templates: dict[str, tuple[list[tuple[str, dict]], tuple[float, float]]] = {}
+        self._templates_lock = threading.Lock()
+        self._render = lru_cache(maxsize=cache_size)(self._render_uncached)
+
+    def _template(self, template_path: str) -> tuple[list[tuple[str, dict]], tuple[float, float]]:
+        """
+        解析模板，每个模板只解析一次。
+        :param template_path: 模板路径
+        :return: 各图形的 (路径 d 属性, 属性)、模板的宽高
+        """
+        template = self._templates.get(template_path)
+        if template is None:
+            with self._templates_lock:
+                template = self._templates.get(template_path)
+                if template is None:
+                    paths, attributes = svg2paths(template_path)
+                    template = ([(path.d(), attr) for path, attr in zip(paths, attributes)], get_svg_dimensions(template_path))
+                    self._templates[template_path] = template
+        return template
+
+    def render(self, code: str, province: str = None, name: str = None) -> Drawing:
+        """
+        生成道路编号标志。编号为四位的国道、省道、县道等生成编号牌，其余生成高速公路编号标志。
+        :param code: 道路编号。省级高速可以省简称开头，如 豫S21
+        :param province: 省级高速所属省份的简称
+        :param name: 高速公路名称，为空时不显示
+        :return: Drawing
+        """
+        return self._render(*self.sign_key(code, province, name))
+
+    def sign_key(self, code: str, province: str = None, name: str = None) -> tuple[str, str, Optional[str], Optional[str]]:
+        """
+        render 实际生成的标志：类型与参数。参数不同但生成的标志相同时，结果也相同。
+        :param code: 道路编号，见 render
+        :param province: 省级高速所属省份的简称
+        :param name: 高速公路名称
+        :return: (类型 way_num / expwy, 编号, 省份简称, 名称)
+        """
+        if province is None and code[0] not in string.ascii_uppercase:
+            province, code = code[0], code[1:]
+        if province is None and len(code) == 4:
+            return 'way_num', code, None, None
+        return 'expwy', code, province, name
+
+    @cached_property
+    def style_hash(self) -> str:
+        """
+        颜色与模板、字体文件（路径、修改时间、大小）的哈希，其中任一变化时标志的样式可能变化。
+        :return: 十六进制字符串
+        """
+        style = [self.red, self.white, self.yellow, self.black, self.green]
+        for path in [self.font_a, self.font_b, self.font_c, self.way_num_pad_template_path, *self.expwy_template_dict.values()]:
+            stat = os.stat(path) if path and os.path.exists(path) else None
+            style.append([path, stat.st_mtime_ns if stat else None, stat.st_size if stat else None])
+        return hashlib.sha256(json.dumps(style).encode('utf-8')).hexdigest()
+
+    def way_num_pad(self, code: str) -> Drawing:
+        """
+        生成国道、省道、县道等的编号牌。
+        :param code: 道路编号，如 G310
+        :return: Drawing
+        """
+        return self._render('way_num', code, None, None)
+
+    def expwy_pad(self, code: str, province: str = None, name: str = None) -> Drawing:
+        """
+        生成高速公路编号标志。
+        :param code: 道路编号，可不带 G、S
+        :param province: 省级高速所属省份的简称，为空时为国家高速
+        :param name: 高速公路名称，为空时不显示
+        :return: Drawing
+        """
+        return self._render('expwy', code, province, name)
+
+    def _render_uncached(self, kind: str, code: str, province: Optional[str], name: Optional[str]) -> Drawing:
+        if kind == 'way_num':
+            return self._build_way_num_pad(code)
+        return self._build_expwy_pad(code, province, name)
+
+    def _build_way_num_pad(self, code: str) -> Drawing:
+        match code[0]:
+            case 'G':
+                background_color = self.red
+                stroke_color = self.white
+            case 'S':
+                background_color = self.yellow
+                stroke_color = self.black
+            case _:
+                background_color = self.white
+                stroke_color = self.black
+
+        template_paths, _ = self._template(self.way_num_pad_template_path)
+
+        scaled_char_path_list = calculate_scaled_char_info(
+            code, WAY_NUM_PAD_WORD_START_X, WAY_NUM_PAD_WORD_START_Y, WAY_NUM_PAD_WORD_WIDTH, WAY_NUM_PAD_WORD_HEIGHT,
+            self.font_b
         )
 
-    dwg = svgwrite.Drawing('output.svg', size=tuple([str(i) for i in get_svg_dimensions(EXPWY_TEMPLATE_DICT[template_index])]))
-    for path, attr in zip(paths, attributes):
-        fill = WHITE
-        if 'class' in attr:
-            if attr['class'] == 'background':
-                fill = background_color
-            if attr['class'] == 'stroke':
-                fill = stroke_color
-            if attr['class'] == 'banner':
-                fill = banner_color
-            # if attr['class'] == 'banner_text':
-            #     fill = banner_char_color
-        dwg.add(dwg.path(d=path.d(), fill=fill))
-    for path in scaled_banner_text_char_path_list:
-        dwg.add(dwg.path(d=path.d(), fill=banner_char_color))
-    for path in scaled_big_code_char_path_list:
-        dwg.add(dwg.path(d=path.d(), fill=stroke_color))
-    if small_code:
-        for path in scaled_small_code_char_path_list:
+        dwg = svgwrite.Drawing('output.svg', size=(f'{WAY_NUM_PAD_WIDTH}', f'{WAY_NUM_PAD_HEIGHT}'))
+        for _, attr in template_paths:
+            insert_x = 0
+            insert_y = 0
+            insert_rx = 0
+            insert_ry = 0
+            fill = stroke_color
+            if 'x' in attr:
+                insert_x = attr['x']
+            if 'y' in attr:
+                insert_y = attr['y']
+            if 'rx' in attr:
+                insert_rx = attr['rx']
+            if 'ry' in attr:
+                insert_ry = attr['ry']
+            if 'class' in attr:
+                if attr['class'] == 'background':
+                    fill = background_color
+                if attr['class'] == 'stroke':
+                    fill = stroke_color
+            dwg.add(dwg.rect(insert=(insert_x, insert_y), size=(attr['width'], attr['height']), rx=insert_rx, ry=insert_ry, fill=fill))
+        for path in scaled_char_path_list:
             dwg.add(dwg.path(d=path.d(), fill=stroke_color))
-    if name:
-        for path in scaled_name_char_path_list:
+        return dwg
+
+    def _build_expwy_pad(self, code: str, province: str = None, name: str = None) -> Drawing:
+        code_start_x_index: str = '2'
+        code_start_y_index: str = 'big'
+        code_width_index: str = '2_4_big'
+        code_height_index: str = 'big'
+
+        small_code_start_x_index: str = '4_small'
+        small_code_start_y_index: str = 'small'
+        small_code_width_index: str = '4_small'
+        small_code_height_index: str = 'small'
+
+        name_start_x_index: str = '2_4'
+        # EXPWY_NAME_START_Y
+        name_width_index: int = 2
+        # EXPWY_NAME_HEIGHT
+
+        banner_text_start_x_index: str = ''
+        banner_text_start_y_index: str = 'without_name'
+        banner_text_width_index: str = ''
+        # EXPWY_BANNER_TEXT_HEIGHT
+
+        banner_text = '国家高速'
+
+        background_color = self.green
+        banner_color = self.red
+        banner_char_color = self.white
+        stroke_color = self.white
+
+        if province:
+            banner_text = province + '高速'
+            if not code.startswith('S'):
+                code = 'S' + code
+            banner_color = self.yellow
+            banner_char_color = self.black
+            banner_text_start_x_index = 'province_'
+        else:
+            banner_text_start_x_index = 'national_'
+            if not code.startswith('G'):
+                code = 'G' + code
+
+        code_num_len = len(code) - 1
+        banner_text_start_x_index += str(code_num_len)
+
+        if code_num_len == 4:
+            banner_text_width_index = '4'
+            banner_text_start_x_index = '4'
+        elif province:
+            banner_text_width_index = 'province_1_2'
+        else:
+            banner_text_width_index = 'national_1_2'
+
+        template_index = str(len(code) - 1)
+        if name:
+            template_index += '_name'
+            code_start_y_index = 'big_name'
+            small_code_start_y_index = 'small_name'
+            banner_text_start_y_index = 'with_name'
+
+        match code_num_len:
+            case 1:
+                code_start_x_index = '1'
+                code_width_index = '1'
+                name_start_x_index = '1'
+                name_width_index = 1
+            case 2:
+                code_start_x_index = '2'
+                code_width_index = '2_4_big'
+                name_start_x_index = '2_4'
+                name_width_index = 2
+            case 4:
+                code_start_x_index = '4_big'
+                code_width_index = '2_4_big'
+                name_start_x_index = '2_4'
+                name_width_index = 4
+
+        big_code = None
+        small_code = None
+        if code_num_len == 4:
+            big_code = code[:3]
+            small_code = code[3:]
+        else:
+            big_code = code
+
+        template_paths, template_size = self._template(self.expwy_template_dict[template_index])
+
+        scaled_banner_text_char_path_list = calculate_scaled_char_info(
+            banner_text, EXPWY_BANNER_TEXT_START_X_DICT[banner_text_start_x_index],
+            EXPWY_BANNER_TEXT_START_Y_DICT[banner_text_start_y_index],
+            EXPWY_BANNER_TEXT_WIDTH_DICT[banner_text_width_index], EXPWY_BANNER_TEXT_HEIGHT,
+            self.font_a
+        )
+
+        scaled_big_code_char_path_list = calculate_scaled_char_info(
+            big_code, EXPWY_CODE_START_X_DICT[code_start_x_index], EXPWY_CODE_START_Y_DICT[code_start_y_index],
+            EXPWY_CODE_WIDTH_DICT[code_width_index], EXPWY_CODE_HEIGHT_DICT[code_height_index],
+            self.font_b
+        )
+        if small_code:
+            scaled_small_code_char_path_list = calculate_scaled_char_info(
+                small_code, EXPWY_CODE_START_X_DICT[small_code_start_x_index],
+                EXPWY_CODE_START_Y_DICT[small_code_start_y_index], EXPWY_CODE_WIDTH_DICT[small_code_width_index],
+                EXPWY_CODE_HEIGHT_DICT[small_code_height_index], self.font_c
+            )
+        if name:
+            scaled_name_char_path_list = calculate_scaled_char_info(
+                name, EXPWY_NAME_START_X_DICT[name_start_x_index], EXPWY_NAME_START_Y, EXPWY_NAME_WIDTH_DICT[name_width_index],
+                EXPWY_NAME_HEIGHT, self.font_a
+            )
+
+        dwg = svgwrite.Drawing('output.svg', size=tuple([str(i) for i in template_size]))
+        for path_d, attr in template_paths:
+            fill = self.white
+            if 'class' in attr:
+                if attr['class'] == 'background':
+                    fill = background_color
+                if attr['class'] == 'stroke':
+                    fill = stroke_color
+                if attr['class'] == 'banner':
+                    fill = banner_color
+                # if attr['class'] == 'banner_text':
+                #     fill = banner_char_color
+            dwg.add(dwg.path(d=path_d, fill=fill))
+        for path in scaled_banner_text_char_path_list:
+            dwg.add(dwg.path(d=path.d(), fill=banner_char_color))
+        for path in scaled_big_code_char_path_list:
             dwg.add(dwg.path(d=path.d(), fill=stroke_color))
-    return dwg
+        if small_code:
+            for path in scaled_small_code_char_path_list:
+                dwg.add(dwg.path(d=path.d(), fill=stroke_color))
+        if name:
+            for path in scaled_name_char_path_list:
+                dwg.add(dwg.path(d=path.d(), fill=stroke_color))
+        return dwg
+
+
+_sign_renderer: Optional[SignRenderer] = None
+_sign_renderer_lock = threading.Lock()
+
+
+def get_sign_renderer() -> SignRenderer:
+    """
+    获取共用的交通标志生成器，配置从配置文件中读取。
+    :return: SignRenderer
+    """
+    global _sign_renderer
+    if _sign_renderer is None:
+        with _sign_renderer_lock:
+            if _sign_renderer is None:
+                _sign_renderer = SignRenderer()
+    return _sign_renderer
+
+
+def generate_way_num_pad(code: str) -> Drawing:
+    return get_sign_renderer().way_num_pad(code)
+
+
+def generate_way_num_pad_to_file(code: str, path: str):
+    generate_way_num_pad(code).saveas(path)
+
+def generate_expwy_pad(code: str, province: str = None, name: str = None) -> Drawing:
+    return get_sign_renderer().expwy_pad(code, province, name)
 
 
 def generate_expwy_pad_to_file(path: str, code: str, province: str = None, name: str = None):
@@ -0,0 +1,70 @@
+"""各测试共用的 pytest fixture"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Union
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from src.gpxutil.utils.geocoding import cache as cache_module
+from src.gpxutil.utils.geocoding import key_pool
+from src.gpxutil.utils.geocoding.cache import GeocodingCacheHandler
+
+
+@pytest.fixture
+def no_geocoding_cache(monkeypatch) -> GeocodingCacheHandler:
+    """
+    不读取配置文件，直接替换缓存单例：不读写本地缓存和密钥用量文件，内存中的 LRU 缓存从空开始。
+    返回替换后的单例，需要缓存时可为其 cache 赋值。
+    """
+    handler = object.__new__(GeocodingCacheHandler)
+    handler.cache = None
+    monkeypatch.setattr(GeocodingCacheHandler, '_instance', handler)
+    monkeypatch.setattr(GeocodingCacheHandler, '_initialized', True)
+    monkeypatch.setattr(cache_module, '_lru_caches', {})
+    monkeypatch.setattr(key_pool, '_usage_store', key_pool.KeyUsageStore(None))
+    return handler
+
+
+def _json_handler(respond: Callable[[str, dict], object]) -> type[BaseHTTPRequestHandler]:
+    """将 respond(路径, 查询参数) 包装为返回其 JSON 结果的 GET 请求处理类"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            data = json.dumps(respond(parsed.path, parse_qs(parsed.query))).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+@pytest.fixture
+def stub_http_server():
+    """
+    在本地启动模拟 API 的 HTTP 服务，测试结束时关闭。
+    用法：url = stub_http_server(handler)。handler 为 respond(路径, 查询参数) 函数，返回值作为 JSON 响应；
+    也可为 BaseHTTPRequestHandler 的子类。返回服务地址，如 http://127.0.0.1:12345
+    """
+    servers = []
+
+    def start(handler: Union[Callable[[str, dict], object], type[BaseHTTPRequestHandler]]) -> str:
+        if not isinstance(handler, type):
+            handler = _json_handler(handler)
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f'http://127.0.0.1:{server.server_address[1]}'
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
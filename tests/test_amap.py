@@ -0,0 +1,67 @@
+"""测试高德批量逆向编码的 pytest 用例，API 由本地的 HTTP 服务模拟"""
+
+import numpy as np
+import pytest
+
+from src.gpxutil.utils.geocoding import amap
+from src.gpxutil.utils.geocoding.executor import geocode_points
+
+
+def _regeocode(lon: float, lat: float) -> dict:
+    """按纬度分区；经度小数部分小于 0.5 的点有门牌街道，其余的点只有附近道路"""
+    has_street = lon % 1 < 0.5
+    return {
+        'addressComponent': {
+            'province': '湖北省', 'city': '武汉市', 'district': f'区{int(lat * 10)}', 'township': '街道',
+            'streetNumber': {'street': f'路{int(lat * 10)}'} if has_street else [],
+        },
+        'roads': [] if has_street else [
+            {'name': '远路', 'distance': '120.5'}, {'name': f'近路{int(lat * 10)}', 'distance': '10.2'},
+        ],
+    }
+
+
+@pytest.fixture
+def amap_stub(monkeypatch, stub_http_server, no_geocoding_cache):
+    """模拟高德 regeo 接口，记录请求次数"""
+    requests = []
+
+    def respond(path, query):
+        requests.append(query)
+        locations = [tuple(map(float, location.split(','))) for location in query['location'][0].split('|')]
+        body = {'status': '1', 'info': 'OK', 'infocode': '10000'}
+        if query.get('batch') == ['true']:
+            body['regeocodes'] = [_regeocode(lon, lat) for lon, lat in locations]
+        else:
+            body['regeocode'] = _regeocode(*locations[0])
+        return body
+
+    monkeypatch.setattr(amap, 'AMAP_REGEO_URL', stub_http_server(respond) + '/v3/geocode/regeo')
+    return requests
+
+
+def _sample_points(size: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(0)
+    # 纬度避开 0.1 的整数倍附近，量化到 6 位小数不会改变分区
+    latitude = 30 + np.floor(rng.uniform(0, 10, size)) / 10 + 0.05
+    longitude = 114 + rng.uniform(0, 1, size)
+    return latitude, longitude
+
+
+def test_get_point_info_batch_matches_single(amap_stub):
+    """测试批量获取的结果与逐点获取一致，包括道路名的回退规则，且每 20 个点只请求一次"""
+    latitude, longitude = _sample_points(45)
+    results = amap.get_point_info_batch(latitude, longitude, ak='test', freq=1000)
+    assert len(amap_stub) == 3
+    assert all(len(query['location'][0].split('|')) <= amap.AMAP_BATCH_SIZE for query in amap_stub)
+    for lat, lon, result in zip(latitude, longitude, results):
+        assert result == amap.get_point_info(lat, lon, ak='test', freq=1000)
+    assert {result['road_name'].rstrip('0123456789') for result in results} == {'路', '近路'}, "两种道路名都应覆盖到"
+
+
+def test_geocode_points_amap_batch(amap_stub):
+    """测试并发执行时按批请求，结果按输入顺序返回"""
+    latitude, longitude = _sample_points(101)
+    results = geocode_points('amap', latitude, longitude, map_api_ak='test', map_freq=1000, concurrency=3)
+    assert len(amap_stub) == 6
+    assert [result['area'] for result in results] == [f'区{int(lat * 10)}' for lat in latitude]
@@ -0,0 +1,218 @@
+"""测试行政区划空间索引的 pytest 用例"""
+
+import os
+import sqlite3
+
+import geopandas as gpd
+import numpy as np
+import pytest
+from shapely import Point, box
+
+from src.gpxutil.core.config import CONFIG_HANDLER
+from src.gpxutil.models.exceptions import PointAreaNotFoundException
+from src.gpxutil.models import route as route_module
+from src.gpxutil.models.route import Route, RoutePoint
+from src.gpxutil.utils.geocoding.gdf.area_index import AreaGDFList, AreaIndex
+from src.gpxutil.utils.geocoding.gdf.area_info import get_area_id, get_area_info, get_area_info_many, get_area_names
+from src.gpxutil.utils.geocoding.gdf.gdf_cache import AREA_GDF_CACHE_FILENAME
+from src.gpxutil.utils.geocoding.gdf.gdf_handler import load_area_gdf_list
+from src.gpxutil.utils.geocoding.road.road_handler import RoadIndexHandler
+from src.gpxutil.utils.geocoding.road.road_index import RoadIndex, RoadNetwork
+
+
+def _sample_area_gdf_list():
+    """两个 GeoDataFrame，网格状的区域，第二个中有一个与第一个重叠的区域"""
+    first = gpd.GeoDataFrame({
+        'id': [f'1{i}{j}' for i in range(3) for j in range(3)],
+        'geometry': [box(i, j, i + 1, j + 1) for i in range(3) for j in range(3)],
+    })
+    second = gpd.GeoDataFrame({
+        'id': ['200', '201'],
+        'geometry': [box(0.5, 0.5, 1.5, 1.5), box(10, 10, 11, 11)],
+    })
+    return [first, second]
+
+
+def _sample_area_code_conn():
+    """与行政区划代码数据库结构相同的内存数据库，'122' 不在库中"""
+    conn = sqlite3.connect(':memory:')
+    conn.execute('create table province (code text, name text)')
+    conn.execute('create table city (code text, name text)')
+    conn.execute('create table area (code text, name text, provinceCode text, cityCode text)')
+    conn.execute("insert into province values ('1', '一省'), ('2', '二省')")
+    conn.execute("insert into city values ('10', '一市'), ('20', '二市')")
+    for i in range(3):
+        for j in range(3):
+            if (i, j) != (2, 2):
+                conn.execute("insert into area values (?, ?, '1', '10')", (f'1{i}{j}', f'区{i}{j}'))
+    conn.execute("insert into area values ('200', '重叠区', '2', '20'), ('201', '远区', '2', '20')")
+    return conn
+
+
+def _integer_code_sample():
+    """代码为整数（adcode）的边界数据与数据库"""
+    area_gdf_list = AreaGDFList([gpd.GeoDataFrame({
+        'id': [110101, 110102],
+        'geometry': [box(0, 0, 1, 1), box(1, 0, 2, 1)],
+    }, crs='EPSG:4326')])
+    conn = sqlite3.connect(':memory:')
+    conn.execute('create table province (code integer, name text)')
+    conn.execute('create table city (code integer, name text)')
+    conn.execute('create table area (code integer, name text, provinceCode integer, cityCode integer)')
+    conn.execute("insert into province values (110000, '北京市')")
+    conn.execute("insert into city values (110100, '市辖区')")
+    conn.execute("insert into area values (110101, '东城区', 110000, 110100), (110102, '西城区', 110000, 110100)")
+    return area_gdf_list, conn
+
+
+def _expected_area_id(point, area_gdf_list):
+    """逐行遍历，作为对照"""
+    for gdf in area_gdf_list:
+        for _, row in gdf.iterrows():
+            if row['geometry'].contains(point):
+                return row['id']
+    return None
+
+
+def test_area_index_matches_row_by_row():
+    """测试空间索引的查询结果与逐行遍历一致，重叠时取靠前的区域"""
+    area_gdf_list = _sample_area_gdf_list()
+    index = AreaIndex(area_gdf_list)
+    rng = np.random.default_rng(0)
+    for x, y in rng.uniform(-1, 12, (200, 2)):
+        point = Point(x, y)
+        assert index.find(point) == _expected_area_id(point, area_gdf_list)
+    assert index.find(Point(0.75, 0.75)) == '100', "重叠时应取靠前的区域"
+    assert index.find(Point(10.5, 10.5)) == '201'
+
+
+def test_get_area_id_not_found():
+    """测试不在任何区域内时抛出 PointAreaNotFoundException"""
+    area_gdf_list = AreaGDFList(_sample_area_gdf_list())
+    assert get_area_id(Point(2.5, 2.5), area_gdf_list) == '122'
+    with pytest.raises(PointAreaNotFoundException):
+        get_area_id(Point(5, 5), area_gdf_list)
+
+
+def test_get_area_info_integer_codes():
+    """测试边界数据中的代码为整数时，逐点获取仍能在数据库中查到行政区划"""
+    area_gdf_list, conn = _integer_code_sample()
+    area_id = get_area_id(Point(0.5, 0.5), area_gdf_list)
+    assert area_id == 110101 and type(area_id) is int
+    assert get_area_info(Point(0.5, 0.5), area_gdf_list, conn) == ('北京市', '市辖区', '东城区')
+    assert get_area_info(Point(1.5, 0.5), area_gdf_list, conn) == ('北京市', '市辖区', '西城区')
+
+
+def test_get_area_info_many_matches_single_point():
+    """测试批量获取的行政区划与逐点获取一致"""
+    area_gdf_list = AreaGDFList(_sample_area_gdf_list())
+    conn = _sample_area_code_conn()
+    rng = np.random.default_rng(1)
+    longitude = rng.uniform(-1, 12, 300)
+    latitude = rng.uniform(-1, 12, 300)
+    result_indices, results = get_area_info_many(longitude, latitude, area_gdf_list, conn)
+    for i, (x, y) in enumerate(zip(longitude, latitude)):
+        expected = get_area_info(Point(x, y), area_gdf_list, conn)
+        assert results[result_indices[i]] == (expected if expected != (None, None, None) else None)
+
+
+def test_get_area_info_many_integer_codes(tmp_path):
+    """测试代码为整数的边界数据，从 GeoJSON 与从二进制缓存加载后，批量获取都能查到行政区划"""
+    sample_gdf_list, conn = _integer_code_sample()
+    sample_gdf_list[0].to_file(tmp_path / '110000.json', driver='GeoJSON')
+    expected = [('北京市', '市辖区', '东城区'), ('北京市', '市辖区', '西城区'), None]
+    from_geojson = load_area_gdf_list(str(tmp_path), use_cache=False)
+    load_area_gdf_list(str(tmp_path))
+    assert os.path.exists(tmp_path / AREA_GDF_CACHE_FILENAME)
+    from_cache = load_area_gdf_list(str(tmp_path))
+    for area_gdf_list in (from_geojson, from_cache):
+        result_indices, results = get_area_info_many(np.array([0.5, 1.5, 5.0]), np.array([0.5, 0.5, 5.0]),
+                                                     area_gdf_list, conn)
+        assert [results[i] for i in result_indices] == expected
+        route = Route(points=[RoutePoint(index=0, longitude=1.5, latitude=0.5)])
+        route.set_area(source='gdf', area_gdf_list=area_gdf_list, area_code_conn=conn)
+        assert route.points[0].area == '西城区'
+    assert get_area_names(np.array([110101, 110102]), conn) == {
+        '110101': ('北京市', '市辖区', '东城区'), '110102': ('北京市', '市辖区', '西城区'),
+    }, "numpy 的整数也应能查到"
+
+
+def test_route_set_area_gdf_bulk():
+    """测试 Route.set_area 从 GDF 批量填写，变化的行政区划清空英文名"""
+    area_gdf_list = AreaGDFList(_sample_area_gdf_list())
+    conn = _sample_area_code_conn()
+    points = [
+        RoutePoint(index=0, longitude=0.75, latitude=0.75, province='旧省', province_en='Old'),
+        RoutePoint(index=1, longitude=1.5, latitude=0.2, province='一省', city='一市', area='区10', province_en='P'),
+        RoutePoint(index=2, longitude=2.5, latitude=2.5),
+        RoutePoint(index=3, longitude=50.0, latitude=50.0),
+    ]
+    route = Route(points=points)
+    route.set_area(source='gdf', area_gdf_list=area_gdf_list, area_code_conn=conn)
+    assert (route.points[0].province, route.points[0].city, route.points[0].area) == ('一省', '一市', '区00')
+    assert route.points[0].province_en is None, "行政区划变化时应清空英文名"
+    assert route.points[1].province_en == 'P', "已填写的点不应被覆盖"
+    assert route.points[2].area is None, "数据库中没有的代码应为 None"
+    assert route.points[3].province is None, "不在任何区域内应为 None"
+
+
+def test_route_set_area_gdf_bisect():
+    """测试按间隔判断、二分查找边界的结果与逐点判断一致"""
+    area_gdf_list = AreaGDFList(_sample_area_gdf_list())
+    conn = _sample_area_code_conn()
+    # 沿对角线穿过多个区域
+    points = [RoutePoint(index=i, longitude=-0.5 + i * 0.004, latitude=-0.5 + i * 0.003) for i in range(1000)]
+    expected = Route(points=points)
+    expected.set_area(source='gdf', area_gdf_list=area_gdf_list, area_code_conn=conn)
+    route = Route(points=points)
+    route.set_area(source='gdf', area_gdf_list=area_gdf_list, area_code_conn=conn, gdf_bisect_step=50)
+    assert route.columns.categoricals['area'].to_list() == expected.columns.categoricals['area'].to_list()
+
+
+def test_route_set_area_hybrid(monkeypatch):
+    """测试 hybrid：行政区划从 GDF 获取，道路只在地区或方向变化时请求一次，结果沿用到整段"""
+    requested = []
+
+    def fake_geocode_points(source, latitude, longitude, indices=None, journal=None, **kwargs):
+        requested.extend(indices.tolist())
+        # 向北的路段为一号路，向东的为二号路
+        return [{'road_name': '一号路' if lon < 0.5 else '二号路', 'road_num': 'G1' if lon < 0.5 else ''}
+                for lat, lon in zip(latitude, longitude)]
+
+    monkeypatch.setattr(route_module, 'geocode_points', fake_geocode_points)
+    # 先向北穿过两个区域，再向东
+    points = [RoutePoint(index=i, longitude=0.2, latitude=0.11 + i * 0.02, course=0.0, distance=i * 10.0) for i in range(80)]
+    points += [RoutePoint(index=80 + i, longitude=0.31 + i * 0.02, latitude=1.7, course=90.0, distance=800 + i * 10.0)
+               for i in range(40)]
+    route = Route(points=points)
+    route.set_area(source='hybrid', area_gdf_list=AreaGDFList(_sample_area_gdf_list()), area_code_conn=_sample_area_code_conn())
+    assert len(requested) == 4, "向北在两个区域内各一段，向东在两个区域内各一段"
+    assert route.points[10].area == '区00' and route.points[60].area == '区01'
+    assert route.points[10].road_name == '一号路' and route.points[10].road_num == 'G1'
+    assert route.points[100].road_name == '二号路' and route.points[100].area == '区01'
+    assert route.points[119].area == '区11'
+
+
+def test_route_set_area_hybrid_osm(monkeypatch):
+    """测试 hybrid 的道路来源为 osm 时，道路从离线道路数据逐点匹配，不请求在线 API"""
+    def fail_geocode_points(*args, **kwargs):
+        raise AssertionError('online API should not be used')
+
+    network = RoadNetwork(
+        segments=np.array([[0.2, 0.0, 0.2, 2.0]]), segment_way=np.array([0], dtype=np.int32),
+        names=np.array(['一号路']), names_en=np.array(['No. 1 Road']), refs=np.array(['G1']),
+    )
+    handler = object.__new__(RoadIndexHandler)
+    handler.index = RoadIndex(network)
+    monkeypatch.setattr(RoadIndexHandler, '_instance', handler)
+    monkeypatch.setattr(RoadIndexHandler, '_initialized', True)
+    monkeypatch.setattr(route_module, 'geocode_points', fail_geocode_points)
+    monkeypatch.setattr(CONFIG_HANDLER.config.area_info.hybrid, 'road_source', 'osm')
+    points = [RoutePoint(index=i, longitude=0.2, latitude=0.11 + i * 0.02, course=0.0, distance=i * 10.0) for i in range(80)]
+    points.append(RoutePoint(index=80, longitude=0.5, latitude=1.7, course=90.0, distance=900.0))
+    route = Route(points=points)
+    route.set_area(source='hybrid', area_gdf_list=AreaGDFList(_sample_area_gdf_list()), area_code_conn=_sample_area_code_conn())
+    assert route.points[10].area == '区00' and route.points[60].area == '区01'
+    assert route.points[10].road_name == '一号路' and route.points[10].road_name_en == 'No. 1 Road'
+    assert route.points[60].road_num == 'G1'
+    assert route.points[80].road_name is None and route.points[80].area == '区01'
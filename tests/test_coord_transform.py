@@ -0,0 +1,46 @@
+"""测试数组版坐标转换的 pytest 用例"""
+
+import numpy as np
+import pytest
+
+from src.gpxutil.utils.coord_transform import gcj02_to_wgs84, wgs84_to_gcj02
+from src.gpxutil.utils.gpx_convert import convert_points, convert_single_point
+
+
+def _sample_coordinates():
+    rng = np.random.default_rng(0)
+    lng = rng.uniform(73.0, 136.0, 500)
+    lat = rng.uniform(3.0, 54.0, 500)
+    # 加上几个境外的点
+    lng = np.concatenate([lng, [-0.1278, 151.2093, 2.3522]])
+    lat = np.concatenate([lat, [51.5074, -33.8688, 48.8566]])
+    return lng, lat
+
+
+@pytest.mark.parametrize('original_coordinate_type, transformed_coordinate_type', [
+    ('wgs84', 'gcj02'), ('wgs84', 'bd09'),
+    ('gcj02', 'wgs84'), ('gcj02', 'bd09'),
+    ('bd09', 'wgs84'), ('bd09', 'gcj02'),
+])
+def test_convert_points_matches_single_point(original_coordinate_type, transformed_coordinate_type):
+    """测试批量转换与逐点转换结果一致"""
+    lng, lat = _sample_coordinates()
+    transformed_lng, transformed_lat = convert_points(lng, lat, original_coordinate_type, transformed_coordinate_type)
+    expected = np.array([
+        convert_single_point(x, y, original_coordinate_type, transformed_coordinate_type) for x, y in zip(lng, lat)
+    ])
+    np.testing.assert_allclose(transformed_lng, expected[:, 0], rtol=0, atol=1e-12)
+    np.testing.assert_allclose(transformed_lat, expected[:, 1], rtol=0, atol=1e-12)
+
+
+def test_gcj02_to_wgs84_iterative_inverse():
+    """测试迭代求逆后重新加密能回到输入坐标"""
+    lng, lat = _sample_coordinates()
+    gcj_lng, gcj_lat = wgs84_to_gcj02(lng, lat)
+    wgs_lng, wgs_lat = gcj02_to_wgs84(gcj_lng, gcj_lat, tolerance=1e-10)
+    np.testing.assert_allclose(wgs_lng, lng, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(wgs_lat, lat, rtol=0, atol=1e-9)
+
+    # 一步近似的误差明显更大
+    approx_lng, _ = gcj02_to_wgs84(gcj_lng, gcj_lat)
+    assert np.abs(approx_lng - lng).max() > np.abs(wgs_lng - lng).max(), "迭代求逆应比一步近似更精确"
@@ -0,0 +1,67 @@
+"""测试信息图分层合成的 pytest 用例，需要 Cairo 和配置文件中的字体"""
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from src.gpxutil.utils import create_pic
+from src.gpxutil.utils.create_pic import FrameCompositor
+
+
+class _StubSignRasterCache:
+    """按编号长度生成纯色标志，记录请求的编号"""
+
+    def __init__(self):
+        self.requested = []
+
+    def get(self, code: str) -> Image.Image:
+        self.requested.append(code)
+        return Image.new('RGBA', (64 * len(code), create_pic.road_sign_height), (181, 39, 60, 255))
+
+
+def test_layers_reused(monkeypatch):
+    """测试区域、道路内容不变时图层只绘制一次，每帧只有数字与指南针不同"""
+    sign_raster_cache = _StubSignRasterCache()
+    monkeypatch.setattr(create_pic, '_sign_raster_cache', sign_raster_cache)
+    compositor = FrameCompositor()
+    signs = ['G4511', 'S21']
+    frames = [
+        compositor.compose('湖北省 武汉市', 'Wuhan, Hubei', signs, '珞喻路', 'Luoyu Rd', i * 10.0, 1.0 + i, 100 + i,
+                           9.0 - i, 900 - i, 52.5, 30.0 + i)
+        for i in range(3)
+    ]
+    assert (compositor._area_layers.misses, compositor._area_layers.hits) == (1, 2)
+    assert (compositor._road_layers.misses, compositor._road_layers.hits) == (1, 2)
+    assert sign_raster_cache.requested == ['G4511', 'S21'], "标志只在绘制道路图层时取一次"
+    assert len(compositor._base_layers) == 1
+    assert frames[0].size == create_pic.image_size
+    # 道路编号标志在各帧中的位置相同
+    sign_y = create_pic.road_xy[1] - create_pic.road_sign_height // 2
+    for frame in frames:
+        assert frame.getpixel((create_pic.road_xy[0] + 10, sign_y + 10)) == (181, 39, 60, 255)
+        assert frame.getpixel((create_pic.road_xy[0] + 320 + create_pic.road_sign_space + 10, sign_y + 10)) == (181, 39, 60, 255)
+    # 标志变化时重新绘制道路图层
+    compositor.compose('湖北省 武汉市', 'Wuhan, Hubei', ['G4511', '川S21'], '珞喻路', 'Luoyu Rd', None, None, None,
+                       None, None, None, None)
+    assert (compositor._road_layers.misses, compositor._road_layers.hits) == (2, 2)
+
+
+def test_composed_frame_matches_direct_drawing():
+    """测试合成的帧与直接在空白帧上绘制各元素的结果相同"""
+    compositor = FrameCompositor()
+    frame = compositor.compose('湖北省 武汉市', 'Wuhan, Hubei', None, '珞喻路', None, None, None, None, None, None, 52.5, None)
+    expected = Image.new(mode='RGBA', size=create_pic.image_size)
+    draw_table = ImageDraw.Draw(im=expected)
+    draw_table.text(xy=create_pic.area_chinese_xy, text='湖北省 武汉市', fill=create_pic.font_color, font=create_pic.big_font)
+    draw_table.text(xy=create_pic.area_english_xy, text='Wuhan, Hubei', fill=create_pic.font_color, font=create_pic.small_font)
+    draw_table.text(xy=(create_pic.road_xy[0], create_pic.road_chinese_y), text='珞喻路', fill=create_pic.font_color,
+                    font=create_pic.big_font)
+    altitude_width = draw_table.textlength(text='52.5', font=create_pic.big_eng_font)
+    draw_table.text(xy=(create_pic.altitude_xy[0] - altitude_width, create_pic.altitude_xy[1]), text='52.5',
+                    fill=create_pic.font_color, font=create_pic.big_eng_font)
+    unit_width = draw_table.textlength(text='m', font=create_pic.small_font)
+    draw_table.text(xy=(create_pic.altitude_unit_xy[0] - unit_width, create_pic.altitude_unit_xy[1]), text='m',
+                    fill=create_pic.font_color, font=create_pic.small_font)
+    frame_array, expected_array = np.asarray(frame), np.asarray(expected)
+    assert np.array_equal(frame_array[..., 3], expected_array[..., 3])
+    visible = expected_array[..., 3] > 0
+    assert np.array_equal(frame_array[visible], expected_array[visible])
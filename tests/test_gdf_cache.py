@@ -0,0 +1,81 @@
+"""测试行政区划 GeoJSON 二进制缓存的 pytest 用例"""
+
+import os
+
+import geopandas as gpd
+from shapely import box
+
+from src.gpxutil.utils.geocoding.gdf import gdf_cache, gdf_handler
+from src.gpxutil.utils.geocoding.gdf.gdf_cache import AREA_GDF_CACHE_FILENAME, build_manifest
+from src.gpxutil.utils.geocoding.gdf.gdf_handler import load_area_gdf_list
+
+
+def _write_sample_geojson_dir(path):
+    for n in range(2):
+        gdf = gpd.GeoDataFrame({
+            'id': [f'{n}{i:04d}' for i in range(3)],
+            'name': [f'区{n}-{i}' for i in range(3)],
+            'level': [3, 3, 3],
+            'geometry': [box(n * 10 + i, 0, n * 10 + i + 1, 1) for i in range(3)],
+        }, crs='EPSG:4326')
+        gdf.to_file(path / f'{n}.json', driver='GeoJSON')
+    (path / 'readme.txt').write_text('not geojson', encoding='utf-8')
+
+
+def _assert_same(actual, expected):
+    assert len(actual) == len(expected)
+    for actual_gdf, expected_gdf in zip(actual, expected):
+        assert list(actual_gdf.columns) == list(expected_gdf.columns), "列应一致"
+        assert actual_gdf['id'].tolist() == expected_gdf['id'].tolist(), "代码应保持为字符串"
+        assert actual_gdf['name'].tolist() == expected_gdf['name'].tolist()
+        assert actual_gdf['level'].tolist() == expected_gdf['level'].tolist()
+        assert actual_gdf.geometry.geom_equals_exact(expected_gdf.geometry, 0).all(), "多边形应一致"
+        assert actual_gdf.crs == expected_gdf.crs
+
+
+def test_load_area_gdf_list_uses_cache(tmp_path, monkeypatch):
+    """测试首次加载生成缓存，再次加载读取缓存且结果一致"""
+    _write_sample_geojson_dir(tmp_path)
+    expected = load_area_gdf_list(str(tmp_path), use_cache=False)
+    first = load_area_gdf_list(str(tmp_path))
+    assert os.path.exists(tmp_path / AREA_GDF_CACHE_FILENAME), "首次加载应生成缓存"
+    _assert_same(first, expected)
+
+    # 缓存有效时不应再解析 GeoJSON
+    def fail_read_file(*args, **kwargs):
+        raise AssertionError('GeoJSON should not be parsed')
+
+    monkeypatch.setattr(gdf_handler.gpd, 'read_file', fail_read_file)
+    cached = load_area_gdf_list(str(tmp_path))
+    _assert_same(cached, expected)
+    assert cached.area_index.find(box(0.2, 0.2, 0.3, 0.3).centroid) == '00000', "缓存读出的数据应能建立索引"
+
+
+def test_area_gdf_cache_invalidated_by_change(tmp_path):
+    """测试源文件变化后缓存失效"""
+    _write_sample_geojson_dir(tmp_path)
+    load_area_gdf_list(str(tmp_path))
+    gdf = gpd.GeoDataFrame({'id': ['90000'], 'name': ['新区'], 'level': [3], 'geometry': [box(50, 0, 51, 1)]},
+                           crs='EPSG:4326')
+    gdf.to_file(tmp_path / '9.json', driver='GeoJSON')
+    reloaded = load_area_gdf_list(str(tmp_path))
+    assert len(reloaded) == 3, "新增的文件应被加载"
+    assert sorted(gdf['id'][0] for gdf in reloaded) == ['00000', '10000', '90000']
+
+
+def test_area_gdf_cache_ignores_listing_order(tmp_path, monkeypatch):
+    """测试目录列出的顺序不同时，清单与加载顺序不变，缓存仍有效"""
+    _write_sample_geojson_dir(tmp_path)
+    listdir = os.listdir
+    monkeypatch.setattr(gdf_cache.os, 'listdir', lambda path: sorted(listdir(path)))
+    first = load_area_gdf_list(str(tmp_path))
+    manifest = build_manifest(str(tmp_path))
+    monkeypatch.setattr(gdf_cache.os, 'listdir', lambda path: sorted(listdir(path), reverse=True))
+    assert build_manifest(str(tmp_path)) == manifest
+    assert [gdf['id'][0] for gdf in load_area_gdf_list(str(tmp_path), use_cache=False)] == [gdf['id'][0] for gdf in first]
+
+    def fail_read_file(*args, **kwargs):
+        raise AssertionError('GeoJSON should not be parsed')
+
+    monkeypatch.setattr(gdf_handler.gpd, 'read_file', fail_read_file)
+    load_area_gdf_list(str(tmp_path))
@@ -0,0 +1,105 @@
+"""测试逆地理编码本地缓存的 pytest 用例"""
+
+import time
+
+from src.gpxutil.utils.geocoding import cache as cache_module
+from src.gpxutil.utils.geocoding.cache import GeocodingCache, LRUCache, cached_point_info
+
+POINT_INFO = {'province': '湖北省', 'city': '武汉市', 'area': '洪山区', 'memo': ''}
+
+
+def test_geocoding_cache_get_put(tmp_path):
+    """测试量化后的同一格共用结果，并统计命中与未命中"""
+    cache = GeocodingCache(str(tmp_path / 'cache.sqlite'), precision=4)
+    assert cache.get('baidu', 'zh-CN', 30.5, 114.3) is None
+    cache.put('baidu', 'zh-CN', 30.50001, 114.30002, POINT_INFO)
+    assert cache.get('baidu', 'zh-CN', 30.50003, 114.29998) == POINT_INFO, "同一格内的点应共用结果"
+    assert cache.get('baidu', 'en', 30.5, 114.3) is None, "语言不同不应命中"
+    assert cache.get('amap', 'zh-CN', 30.5, 114.3) is None, "来源不同不应命中"
+    assert cache.get('baidu', 'zh-CN', 30.5010, 114.3) is None, "不同格不应命中"
+    assert (cache.hits, cache.misses) == (1, 4)
+    cache.close()
+
+    reopened = GeocodingCache(str(tmp_path / 'cache.sqlite'), precision=4)
+    assert reopened.get('baidu', 'zh-CN', 30.5, 114.3) == POINT_INFO, "结果应持久化"
+
+
+def test_geocoding_cache_ttl_and_lru(tmp_path, monkeypatch):
+    """测试过期的结果不再命中，超出条数上限时淘汰最久未使用的"""
+    now = [1000000.0]
+    monkeypatch.setattr(cache_module.time, 'time', lambda: now[0])
+    cache = GeocodingCache(':memory:', precision=2, ttl_days=3, max_entries=2)
+    cache.put('nominatim', '', 1, 1, POINT_INFO)
+    cache.put('nominatim', '', 2, 2, POINT_INFO)
+    # 最近使用时间按天更新
+    now[0] += cache_module.GEOCODING_CACHE_TOUCH_INTERVAL + 10
+    assert cache.get('nominatim', '', 1, 1) is not None
+    cache.put('nominatim', '', 3, 3, POINT_INFO)
+    cache.evict()
+    assert len(cache) == 2
+    assert cache.get('nominatim', '', 2, 2) is None, "最久未使用的应被淘汰"
+    assert cache.get('nominatim', '', 1, 1) is not None
+
+    now[0] += 2 * 24 * 3600
+    assert cache.get('nominatim', '', 1, 1) is None, "过期的结果不应命中"
+
+
+def test_geocoding_cache_batched_commit(tmp_path, monkeypatch):
+    """测试写入按间隔提交，flush、close 时提交其余的；一天内重复读取不更新最近使用时间"""
+    monkeypatch.setattr(cache_module, 'GEOCODING_CACHE_COMMIT_INTERVAL', 3)
+    path = str(tmp_path / 'cache.sqlite')
+    cache = GeocodingCache(path)
+    reader = GeocodingCache(path)
+    cache.put('baidu', 'zh-CN', 1, 1, POINT_INFO)
+    cache.put('baidu', 'zh-CN', 2, 2, POINT_INFO)
+    assert reader.get('baidu', 'zh-CN', 1, 1) is None, "未到提交间隔时不应提交"
+    cache.put('baidu', 'zh-CN', 3, 3, POINT_INFO)
+    assert reader.get('baidu', 'zh-CN', 1, 1) == POINT_INFO
+    cache.put('baidu', 'zh-CN', 4, 4, POINT_INFO)
+    for _ in range(5):
+        assert cache.get('baidu', 'zh-CN', 1, 1) == POINT_INFO
+    assert reader.get('baidu', 'zh-CN', 4, 4) is None, "读取不应产生写入"
+    cache.flush()
+    assert reader.get('baidu', 'zh-CN', 4, 4) == POINT_INFO
+    cache.put('baidu', 'zh-CN', 5, 5, POINT_INFO)
+    cache.close()
+    assert reader.get('baidu', 'zh-CN', 5, 5) == POINT_INFO, "关闭时应提交"
+
+
+def test_cached_point_info(no_geocoding_cache):
+    """测试装饰器只在未命中时调用 API，且不缓存出错的结果"""
+    no_geocoding_cache.cache = GeocodingCache(':memory:')
+    calls = []
+
+    @cached_point_info('test', language=lambda lang='zh-CN', **_: lang)
+    def get_point_info(lat, lon, lang='zh-CN'):
+        calls.append((lat, lon, lang))
+        return POINT_INFO if lat > 0 else {'province': '', 'city': '', 'area': '', 'memo': 'error'}
+
+    assert get_point_info(30.5, 114.3) == POINT_INFO
+    assert get_point_info(30.5, 114.3) == POINT_INFO
+    get_point_info(30.5, 114.3, lang='en')
+    assert len(calls) == 2, "命中缓存时不应再调用"
+    get_point_info(-1, 114.3)
+    get_point_info(-1, 114.3)
+    assert len(calls) == 4, "出错的结果不应缓存"
+
+
+def test_lru_cache_eviction_and_store(tmp_path):
+    """测试 LRUCache 超出容量时淘汰最久未使用的，内存中淘汰的键仍可从 store 中读出"""
+    store = GeocodingCache(str(tmp_path / 'cache.sqlite'))
+    cache = LRUCache('test', maxsize=2, store=store)
+    cache.put(1, {'ref': 'G1'})
+    cache.put(2, {'ref': 'G2'})
+    assert cache.get(1) == {'ref': 'G1'}
+    cache.put(('a', 3), {'ref': 'G3'})
+    assert len(cache) == 2
+    assert 2 not in cache._data, "最久未使用的应被淘汰"
+    assert cache.get(2) == {'ref': 'G2'}, "淘汰后仍可从 store 中读出"
+    assert cache.get(4) is None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    memory_only = LRUCache('test', maxsize=1)
+    memory_only.put(1, 'a')
+    memory_only.put(2, 'b')
+    assert memory_only.get(1) is None
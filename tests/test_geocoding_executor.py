@@ -0,0 +1,181 @@
+"""测试并发逆地理编码的 pytest 用例，API 由本地的 HTTP 服务模拟"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.gpxutil.models.route import Route, RoutePoint
+from src.gpxutil.utils.geocoding import cache as cache_module
+from src.gpxutil.utils.geocoding.cache import GeocodingCache
+from src.gpxutil.utils.geocoding.executor import geocode_points, geocode_route
+from src.gpxutil.utils.geocoding.journal import GeocodingJournal
+from src.gpxutil.utils.geocoding.rate_limit import TokenBucket
+
+
+class _StubNominatim:
+    """模拟 Nominatim 的 /reverse：按纬度的整数部分返回不同的区，每次请求耗时 delay 秒，并记录最大并发数"""
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.request_count = 0
+        self.en_request_count = 0
+        self.lock = threading.Lock()
+        self.url = None
+
+    def respond(self, path, query):
+        with self.lock:
+            self.in_flight += 1
+            self.request_count += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        lat = float(query['lat'][0])
+        suffix = ' EN' if query['accept-language'][0] == 'en' else ''
+        with self.lock:
+            if suffix:
+                self.en_request_count += 1
+            self.in_flight -= 1
+        return {'features': [{'properties': {'geocoding': {
+            'osm_type': 'node',
+            'admin': {'level4': '省' + suffix, 'level5': '市' + suffix, 'level6': f'区{int(lat)}' + suffix},
+        }}}]}
+
+
+@pytest.fixture
+def nominatim_stub(stub_http_server, no_geocoding_cache):
+    """启动模拟的 Nominatim：nominatim_stub(delay)，不读写本地缓存，每次都请求模拟的 API"""
+
+    def start(delay: float = 0.02) -> _StubNominatim:
+        stub = _StubNominatim(delay)
+        stub.url = stub_http_server(stub.respond)
+        return stub
+
+    return start
+
+
+def test_geocode_points_concurrent_in_order(nominatim_stub):
+    """测试请求并发进行、不超过并发上限，结果按输入顺序返回"""
+    latitude = np.arange(40) * 0.5
+    longitude = np.full(40, 114.0)
+    stub = nominatim_stub()
+    results = geocode_points('nominatim', latitude, longitude, nominatim_url=stub.url, concurrency=4)
+    assert [result['area'] for result in results] == [f'区{int(lat)}' for lat in latitude]
+    assert results[3]['area_en'] == '区1 EN'
+    assert stub.request_count == 80, "每个点请求中英文各一次"
+    assert 1 < stub.max_in_flight <= 4, "应有多个请求同时进行，且不超过并发上限"
+
+
+def test_route_set_area_api(nominatim_stub):
+    """测试 Route.set_area 通过 API 填写，只请求未填写的点"""
+    points = [RoutePoint(index=i, longitude=114.0, latitude=i * 1.0) for i in range(5)]
+    points[2].province, points[2].city, points[2].area = '旧省', '旧市', '旧区'
+    route = Route(points=points)
+    stub = nominatim_stub(delay=0)
+    route.set_area(source='nominatim', nominatim_url=stub.url)
+    assert route.columns.categoricals['area'].to_list() == ['区0', '区1', '旧区', '区3', '区4']
+    assert stub.request_count == 8
+
+
+def test_geocode_route_sampled(nominatim_stub):
+    """测试按距离、时间间隔取点请求，结果与逐点请求一致，请求次数减少一个数量级"""
+    size = 2000
+    # 每秒 30 米，每 200 个点进入下一个区
+    latitude = np.arange(size) * 0.005
+    longitude = np.full(size, 114.0)
+    distance = np.arange(size) * 30.0
+    elapsed_time = np.arange(size, dtype=np.float64)
+    stub = nominatim_stub(delay=0)
+    results = geocode_route('nominatim', latitude, longitude, distance, elapsed_time,
+                            sample_distance=500, sample_time=30, nominatim_url=stub.url)
+    assert [result['area'] for result in results] == [f'区{int(lat)}' for lat in latitude], "变化处应与逐点请求一致"
+    assert stub.request_count * 10 < size * 2, "请求次数应减少一个数量级"
+
+
+def test_geocode_route_en_on_change(nominatim_stub):
+    """测试只在中文结果变化处获取英文名，英文名沿用到下一次变化，与逐点获取中英文的结果一致"""
+    size = 300
+    # 每 50 个点进入下一个区
+    latitude = np.arange(size) * 0.02
+    longitude = np.full(size, 114.0)
+    distance = np.arange(size) * 30.0
+    elapsed_time = np.arange(size, dtype=np.float64)
+    stub = nominatim_stub(delay=0)
+    results = geocode_route('nominatim', latitude, longitude, distance, elapsed_time,
+                            sample_distance=0, sample_time=0, en_on_change=True, nominatim_url=stub.url)
+    assert stub.en_request_count == 6, "每个区只请求一次英文名"
+    assert stub.request_count == size + 6
+    expected = geocode_route('nominatim', latitude, longitude, distance, elapsed_time,
+                             sample_distance=0, sample_time=0, en_on_change=False, nominatim_url=stub.url)
+    assert results == expected
+    assert results[120]['area_en'] == '区2 EN'
+
+
+@pytest.mark.parametrize('en_on_change', [True, False])
+def test_geocode_route_cached(monkeypatch, nominatim_stub, no_geocoding_cache, en_on_change):
+    """测试中英文结果都写入本地缓存，第二次运行不再发出任何请求"""
+    no_geocoding_cache.cache = GeocodingCache(':memory:')
+    size = 100
+    latitude = np.arange(size) * 0.05
+    longitude = np.full(size, 114.0)
+    distance = np.arange(size) * 30.0
+    elapsed_time = np.arange(size, dtype=np.float64)
+    stub = nominatim_stub(delay=0)
+    kwargs = dict(sample_distance=0, sample_time=0, en_on_change=en_on_change, nominatim_url=stub.url)
+    first = geocode_route('nominatim', latitude, longitude, distance, elapsed_time, **kwargs)
+    first_count = stub.request_count
+    # 内存中的 LRU 也清空，只能从 SQLite 缓存中读取
+    monkeypatch.setattr(cache_module, '_lru_caches', {})
+    second = geocode_route('nominatim', latitude, longitude, distance, elapsed_time, **kwargs)
+    assert stub.request_count == first_count
+    assert first_count > 0
+    assert second == first
+    assert second[40]['area_en'] == '区2 EN'
+
+
+def test_geocode_route_resume_from_journal(tmp_path, nominatim_stub):
+    """测试中断后从 journal 继续：已完成的点不再请求，结果与一次完成的一致"""
+    size = 100
+    latitude = np.arange(size) * 0.05
+    longitude = np.full(size, 114.0)
+    distance = np.arange(size) * 30.0
+    elapsed_time = np.arange(size, dtype=np.float64)
+    indices = np.arange(size) + 1000
+    path = str(tmp_path / 'route.csv.journal')
+    stub = nominatim_stub(delay=0)
+    kwargs = dict(sample_distance=0, sample_time=0, en_on_change=True, nominatim_url=stub.url)
+    # 第一次运行只完成了前 60 个点
+    with GeocodingJournal(path, 'hash') as journal:
+        geocode_route('nominatim', latitude[:60], longitude[:60], distance[:60], elapsed_time[:60],
+                      indices=indices[:60], journal=journal, **kwargs)
+    first_count = stub.request_count
+    with GeocodingJournal(path, 'hash') as journal:
+        results = geocode_route('nominatim', latitude, longitude, distance, elapsed_time,
+                                indices=indices, journal=journal, **kwargs)
+    assert stub.request_count - first_count == 40 + 2, "只请求后 40 个点的中文和新出现的两个区的英文名"
+    expected = geocode_route('nominatim', latitude, longitude, distance, elapsed_time, **kwargs)
+    assert results == expected
+
+
+def test_token_bucket_rate():
+    """测试多线程共用的令牌桶按设定的频率放行"""
+    bucket = TokenBucket(50)
+    times = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(5):
+            bucket.acquire()
+            with lock:
+                times.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    times.sort()
+    # 20 个令牌，第一个立即取得，其余每 1/50 秒一个
+    assert times[-1] - times[0] >= 19 / 50 * 0.95
@@ -0,0 +1,47 @@
+"""测试逆地理编码断点记录（journal）的 pytest 用例"""
+
+from src.gpxutil.utils.geocoding.journal import GeocodingJournal, file_hash, job_hash
+
+
+def test_journal_resume(tmp_path):
+    """测试重新打开时读回已记录的结果，并忽略中断时写了一半的行"""
+    path = str(tmp_path / 'route.csv.journal')
+    with GeocodingJournal(path, 'hash-a') as journal:
+        journal.put('nominatim', 'zh', 0, {'area': '区0'})
+        journal.put('nominatim', 'zh', 5, {'area': '区5'})
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"source": "nominatim", "kind": "zh", "ind')
+    with GeocodingJournal(path, 'hash-a') as journal:
+        assert len(journal) == 2
+        assert journal.get('nominatim', 'zh', 5) == {'area': '区5'}
+        assert journal.get('nominatim', 'zh,en', 5) is None
+        journal.put('nominatim', 'zh', 6, {'area': '区6'})
+    with GeocodingJournal(path, 'hash-a') as journal:
+        assert len(journal) == 3, "写了一半的行应被截掉，之后追加的行仍可读回"
+
+
+def test_journal_other_input(tmp_path):
+    """测试输入文件的哈希不一致时清空重写"""
+    path = str(tmp_path / 'route.csv.journal')
+    input_path = tmp_path / 'route.gpx'
+    input_path.write_text('<gpx></gpx>', encoding='utf-8')
+    with GeocodingJournal(path, file_hash(str(input_path))) as journal:
+        journal.put('baidu', 'zh', 0, {'area': '区0'})
+    input_path.write_text('<gpx> </gpx>', encoding='utf-8')
+    with GeocodingJournal(path, file_hash(str(input_path))) as journal:
+        assert len(journal) == 0
+    journal.remove()
+    assert not (tmp_path / 'route.csv.journal').exists()
+
+
+def test_journal_other_settings(tmp_path):
+    """测试输入文件相同、设置（API 地址等）不同时清空重写，设置的顺序不影响哈希"""
+    path = str(tmp_path / 'route.csv.journal')
+    settings = {'source': 'nominatim', 'nominatim_url': 'http://a', 'map_api_ak': None, 'baidu_get_en_result': True}
+    assert job_hash('hash', settings) == job_hash('hash', dict(reversed(list(settings.items()))))
+    with GeocodingJournal(path, job_hash('hash', settings)) as journal:
+        journal.put('nominatim', 'zh', 0, {'area': '区0'})
+    with GeocodingJournal(path, job_hash('hash', settings)) as journal:
+        assert len(journal) == 1
+    with GeocodingJournal(path, job_hash('hash', {**settings, 'nominatim_url': 'http://b'})) as journal:
+        assert len(journal) == 0
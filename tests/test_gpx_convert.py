@@ -0,0 +1,58 @@
+"""测试流式转换 GPX 坐标的 pytest 用例"""
+
+import io
+import re
+
+import pytest
+
+from src.gpxutil.utils.gpx_convert import convert_gpx, convert_gpx_stream, convert_single_point
+
+SAMPLE_GPX = '''<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<!-- comment -->
+<gpx version="1.1" creator="a &amp; b" xmlns="http://www.topografix.com/GPX/1/1" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:schemaLocation="a b">
+  <metadata><name>名称 &lt;x&gt; "q"</name><desc>x<![CDATA[<cdata>]]>y</desc><keywords></keywords></metadata>
+  <wpt lat="30.0" lon="114.0"><name>w</name></wpt>
+  <trk><trkseg>
+    <trkpt lat="30.1" lon="114.2" ><ele>1</ele></trkpt>
+    <trkpt lon="114.3" lat="30.2"/>
+    <trkpt lat="30.3" lon="114.4"><?pi data?></trkpt>
+  </trkseg></trk>
+</gpx>
+'''.encode('utf-8')
+
+COORDINATE_PATTERN = re.compile(r' (lat|lon)="([^"]*)"')
+
+
+def _minidom_output(original_coordinate_type, transformed_coordinate_type):
+    dom_tree = convert_gpx(io.BytesIO(SAMPLE_GPX), original_coordinate_type, transformed_coordinate_type)
+    out = io.StringIO()
+    dom_tree.writexml(out, encoding='utf-8')
+    return out.getvalue()
+
+
+def _stream_output(original_coordinate_type, transformed_coordinate_type, **kwargs):
+    out = io.StringIO()
+    convert_gpx_stream(io.BytesIO(SAMPLE_GPX), out, original_coordinate_type, transformed_coordinate_type, **kwargs)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize('original_coordinate_type, transformed_coordinate_type', [
+    ('wgs84', 'gcj02'), ('gcj02', 'bd09'), ('wgs84', 'wgs84'),
+])
+def test_convert_gpx_stream_matches_minidom(original_coordinate_type, transformed_coordinate_type):
+    """测试流式转换的输出与 minidom 的输出一致（坐标值除外）"""
+    expected = _minidom_output(original_coordinate_type, transformed_coordinate_type)
+    actual = _stream_output(original_coordinate_type, transformed_coordinate_type, batch_size=2)
+    assert COORDINATE_PATTERN.sub('', actual) == COORDINATE_PATTERN.sub('', expected), "除坐标外应逐字节一致"
+    expected_values = [float(value) for _, value in COORDINATE_PATTERN.findall(expected)]
+    actual_values = [float(value) for _, value in COORDINATE_PATTERN.findall(actual)]
+    assert actual_values == pytest.approx(expected_values, abs=1e-12), "坐标值应一致"
+
+
+def test_convert_gpx_stream_point_tags():
+    """测试可以同时转换 wpt 的坐标"""
+    actual = _stream_output('wgs84', 'gcj02', point_tags=('trkpt', 'wpt'))
+    lng, lat = convert_single_point(114.0, 30.0, 'wgs84', 'gcj02')
+    wpt = re.search(r'<wpt lat="([^"]*)" lon="([^"]*)"', actual)
+    assert float(wpt.group(1)) == pytest.approx(lat, abs=1e-12), "wpt 的纬度应被转换"
+    assert float(wpt.group(2)) == pytest.approx(lng, abs=1e-12), "wpt 的经度应被转换"
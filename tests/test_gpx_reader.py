@@ -0,0 +1,68 @@
+"""测试流式 GPX 读取的 pytest 用例"""
+
+from datetime import datetime, timedelta, timezone
+
+import gpxpy
+import gpxpy.gpx
+import numpy as np
+import pytest
+
+from src.gpxutil.utils.gpx_reader import TrackPointBatch, iter_track_point_batches, read_track_points
+
+
+def _write_sample_gpx(path):
+    """生成两个 track 的 GPX 文件，第一个 track 有两个 segment"""
+    gpx = gpxpy.gpx.GPX()
+    start = datetime(2023, 1, 1, 10, 0, 0, tzinfo=timezone.utc)
+    for track_no in range(2):
+        track = gpxpy.gpx.GPXTrack()
+        gpx.tracks.append(track)
+        for segment_no in range(2 - track_no):
+            segment = gpxpy.gpx.GPXTrackSegment()
+            track.segments.append(segment)
+            for i in range(10):
+                point = gpxpy.gpx.GPXTrackPoint(
+                    39.9 + track_no + segment_no * 0.1 + i * 1e-4, 116.4 + i * 1e-4,
+                    elevation=50.0 + i if i % 3 else None,
+                    time=start + timedelta(seconds=i) if i != 5 else None,
+                )
+                if i == 4:
+                    point.course = 90.0
+                segment.points.append(point)
+    # GPX 1.0 才会写出 course
+    path.write_text(gpx.to_xml('1.0'), encoding='utf-8')
+
+
+@pytest.mark.parametrize('track_index, segment_index', [(0, 0), (0, 1), (1, 0)])
+def test_read_track_points_matches_gpxpy(tmp_path, track_index, segment_index):
+    """测试流式读取结果与 gpxpy 解析结果一致"""
+    gpx_path = tmp_path / 'sample.gpx'
+    _write_sample_gpx(gpx_path)
+    with open(gpx_path, 'r', encoding='utf-8') as gpx_file:
+        gpx = gpxpy.parse(gpx_file)
+    expected = TrackPointBatch.from_gpx_points(gpx.tracks[track_index].segments[segment_index].points)
+    actual = read_track_points(str(gpx_path), track_index, segment_index)
+    assert len(actual) == len(expected), "点数应一致"
+    np.testing.assert_array_equal(actual.latitude, expected.latitude)
+    np.testing.assert_array_equal(actual.longitude, expected.longitude)
+    np.testing.assert_array_equal(actual.elevation, expected.elevation)
+    np.testing.assert_array_equal(actual.course, expected.course)
+    np.testing.assert_array_equal(actual.time, expected.time)
+    assert actual.time_tz is not None, "应记录时间的时区"
+
+
+def test_iter_track_point_batches_splits_batches(tmp_path):
+    """测试按批产出，且拼接后不丢点"""
+    gpx_path = tmp_path / 'sample.gpx'
+    _write_sample_gpx(gpx_path)
+    batches = list(iter_track_point_batches(str(gpx_path), batch_size=4))
+    assert [len(batch) for batch in batches] == [4, 4, 2], "应按批大小切分"
+    assert len(TrackPointBatch.concatenate(batches)) == 10, "拼接后应得到全部点"
+
+
+def test_read_track_points_missing_segment(tmp_path):
+    """测试指定的 segment 不存在时报错"""
+    gpx_path = tmp_path / 'sample.gpx'
+    _write_sample_gpx(gpx_path)
+    with pytest.raises(IndexError):
+        read_track_points(str(gpx_path), 1, 1)
@@ -0,0 +1,41 @@
+"""测试逆地理编码共用 HTTP 连接池的 pytest 用例"""
+
+from http.server import BaseHTTPRequestHandler
+
+from src.gpxutil.utils.geocoding import http_client
+from src.gpxutil.utils.geocoding.http_client import HttpClientHandler
+
+
+def test_http_client_reuses_connection(stub_http_server):
+    """测试同一域名的多次请求复用一个连接，不同域名使用不同的 Session"""
+    connections = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            connections.append(self.client_address)
+
+        def do_GET(self):
+            body = b'{"ok": true}'
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    url = stub_http_server(Handler)
+    try:
+        for path in ('/reverse', '/reverse', '/details'):
+            assert http_client.get(url + path, params={'lat': 30}).json() == {'ok': True}
+        assert len(connections) == 1, "同一域名的请求应复用连接"
+        handler = HttpClientHandler()
+        assert handler.session(url + '/a') is handler.session(url + '/b')
+        assert handler.session(url) is not handler.session(url.replace('127.0.0.1', 'localhost'))
+    finally:
+        HttpClientHandler().close()
@@ -0,0 +1,62 @@
+"""测试百度、高德地图多密钥轮换与配额计数的 pytest 用例"""
+
+import pytest
+
+from src.gpxutil.core.config import CONFIG_HANDLER
+from src.gpxutil.models.config import AmapConfig, MapApiKeyConfig
+from src.gpxutil.models.exceptions import MapApiQuotaExceededException
+from src.gpxutil.utils.geocoding import key_pool
+from src.gpxutil.utils.geocoding.key_pool import ApiKey, KeyPool, KeyUsageStore, request_with_key_pool
+
+
+def test_weighted_round_robin():
+    """测试按 freq 加权平滑轮询：请求数与权重成正比，权重大的密钥也不会连续占用"""
+    pool = KeyPool('baidu', [ApiKey('baidu', 'a', 3000), ApiKey('baidu', 'b', 1000)], KeyUsageStore(None))
+    chosen = ''.join(pool.acquire().ak for _ in range(40))
+    assert chosen.count('a') == 30
+    assert 'aaaa' not in chosen
+
+
+def test_daily_limit_persisted(tmp_path):
+    """测试达到每日上限的密钥不再使用，用量保存后下次运行继续计数"""
+    path = str(tmp_path / 'usage.json')
+    pool = KeyPool('amap', [ApiKey('amap', 'secret-a', 3000, daily_limit=2), ApiKey('amap', 'secret-b', 1000)],
+                   KeyUsageStore(path))
+    chosen = [pool.acquire().ak for _ in range(6)]
+    assert chosen.count('secret-a') == 2
+    pool.usage.save()
+    with open(path, encoding='utf-8') as f:
+        assert 'secret' not in f.read(), "用量文件中不应保存密钥本身"
+    pool = KeyPool('amap', [ApiKey('amap', 'secret-a', 3000, daily_limit=3), ApiKey('amap', 'secret-b', 1000)],
+                   KeyUsageStore(path))
+    chosen = [pool.acquire().ak for _ in range(6)]
+    assert chosen.count('secret-a') == 1, "重新打开后应从已保存的用量继续计数"
+
+
+@pytest.fixture
+def amap_keys(monkeypatch):
+    """配置文件中配置高德的两个密钥，密钥池、用量从空开始"""
+    amap_config = AmapConfig(ak=None, freq=None, keys=[MapApiKeyConfig('a', 1000), MapApiKeyConfig('b', 1000)])
+    monkeypatch.setattr(CONFIG_HANDLER.config.area_info, 'amap', amap_config)
+    monkeypatch.setattr(key_pool, '_key_pools', {})
+    monkeypatch.setattr(key_pool, '_usage_store', KeyUsageStore(None))
+
+
+def test_rotate_on_quota_error(amap_keys):
+    """测试密钥返回配额错误时换另一个密钥重试，之后当天不再使用；所有密钥都用完时抛出异常"""
+    sent = []
+    out_of_quota = {'a'}
+
+    def send(key):
+        sent.append(key)
+        if key in out_of_quota:
+            return {'status': '0', 'info': 'DAILY_QUERY_OVER_LIMIT', 'infocode': '10003'}
+        return {'status': '1', 'info': 'OK', 'infocode': '10000'}
+
+    results = [request_with_key_pool('amap', send) for _ in range(5)]
+    assert all(result['infocode'] == '10000' for result in results)
+    assert sent.count('a') == 1 and sent.count('b') == 5
+    out_of_quota.add('b')
+    assert request_with_key_pool('amap', send)['infocode'] == '10003'
+    with pytest.raises(MapApiQuotaExceededException):
+        request_with_key_pool('amap', send)
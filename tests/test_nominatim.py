@@ -0,0 +1,64 @@
+"""测试 Nominatim 道路详情、英文名缓存与请求频率限制的 pytest 用例，API 由本地的 HTTP 服务模拟"""
+
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from src.gpxutil.utils.geocoding import cache as cache_module
+from src.gpxutil.utils.geocoding import nominatim
+
+
+@pytest.fixture
+def nominatim_stub(stub_http_server, no_geocoding_cache):
+    """模拟 Nominatim：纬度每一度是一条道路（place_id、osm_id 均为纬度的整数部分），记录各类请求的次数"""
+    counter = Counter()
+    lock = threading.Lock()
+
+    def respond(path, query):
+        if path == '/details':
+            with lock:
+                counter['details'] += 1
+            return {'names': {'name': f'路{query["place_id"][0]}', 'ref': f'G{query["place_id"][0]};S1'}}
+        en = query['accept-language'][0] == 'en'
+        with lock:
+            counter['reverse_en' if en else 'reverse'] += 1
+        road = int(float(query['lat'][0]))
+        return {'features': [{'properties': {'geocoding': {
+            'osm_type': 'way', 'osm_id': road, 'place_id': road,
+            'name': f'Road {road}' if en else f'路{road}',
+            'admin': {'level4': 'Hubei' if en else '湖北省', 'level6': f'Area {road // 2}' if en else f'区{road // 2}'},
+        }}}]}
+
+    return stub_http_server(respond), counter
+
+
+def test_get_point_info_dedupes_details_and_en(nominatim_stub):
+    """测试同一道路只请求一次 details 和英文结果，各点仍得到各自道路的名称与编号"""
+    host, counter = nominatim_stub
+    results = [nominatim.get_point_info.__wrapped__(i * 0.1, 114, host=host) for i in range(40)]
+    assert counter == {'reverse': 40, 'reverse_en': 4, 'details': 4}
+    assert results[15]['road_name'] == '路1'
+    assert results[15]['road_name_en'] == 'Road 1'
+    assert results[15]['road_num'] == 'G1,S1'
+    assert results[25]['area'] == '区1'
+    assert results[25]['area_en'] == 'Area 1'
+    details_cache = cache_module._lru_caches['nominatim_details']
+    assert (details_cache.hits, details_cache.misses) == (36, 4)
+
+
+def test_freq_limits_requests(nominatim_stub, monkeypatch):
+    """测试配置 freq 后，多个线程同时请求时仍按每秒请求数上限依次发出"""
+    host, counter = nominatim_stub
+    monkeypatch.setattr(nominatim.CONFIG_HANDLER.config.area_info.nominatim, 'freq', 40)
+    monkeypatch.setattr(nominatim, '_rate_limiter', None)
+    threads = [threading.Thread(target=nominatim.reverse, args=(i, 114), kwargs={'host': host}) for i in range(12)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter['reverse'] == 12
+    # 第一个令牌立即取得，其余每 1/40 秒一个
+    assert time.monotonic() - start >= 11 / 40 * 0.95
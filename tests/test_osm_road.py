@@ -0,0 +1,87 @@
+"""测试离线道路数据导入与匹配的 pytest 用例"""
+
+import json
+
+import numpy as np
+import pytest
+
+from src.gpxutil.models.route import Route, RoutePoint
+from src.gpxutil.utils.geocoding.road.road_index import RoadIndex
+from src.gpxutil.utils.geocoding.road.road_store import import_roads, read_road_store
+
+
+def _write_sample_road_geojson(path):
+    """在 (114, 30) 处十字交叉的两条道路，外加一条分为两段的道路和一条没有名称、编号的道路"""
+    features = [
+        {'type': 'Feature', 'properties': {'name': '一号路', 'ref': 'G1;S2'},
+         'geometry': {'type': 'LineString', 'coordinates': [[114.0, 29.99], [114.0, 30.0], [114.0, 30.01]]}},
+        {'type': 'Feature', 'properties': {'name': '二号路', 'name:en': 'Second Road'},
+         'geometry': {'type': 'LineString', 'coordinates': [[113.99, 30.0], [114.01, 30.0]]}},
+        {'type': 'Feature', 'properties': {'name': '三号路'},
+         'geometry': {'type': 'MultiLineString', 'coordinates': [[[114.1, 30.0], [114.1, 30.01]], [[114.2, 30.0], [114.2, 30.01]]]}},
+        {'type': 'Feature', 'properties': {'highway': 'service'},
+         'geometry': {'type': 'LineString', 'coordinates': [[114.0, 30.002], [114.001, 30.002]]}},
+        {'type': 'Feature', 'properties': {'name': '广场'},
+         'geometry': {'type': 'Point', 'coordinates': [114.0, 30.0]}},
+    ]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'type': 'FeatureCollection', 'features': features}, f, ensure_ascii=False)
+
+
+@pytest.fixture
+def road_index(tmp_path):
+    source_path = tmp_path / 'roads.geojson'
+    _write_sample_road_geojson(source_path)
+    import_roads(str(source_path), str(tmp_path / 'roads.npz'))
+    return RoadIndex(read_road_store(str(tmp_path / 'roads.npz')))
+
+
+def test_import_roads(tmp_path):
+    """测试导入只保留有名称或编号的线状道路，存储文件读回后内容不变"""
+    source_path = tmp_path / 'roads.geojson'
+    _write_sample_road_geojson(source_path)
+    network = import_roads(str(source_path), str(tmp_path / 'roads.npz'))
+    assert network.names.tolist() == ['一号路', '二号路', '三号路', '三号路']
+    assert len(network) == 5
+    stored = read_road_store(str(tmp_path / 'roads.npz'))
+    assert np.array_equal(stored.segments, network.segments)
+    assert np.array_equal(stored.segment_way, network.segment_way)
+    assert stored.names_en.tolist() == ['', 'Second Road', '', '']
+    assert stored.refs.tolist() == ['G1;S2', '', '', '']
+
+
+def test_match_nearest_road(road_index):
+    """测试取距离阈值内最近的道路，超出阈值的点没有道路"""
+    ways = road_index.match_many(
+        np.array([114.0001, 114.005, 114.2001, 114.005]), np.array([30.005, 30.0001, 30.005, 30.005]),
+        max_distance=30,
+    )
+    assert ways.tolist() == [0, 1, 3, -1]
+    assert road_index.road_info(ways[0]) == {'road_name': '一号路', 'road_name_en': None, 'road_num': 'G1,S2'}
+    assert road_index.road_info(ways[1]) == {'road_name': '二号路', 'road_name_en': 'Second Road', 'road_num': None}
+    assert road_index.road_info(ways[3]) == {'road_name': None, 'road_name_en': None, 'road_num': None}
+
+
+def test_match_by_heading_at_crossing(road_index):
+    """测试交叉口处按行进方向选择道路，方向不分正反；没有方向时取最近的道路"""
+    longitude = np.full(5, 114.00002)
+    latitude = np.full(5, 30.00003)
+    course = np.array([0.0, 90.0, 180.0, 270.0, np.nan])
+    ways = road_index.match_many(longitude, latitude, course, max_distance=30, heading_tolerance=45)
+    assert ways.tolist() == [0, 1, 0, 1, 0]
+    # 方向与两条道路都不相符时没有道路
+    ways = road_index.match_many(longitude[:1], latitude[:1], np.array([45.0]), max_distance=30, heading_tolerance=30)
+    assert ways.tolist() == [-1]
+
+
+def test_route_set_road(road_index):
+    """测试 Route.set_road 填写各点的道路，不覆盖已有的道路名称"""
+    points = [RoutePoint(index=i, longitude=114.0001, latitude=29.995 + i * 0.001, course=0.0, distance=i * 111.0)
+              for i in range(10)]
+    points[3].road_name = '已有道路'
+    points.append(RoutePoint(index=10, longitude=114.005, latitude=30.005, course=0.0, distance=2000.0))
+    route = Route(points=points)
+    route.set_road(road_index=road_index, max_distance=30, heading_tolerance=45)
+    assert route.points[0].road_name == '一号路' and route.points[0].road_num == 'G1,S2'
+    assert route.points[3].road_name == '已有道路'
+    assert route.points[10].road_name is None
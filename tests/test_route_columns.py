@@ -0,0 +1,72 @@
+"""测试 Route 列式存储的 pytest 用例"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+
+from src.gpxutil.models.route import Route, RoutePoint, RoutePointView
+from src.gpxutil.models.route_columns import CategoricalColumn, RouteColumns
+
+
+def _sample_points():
+    return [
+        RoutePoint(
+            index=i,
+            time=datetime(2023, 1, 1, 10, 0, i, tzinfo=timezone.utc),
+            elapsed_time=float(i),
+            longitude=116.4074 + i * 1e-4,
+            latitude=39.9042 + i * 1e-4,
+            elevation=50.0 if i != 1 else None,
+            distance=i * 10.0,
+            course=45.0,
+            speed=10.0,
+            province='北京市',
+            city='北京市',
+            area='东城区' if i < 2 else '西城区',
+        )
+        for i in range(3)
+    ]
+
+
+def test_categorical_column_encoding():
+    """测试字符串列的字典编码"""
+    column = CategoricalColumn.from_values(['a', 'a', None, 'b', 'a'])
+    assert column.categories == ['a', 'b'], "相同的字符串只应存一份"
+    assert column.codes.tolist() == [0, 0, -1, 1, 0], "None 应编码为 -1"
+    assert column.to_list() == ['a', 'a', None, 'b', 'a'], "解码结果应与原值一致"
+
+    column.fill(np.array([0, 1]), 'c')
+    assert column.to_list() == ['c', 'c', None, 'b', 'a'], "批量写入后应得到新值"
+
+
+def test_route_points_are_views():
+    """测试 Route.points 读写的是列数据"""
+    route = Route(points=_sample_points())
+    assert len(route.points) == 3, "应该有三个点"
+    point = route.points[1]
+    assert isinstance(point, RoutePointView) and isinstance(point, RoutePoint), "应返回 RoutePoint 的视图"
+    assert point.elevation is None, "空值应读为 None"
+    assert route.points[-1].area == '西城区', "应支持负数下标"
+
+    point.road_name = '长安街'
+    assert route.columns.categoricals['road_name'][1] == '长安街', "写入视图应写入列"
+    assert route.points[1].road_name == '长安街', "重新读取应得到写入的值"
+    assert route.points[0].road_name is None, "其他点不应受影响"
+
+
+def test_route_columns_round_trip():
+    """测试点数据存入列后读出不变"""
+    points = _sample_points()
+    route = Route(points=points)
+    assert list(route.iter_points()) == points, "读出的点应与存入的一致"
+    assert [point.to_point() for point in route.points] == points, "视图复制出的点应与存入的一致"
+    assert route.points[0].time == points[0].time, "时间应保留时区"
+
+
+def test_route_columns_take():
+    """测试按行取出子集"""
+    columns = RouteColumns.from_records(_sample_points())
+    subset = columns.take(np.array([0, 2]))
+    assert len(subset) == 2, "应取出两行"
+    assert subset.get('area', 1) == '西城区', "取出的行应保持原值"
+    assert subset.get('elevation', 1) == 50.0, "取出的行应保持原值"
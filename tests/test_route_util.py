@@ -0,0 +1,117 @@
+"""测试 route_util 中批量计算函数的 pytest 用例"""
+
+from datetime import datetime, timedelta, timezone
+
+import gpxpy.gpx
+import numpy as np
+
+from src.gpxutil.utils.route_util import bisect_fill, calculate_bearing, calculate_kinematics, heading_runs, sample_anchors
+
+
+def _sample_gpx_points():
+    start = datetime(2023, 1, 1, 10, 0, 0, tzinfo=timezone.utc)
+    points = [
+        gpxpy.gpx.GPXTrackPoint(39.9042, 116.4074, elevation=50.0, time=start),
+        gpxpy.gpx.GPXTrackPoint(39.9052, 116.4084, elevation=55.0, time=start + timedelta(seconds=1)),
+        # 与上一点时间相同，应跳过
+        gpxpy.gpx.GPXTrackPoint(39.9062, 116.4094, elevation=55.0, time=start + timedelta(seconds=1)),
+        # 位置不变，方位角为 0，应沿用上一个方向
+        gpxpy.gpx.GPXTrackPoint(39.9062, 116.4094, elevation=None, time=start + timedelta(seconds=2)),
+        # 带有 GPX 中记录的方向
+        gpxpy.gpx.GPXTrackPoint(39.9072, 116.4090, elevation=60.0, time=start + timedelta(seconds=3)),
+        # 相距较远，使用 haversine 距离
+        gpxpy.gpx.GPXTrackPoint(40.5072, 116.4090, elevation=60.0, time=start + timedelta(seconds=4)),
+    ]
+    points[4].course = 123.0
+    return points
+
+
+def _expected_kinematics(points):
+    """逐点计算，作为对照"""
+    ret = []
+    course = 0
+    total_distance = 0
+    for index, point in enumerate(points):
+        if index > 0:
+            prev_point = points[index - 1]
+            distance = point.distance_3d(prev_point)
+            if point.time_difference(prev_point) == 0:
+                continue
+            speed = distance / point.time_difference(prev_point)
+            if point.course:
+                course = point.course
+            else:
+                course_tmp = calculate_bearing(prev_point, point)
+                if course_tmp != 0:
+                    course = course_tmp
+            total_distance += distance
+        else:
+            speed = 0
+            course = 0
+        ret.append((index, point.time_difference(points[0]), total_distance, speed, course))
+    return ret
+
+
+def test_calculate_kinematics_matches_point_by_point():
+    """测试批量计算结果与逐点计算一致"""
+    points = _sample_gpx_points()
+    kinematics = calculate_kinematics(
+        np.array([point.latitude for point in points]),
+        np.array([point.longitude for point in points]),
+        np.array([point.elevation if point.elevation is not None else np.nan for point in points]),
+        np.array([np.datetime64(point.time.replace(tzinfo=None), 'us') for point in points]),
+        np.array([point.course if point.course is not None else np.nan for point in points]),
+    )
+    expected = _expected_kinematics(points)
+    rows = np.flatnonzero(kinematics.keep)
+    assert rows.tolist() == [item[0] for item in expected], "应跳过与上一点时间差为 0 的点"
+    np.testing.assert_allclose(kinematics.elapsed_time[rows], [item[1] for item in expected])
+    np.testing.assert_allclose(kinematics.distance[rows], [item[2] for item in expected])
+    np.testing.assert_allclose(kinematics.speed[rows], [item[3] for item in expected])
+    np.testing.assert_allclose(kinematics.course[rows], [item[4] for item in expected])
+
+
+def test_bisect_fill_finds_every_change():
+    """测试二分填写的结果与逐点求值一致，且求值次数远少于点数"""
+    # 四段取值，变化点不在锚点上
+    expected = np.repeat([3, -1, 7, 3], [1234, 17, 3000, 749])
+    probed = []
+
+    def probe(indices):
+        probed.extend(indices.tolist())
+        return expected[indices]
+
+    values, probe_count = bisect_fill(len(expected), 100, probe)
+    np.testing.assert_array_equal(values, expected)
+    assert probe_count == len(probed) == len(set(probed)), "每个点最多求值一次"
+    assert probe_count < len(expected) // 20, "求值次数应与变化次数相关，而不是点数"
+
+    values, probe_count = bisect_fill(len(expected), 1, lambda indices: expected[indices])
+    np.testing.assert_array_equal(values, expected)
+    assert probe_count == len(expected), "step 为 1 时逐点求值"
+
+
+def test_sample_anchors_distance_or_time():
+    """测试按距离或时间取锚点，先到者为准，NaN 不触发锚点"""
+    # 前 10 个点每秒走 50 米，之后每秒走 5 米（如堵车）
+    distance = np.concatenate([np.arange(10) * 50.0, 450 + np.arange(1, 31) * 5.0])
+    elapsed_time = np.arange(40, dtype=np.float64)
+    anchors = sample_anchors(distance, elapsed_time, distance_step=100, time_step=10)
+    assert anchors.tolist() == [0, 2, 4, 6, 8, 18, 28, 38, 39]
+    np.testing.assert_array_equal(sample_anchors(distance, np.full(40, np.nan), 100, 10), [0, 2, 4, 6, 8, 19, 39])
+    np.testing.assert_array_equal(sample_anchors(distance, elapsed_time), np.arange(40))
+
+    expected = np.repeat([1, 2], [13, 27])
+    values, probe_count = bisect_fill(len(expected), None, lambda indices: expected[indices], anchors=anchors)
+    np.testing.assert_array_equal(values, expected)
+    assert probe_count < len(expected) // 2
+
+
+def test_heading_runs():
+    """测试按分组、方向和距离分段：方向跨过 0 度不算转向，静止（方向为 NaN）不分段"""
+    group = np.array([1] * 8 + [2] * 4)
+    course = np.array([350, 5, np.nan, 10, 90, 95, 100, 92, 92, 92, 92, 92], dtype=np.float64)
+    distance = np.arange(12) * 100.0
+    assert heading_runs(group, course, distance, 30).tolist() == [0, 4, 8]
+    assert heading_runs(group, course, distance, 30, max_distance=250).tolist() == [0, 3, 4, 7, 8, 11]
+    assert heading_runs(np.stack([group, np.zeros(12)], axis=1), np.full(12, np.nan), distance, 30).tolist() == [0, 8]
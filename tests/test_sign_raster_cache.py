@@ -0,0 +1,56 @@
+"""测试道路编号标志栅格缓存的 pytest 用例，标志的生成与栅格化由简单的替身代替"""
+
+import svgwrite
+from PIL import Image
+
+from src.gpxutil.utils.sign_raster_cache import SignRasterCache
+from src.gpxutil.utils.svg_gen import SignRenderer
+
+
+class _StubRenderer(SignRenderer):
+    """只生成一个与编号长度有关的空白 SVG，样式哈希可以指定"""
+
+    def __init__(self, style_hash: str = 'style-1'):
+        self.style_hash = style_hash
+        self.rendered = []
+
+    def render(self, code: str, province: str = None, name: str = None):
+        self.rendered.append((code, province, name))
+        return svgwrite.Drawing(size=(str(100 * len(code)), '200'))
+
+
+def _rasterize(drawing) -> Image.Image:
+    return Image.new('RGBA', (int(drawing['width']), int(drawing['height'])), (255, 0, 0, 255))
+
+
+def test_sign_rasterized_once(tmp_path):
+    """测试同一标志只生成、栅格化一次，不同写法的同一标志共用结果，图片缩放到目标高度"""
+    renderer = _StubRenderer()
+    cache = SignRasterCache(_rasterize, 64, str(tmp_path), renderer=renderer)
+    first = cache.get('G310')
+    assert cache.get('G310') is first
+    assert first.size == (128, 64) and first.mode == 'RGBA'
+    assert cache.get('豫S21') is cache.get('S21', province='豫')
+    assert cache.get('G4511', name='测试高速') is not cache.get('G4511')
+    assert cache.rasterized == 4
+    assert len(renderer.rendered) == 4
+
+
+def test_sign_cache_persisted(tmp_path):
+    """测试下次运行从缓存目录读取，不再栅格化；样式或高度变化时重新栅格化"""
+    SignRasterCache(_rasterize, 64, str(tmp_path), renderer=_StubRenderer()).get('G310')
+    assert len(list(tmp_path.iterdir())) == 1
+
+    renderer = _StubRenderer()
+    cache = SignRasterCache(_rasterize, 64, str(tmp_path), renderer=renderer)
+    image = cache.get('G310')
+    assert image.size == (128, 64) and image.getpixel((0, 0)) == (255, 0, 0, 255)
+    assert cache.rasterized == 0 and renderer.rendered == []
+
+    cache = SignRasterCache(_rasterize, 64, str(tmp_path), renderer=_StubRenderer('style-2'))
+    cache.get('G310')
+    assert cache.rasterized == 1
+    cache = SignRasterCache(_rasterize, 32, str(tmp_path), renderer=_StubRenderer())
+    assert cache.get('G310').size == (64, 32)
+    assert cache.rasterized == 1
+    assert not any(path.name.endswith('.tmp') for path in tmp_path.iterdir())
@@ -0,0 +1,36 @@
+"""测试预先旋转的图片表的 pytest 用例"""
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from src.gpxutil.utils.sprite_table import RotatedSpriteTable
+
+
+def _sample_image() -> Image.Image:
+    """上半部分有一个箭头的透明图片，旋转后内容不同"""
+    image = Image.new('RGBA', (64, 48), (0, 0, 0, 0))
+    ImageDraw.Draw(image).polygon([(32, 2), (20, 24), (44, 24)], fill=(255, 255, 255, 255))
+    return image
+
+
+def test_sprites_match_rotate():
+    """测试表中各角度与直接旋转的结果相同，取最接近的角度"""
+    image = _sample_image()
+    table = RotatedSpriteTable(image, 0.5)
+    assert len(table) == 720
+    assert table.sprites.shape == (720, 48, 64, 4)
+    for angle in (0, 0.5, 37.5, 181, 359.5):
+        assert np.array_equal(np.asarray(table.get(angle)), np.asarray(image.rotate(angle, expand=False)))
+    assert table.index(37.6) == table.index(37.5)
+    assert table.index(37.8) == table.index(38)
+
+
+def test_sprite_angle_wraps():
+    """测试角度超出 [0, 360) 时取等价的角度，非有限值取 0 度"""
+    table = RotatedSpriteTable(_sample_image(), 7)
+    # 角度数取整后的实际间隔
+    assert table.count == 51 and abs(table.step * table.count - 360) < 1e-9
+    assert table.index(359.9) == 0
+    assert table.index(-table.step) == table.count - 1
+    assert table.index(720 + table.step * 3) == 3
+    assert table.index(float('nan')) == 0
@@ -0,0 +1,106 @@
+"""测试交通标志 SVG 生成中字体、字形缓存的 pytest 用例，字体为临时生成的简单字体"""
+
+import pytest
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+from svgpathtools import parse_path
+
+from src.gpxutil.core.config import CONFIG_HANDLER
+from src.gpxutil.utils import svg_gen
+
+
+def _write_sample_font(path, chars: str):
+    """每个字符是一个宽度不同的矩形，字符越靠后越宽"""
+    glyph_order = ['.notdef'] + [f'g{i}' for i in range(len(chars))]
+    glyphs = {}
+    for i, name in enumerate(glyph_order):
+        pen = TTGlyphPen(None)
+        width = 200 + i * 50
+        pen.moveTo((50, 0))
+        pen.lineTo((50, 700))
+        pen.lineTo((50 + width, 700))
+        pen.lineTo((50 + width, 0))
+        pen.closePath()
+        glyphs[name] = pen.glyph()
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(glyph_order)
+    builder.setupCharacterMap({ord(char): f'g{i}' for i, char in enumerate(chars)})
+    builder.setupGlyf(glyphs)
+    builder.setupHorizontalMetrics({name: (400 + i * 50, 50) for i, name in enumerate(glyph_order)})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({'familyName': 'Sample', 'styleName': 'Regular'})
+    builder.setupOS2()
+    builder.setupPost()
+    builder.save(str(path))
+
+
+@pytest.fixture
+def sample_font(tmp_path, monkeypatch):
+    font_path = str(tmp_path / 'sample.ttf')
+    _write_sample_font(font_path, 'GSX0123456789国家豫高速')
+    for name in ('A', 'B', 'C'):
+        monkeypatch.setattr(CONFIG_HANDLER.config.traffic_sign.font_path, name, font_path)
+    # 共用的生成器按新的配置重新创建
+    monkeypatch.setattr(svg_gen, '_sign_renderer', None)
+    svg_gen.clear_glyph_cache()
+    yield font_path
+    svg_gen.clear_glyph_cache()
+
+
+def test_font_loaded_once(sample_font, monkeypatch):
+    """测试多次生成标志时每个字体只加载一次，同一字符只解析一次，结果不变"""
+    loaded = []
+    original_ttfont = svg_gen.TTFont
+
+    def counting_ttfont(path, *args, **kwargs):
+        loaded.append(path)
+        return original_ttfont(path, *args, **kwargs)
+
+    monkeypatch.setattr(svg_gen, 'TTFont', counting_ttfont)
+    first = svg_gen.generate_way_num_pad('G310').tostring()
+    second = svg_gen.generate_way_num_pad('G310').tostring()
+    svg_gen.generate_way_num_pad('S301')
+    assert first == second
+    assert loaded == [sample_font]
+    assert svg_gen.glyph_outline.cache_info().misses == 5
+
+
+def test_scaled_chars_match_uncached_layout(sample_font):
+    """测试缓存的缩放字形与逐字重新解析、缩放、计算边界的排版结果一致"""
+    height = 100
+    paths = svg_gen.calculate_scaled_char_info('G310', 50, 50, 300, height, sample_font)
+    expected_widths = []
+    for char in 'G310':
+        path = parse_path(svg_gen.char_to_svg_path(sample_font, char).d())
+        char_minx, char_maxx, char_miny, char_maxy = path.bbox()
+        scaled = path.scaled(height / (char_maxy - char_miny))
+        scaled_minx, scaled_maxx, _, _ = scaled.bbox()
+        expected_widths.append(scaled_maxx - scaled_minx)
+    space = (300 - sum(expected_widths)) / 3
+    x = 50
+    for path, width in zip(paths, expected_widths):
+        minx, maxx, miny, maxy = path.bbox()
+        assert (minx, maxx, miny, maxy) == pytest.approx((x, x + width, 50, 50 + height))
+        x += width + space
+
+
+def test_sign_renderer_cache(sample_font, monkeypatch):
+    """测试 SignRenderer 每个模板只解析一次，相同参数的标志只生成一次，编号按类型生成对应的标志"""
+    parsed = []
+    original_svg2paths = svg_gen.svg2paths
+
+    def counting_svg2paths(path, *args, **kwargs):
+        parsed.append(path)
+        return original_svg2paths(path, *args, **kwargs)
+
+    monkeypatch.setattr(svg_gen, 'svg2paths', counting_svg2paths)
+    renderer = svg_gen.SignRenderer()
+    way_num_pad = renderer.render('G310')
+    assert renderer.render('G310') is way_num_pad
+    assert renderer.render('X221')['width'] == str(svg_gen.WAY_NUM_PAD_WIDTH)
+    provincial = renderer.render('豫S21')
+    assert renderer.expwy_pad('S21', '豫') is provincial
+    assert renderer.render('G4511')['width'] != str(svg_gen.WAY_NUM_PAD_WIDTH)
+    renderer.render('G45')
+    assert sorted(parsed) == sorted(set(parsed)), '每个模板只解析一次'
+    assert len(parsed) == 3